@@ -2,8 +2,11 @@
 
 # Breath and Combat
 # Moves cost breath. Breathing in and Out controls the flow of combat.
+#
+# The rules below are headless (see combat_core.py): they emit events on a Duel and take
+# decisions from policies. main() is the console front-end.
 
-import random
+from combat_core import Battle, RandomSkillPolicy
 
 # Stats:
 #   Brain - Intelligence/strategic skills
@@ -15,31 +18,30 @@ import random
 #   HP - Health points
 
 class CombatParticipant:
-    def __init__(self, stats, skills, is_player=False):
+    def __init__(self, stats, skills, is_player=False, policy=None, name=None):
         self.stats = stats
         self.skills = skills
         self.is_player = is_player
-        
-    def breath_action(self):
+        self.policy = policy or RandomSkillPolicy()
+        self.name = name or ('You' if is_player else 'Enemy')
+    
+    def breath_action(self, battle):
         """Increase breath by 1"""
         self.stats['Breath'] += 1
-        print(f"{'You' if self.is_player else 'Enemy'} take a deep breath. Breath increased to {self.stats['Breath']}")
+        battle.emit("breathe", actor=self.name, breath=self.stats['Breath'])
         return 0  # No damage
     
-    def calculate_damage(self, stat, min_roll, max_roll):
+    def calculate_damage(self, stat, min_roll, max_roll, rng):
         """Calculate damage based on stat and random roll"""
-        stat_value = self.stats[stat]
-        roll = random.randint(min_roll, max_roll)
-        return stat_value * roll
+        return self.stats[stat] * rng.randint(min_roll, max_roll)
     
-    def use_skill(self, skill_name, target):
+    def use_skill(self, skill_name, target, battle):
         """Use a skill on the target"""
-        # Check if we have enough breath
         for skill in self.skills:
             if skill['name'].lower() == skill_name.lower():
                 # Check breath cost
                 if self.stats['Breath'] < skill['breath_cost']:
-                    print(f"Not enough breath to use {skill['name']}!")
+                    battle.emit("invalid", actor=self.name, skill=skill['name'], reason="breath")
                     return False
                 
                 # Deduct breath cost
@@ -50,76 +52,107 @@ class CombatParticipant:
                 effect = None
                 
                 if skill['name'].lower() == 'punch':
-                    damage = self.calculate_damage('Hands', 0, 6)
+                    damage = self.calculate_damage('Hands', 0, 6, battle.rng)
                 elif skill['name'].lower() == 'kick':
-                    damage = self.calculate_damage('Legs', 0, 10)
+                    damage = self.calculate_damage('Legs', 0, 10, battle.rng)
                 elif skill['name'].lower() == 'shove':
                     # Shove applies stun but no damage
                     effect = 'stun'
                     target.stats['effect'] = effect
                 elif skill['name'].lower() == 'breathe':
-                    self.breath_action()
+                    self.breath_action(battle)
                     return True
                 
                 # Apply damage and effects
                 if damage > 0:
                     target.stats['hp'] -= damage
-                    print(f"{'You' if self.is_player else 'Enemy'} used {skill['name']} for {damage} damage!")
+                    battle.emit("hit", actor=self.name, target=target.name, skill=skill['name'], amount=damage)
                 
                 if effect:
-                    print(f"{'You' if self.is_player else 'Enemy'} applied {effect} effect!")
-                    
+                    battle.emit("effect", actor=self.name, target=target.name, effect=effect)
+                
                 return True
         
-        print(f"Skill '{skill_name}' not found!")
+        battle.emit("invalid", actor=self.name, skill=skill_name, reason="unknown")
+        return False
+    
+    def skip_if_stunned(self, battle):
+        """Stun costs exactly one turn"""
+        if self.stats['effect'] == 'stun':
+            battle.emit("stunned", actor=self.name)
+            self.stats['effect'] = 0  # Reset stun after skipping
+            return True
         return False
 
 class Player(CombatParticipant):
-    def take_turn(self, enemy):
+    def take_turn(self, enemy, battle):
         """Handle player's turn"""
-        if self.stats['effect'] == 'stun':
-            print("You are stunned and skip your turn!")
-            self.stats['effect'] = 0  # Reset stun after skipping
+        if self.skip_if_stunned(battle):
             return
         
-        # Display available skills
-        print("\nYour turn! Available skills:")
-        for skill in self.skills:
-            print(f"- {skill['name']} ({skill['description']}, Cost: {skill['breath_cost']} breath)")
-        
-        print(f"Current Breath: {self.stats['Breath']}")
-        valid_move = False
+        if battle.listening:
+            battle.emit("options", actor=self.name, breath=self.stats['Breath'],
+                        skills=[dict(s) for s in self.skills])
         
-        while not valid_move:
-            intent = input("\nEnter your move (punch, kick, shove, breathe): ").strip().lower()
-            valid_move = self.use_skill(intent, enemy)
-            
-            if not valid_move:
-                print("Try again with a valid move.")
+        while True:
+            intent = self.policy.choose(self, battle) or 'breathe'
+            if self.use_skill(intent, enemy, battle):
+                return
+            if not self.policy.interactive:
+                # Scripted players don't get stuck in loops
+                self.breath_action(battle)
+                return
+            battle.emit("retry", actor=self.name)
 
 class Enemy(CombatParticipant):
-    def take_turn(self, player):
+    def take_turn(self, player, battle):
         """Handle enemy's turn"""
-        if self.stats['effect'] == 'stun':
-            print("Enemy is stunned and skips their turn!")
-            self.stats['effect'] = 0  # Reset stun after skipping
+        if self.skip_if_stunned(battle):
             return
         
-        # Filter skills the enemy can use based on breath
-        available_skills = [skill for skill in self.skills 
-                           if self.stats['Breath'] >= skill['breath_cost']]
-        
-        if not available_skills:
+        chosen_skill = self.policy.choose(self, battle)
+        if chosen_skill is None:
             # If no skills available, breathe
-            self.breath_action()
+            self.breath_action(battle)
+            return
+        
+        battle.emit("enemy_attack", actor=self.name, skill=chosen_skill)
+        self.use_skill(chosen_skill, player, battle)
+
+class Duel(Battle):
+    """A 1v1 fight: the player acts, then the enemy, each turn."""
+    def __init__(self, player, enemy, **kwargs):
+        super().__init__(**kwargs)
+        self.player = player
+        self.enemy = enemy
+    
+    def play_turn(self):
+        self.turn += 1
+        if self.listening:
+            self.emit("turn_start", status=self.status())
+        
+        self.player.take_turn(self.enemy, self)
+        if self.enemy.stats['hp'] <= 0:
+            self.outcome = "victory"
             return
         
-        # Random skill selection
-        chosen_skill = random.choice(available_skills)
-        print(f"Enemy uses {chosen_skill['name']}!")
-        self.use_skill(chosen_skill['name'], player)
+        self.emit("enemy_turn", actor=self.enemy.name)
+        self.enemy.take_turn(self.player, self)
+        if self.player.stats['hp'] <= 0:
+            self.outcome = "defeat"
+            return
+        
+        self.emit("turn_end")
+    
+    def status(self):
+        return {"player": {"name": self.player.name, "hp": self.player.stats['hp'], "breath": self.player.stats['Breath']},
+                "enemy": {"name": self.enemy.name, "hp": self.enemy.stats['hp'], "breath": self.enemy.stats['Breath']}}
+    
+    def summary(self):
+        return {"mode": "duel", "enemy": self.enemy.name}
 
-def main():
+def create_duel(player_policy=None, enemy_policy=None, **kwargs):
+    """The standard sparring match with fresh stats."""
     # Initialize player stats and skills
     player_stats = {
         'Brain': 5,
@@ -160,58 +193,22 @@ def main():
     ]
     
     # Create player and enemy
-    player = Player(player_stats, player_skills, is_player=True)
-    enemy = Enemy(enemy_stats, enemy_skills)
-    
-    # Combat loop
-    turn = 0
-    victory = False
-    defeat = False
-    
-    print("Combat begins!")
-    print("==============")
-    
-    # Main combat loop
-    while not (victory or defeat):
-        turn += 1
-        print(f"\n--- Turn {turn} ---")
-        print(f"Player HP: {player.stats['hp']} | Enemy HP: {enemy.stats['hp']}")
-        print(f"Player Breath: {player.stats['Breath']} | Enemy Breath: {enemy.stats['Breath']}")
-        
-        # Checkpoint for testing
-        print("\n[CHECKPOINT] Beginning of turn")
-        
-        # Player's turn
-        player.take_turn(enemy)
-        
-        # Check if enemy is defeated
-        if enemy.stats['hp'] <= 0:
-            victory = True
-            continue
-        
-        # Checkpoint for testing
-        print("\n[CHECKPOINT] After player turn")
-        
-        # Enemy's turn
-        enemy.take_turn(player)
-        
-        # Check if player is defeated
-        if player.stats['hp'] <= 0:
-            defeat = True
-            continue
-        
-        # Checkpoint for testing
-        print("\n[CHECKPOINT] End of turn")
+    player = Player(player_stats, player_skills, is_player=True, policy=player_policy)
+    enemy = Enemy(enemy_stats, enemy_skills, policy=enemy_policy)
+    return Duel(player, enemy, **kwargs)
+
+def main(pacing=None):
+    import random
+    from combat_render import ConsolePolicy, ConsoleRenderer, env_pacing
+    from combat_replay import Recorder, save
     
-    # End of combat
-    if victory:
-        print("\n=== VICTORY! ===")
-        print("You have defeated the enemy!")
-        return "victory"
-    else:
-        print("\n=== DEFEAT! ===")
-        print("You have been defeated...")
-        return "defeat"
+    pacing = pacing or env_pacing()  # COMBAT_PACING: instant, fast or cinematic
+    duel = create_duel(player_policy=ConsolePolicy("\nEnter your move (punch, kick, shove, breathe): "),
+                       on_event=ConsoleRenderer(pacing=pacing), record=False, seed=random.randrange(2**32))
+    recorder = Recorder(duel)  # Every fight can be replayed: python combat_replay.py show
+    result = duel.run()
+    save(recorder.entry())
+    return result
 
 if __name__ == '__main__':
     result = main()
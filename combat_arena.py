@@ -0,0 +1,379 @@
+# combat_arena.py
+
+# N-versus-M battles with hundreds of combatants a side, on struct-of-arrays state.
+# team_combat.py keeps a stats dict per combatant and walks team.members in Python for every
+# area attack, defeat check and target pick. Here each side is a handful of parallel NumPy arrays
+# (HP, Breath, the five stats, stun and analyzed flags, an alive mask and a living count), and a
+# side's whole volley is a few array operations: one draw for everyone's targets, a bincount for
+# the damage, one masked subtraction per area attack, and an O(1) `side.living == 0` defeat check.
+#
+# Rules: every living combatant acts once per turn, the team's volley first and then the enemies'.
+# A volley is simultaneous: targets are picked among the opponents alive when it starts and the
+# fallen are counted when it ends. Skills are the compiled ones from data/skills.json (skills.py)
+# and everyone uses the arena tactics in signature_move() (or support_move(), which --check also
+# plays so stuns, analyzing and regeneration get compared). ScalarArena plays the same rules on
+# team_combat's CombatParticipant / FriendlyTeam objects, as the reference and the baseline.
+#
+#   python combat_arena.py --sizes 4 16 64 256 1024     # turns per second as the sides grow
+#   python combat_arena.py --check                      # statistical comparison with ScalarArena
+
+import argparse
+import math
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from combat_core import Battle
+from skills import combatant, encounter, registry
+from team_combat import CombatParticipant, FriendlyTeam, spawn
+
+STATS = ["Brain", "Spine", "Eyes", "Hands", "Legs"]
+ENEMY, ENEMIES, SELF, ALLIES = range(4)
+TARGETS = {"enemy": ENEMY, "enemies": ENEMIES, "self": SELF, "allies": ALLIES}
+HEAL_CAP = 100  # As FriendlyTeam.heal_all
+COORDINATED_BONUS = 0.2  # Share of an analyzed target's HP lost to the next coordinated hit
+
+
+def signature_move(skills, breath):
+    """The arena tactics: save breath for the combatant's priciest attack, breathing until it's affordable.
+    
+    Returns the Skill to use, or None for a plain breath (CombatParticipant.breath_action).
+    """
+    attacks = [s for s in skills if 'damage' in s or 'area_damage' in s] or skills
+    top = max(attacks, key=lambda s: s.breath_cost)
+    if breath >= top.breath_cost:
+        return top
+    return next((s for s in skills if s.get('breath') and breath >= s.breath_cost), None)
+
+
+def support_move(skills, breath):
+    """Support tactics: use the cheapest affordable utility skill (one that neither damages nor breathes,
+    e.g. Shove, Analyze, Regenerate), and fight as in signature_move() when there is none."""
+    utility = [s for s in skills if not ('damage' in s or 'area_damage' in s or s.get('breath'))
+               and breath >= s.breath_cost]
+    if utility:
+        return min(utility, key=lambda s: s.breath_cost)
+    return signature_move(skills, breath)
+
+
+class SkillArrays:
+    """Every compiled skill as columns, one row per skill; the last row is a plain breath."""
+    def __init__(self, skills):
+        self.index = {s.id: i for i, s in enumerate(skills)}
+        self.breath_action = len(skills)
+        rows = len(skills) + 1
+        self.levels = max(s.breath_cost for s in skills) + 1  # Breath beyond this never changes a plan
+        
+        self.cost = np.zeros(rows, dtype=np.int64)
+        self.spends = np.zeros(rows, dtype=np.int64)
+        self.gain = np.zeros(rows, dtype=np.int64)
+        self.target = np.full(rows, SELF, dtype=np.int64)
+        self.stat = np.zeros(rows, dtype=np.int64)
+        self.lo = np.zeros(rows, dtype=np.int64)
+        self.hi = np.zeros(rows, dtype=np.int64)
+        self.crit_chance = np.zeros(rows)
+        self.crit_bonus = np.zeros(rows)
+        self.stun = np.zeros(rows, dtype=bool)
+        self.analyze = np.zeros(rows, dtype=bool)
+        self.coordinated = np.zeros(rows, dtype=bool)
+        self.area_stat = np.zeros(rows, dtype=np.int64)
+        self.area_lo = np.zeros(rows, dtype=np.int64)
+        self.area_hi = np.zeros(rows, dtype=np.int64)
+        self.heal_self = np.zeros(rows, dtype=np.int64)
+        self.heal_team = np.zeros(rows, dtype=np.int64)
+        
+        for i, s in enumerate(skills):
+            self.cost[i] = s.breath_cost
+            self.spends[i] = s.spends_breath
+            self.gain[i] = s.get('breath', 0)
+            self.target[i] = TARGETS[s.target]
+            if 'damage' in s:
+                d = s['damage']
+                self.stat[i], self.lo[i], self.hi[i] = STATS.index(d['stat']), d['min'], d['max']
+            if 'crit' in s:
+                self.crit_chance[i], self.crit_bonus[i] = s['crit']['chance'], s['crit']['bonus']
+            self.stun[i] = s.get('effect') == 'stun'
+            self.analyze[i] = bool(s.get('analyze'))
+            self.coordinated[i] = s.coordinated
+            if 'area_damage' in s:
+                d = s['area_damage']
+                self.area_stat[i], self.area_lo[i], self.area_hi[i] = STATS.index(d['stat']), d['min'], d['max']
+            self.heal_self[i] = s.get('heal_self', 0)
+            self.heal_team[i] = s.get('heal_team', 0)
+        self.gain[self.breath_action] = 1
+    
+    def plan(self, combatant_id, tactics=signature_move):
+        """tactics(skills, breath) for each Breath level up to self.levels - 1, as skill rows"""
+        skills = [registry()[sid] for sid in combatant(combatant_id)['skills']]
+        moves = [tactics(skills, breath) for breath in range(self.levels)]
+        return np.array([self.breath_action if m is None else self.index[m.id] for m in moves], dtype=np.int64)
+
+
+@lru_cache(maxsize=None)
+def skill_arrays():
+    return SkillArrays(list(registry().values()))
+
+
+class Side:
+    """One side of an arena as parallel arrays, one slot per combatant (combatant ids from data/combatants.json)."""
+    def __init__(self, combatant_ids, tactics=signature_move):
+        table = skill_arrays()
+        kinds, slot_kind = np.unique(np.array(combatant_ids), return_inverse=True)
+        templates = [combatant(k) for k in kinds]
+        
+        self.kinds = list(kinds)
+        self.kind = slot_kind
+        self.size = len(combatant_ids)
+        self.hp = np.array([t['stats']['hp'] for t in templates], dtype=np.int64)[slot_kind]
+        self.breath = np.array([t['stats']['Breath'] for t in templates], dtype=np.int64)[slot_kind]
+        self.stats = np.array([[t['stats'][s] for s in STATS] for t in templates], dtype=np.int64)[slot_kind]
+        self.stunned = np.array([t['stats'].get('effect') == 'stun' for t in templates])[slot_kind]
+        self.analyzed = np.zeros(self.size, dtype=bool)
+        self.plan = np.array([table.plan(k, tactics) for k in kinds])[slot_kind]
+        self.alive = self.hp > 0
+        self.living = int(self.alive.sum())
+    
+    def count_fallen(self):
+        fallen = self.alive & (self.hp <= 0)
+        if fallen.any():
+            self.alive &= ~fallen
+            self.living -= int(fallen.sum())
+
+
+class Arena:
+    """A battle between two Sides; the same turn / outcome / run() shape as combat_core.Battle, without events."""
+    def __init__(self, team_ids, enemy_ids, seed=None, max_turns=1000, tactics=signature_move):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.team = Side(team_ids, tactics)
+        self.enemies = Side(enemy_ids, tactics)
+        self.turn = 0
+        self.outcome = None
+        self.max_turns = max_turns
+    
+    def run(self):
+        while self.outcome is None:
+            if self.max_turns and self.turn >= self.max_turns:
+                self.outcome = "timeout"
+                break
+            self.play_turn()
+        return self.outcome
+    
+    def play_turn(self):
+        self.turn += 1
+        self._volley(self.team, self.enemies)
+        if not self.enemies.living:
+            self.outcome = "victory"
+            return
+        self._volley(self.enemies, self.team)
+        if not self.team.living:
+            self.outcome = "defeat"
+    
+    def _volley(self, att, dfn):
+        s, rng = skill_arrays(), self.rng
+        actors = np.flatnonzero(att.alive)
+        stunned = att.stunned[actors]
+        att.stunned[actors[stunned]] = False  # A stun costs exactly one turn
+        actors = actors[~stunned]
+        if not actors.size:
+            return
+        move = att.plan[actors, np.minimum(att.breath[actors], s.levels - 1)]
+        att.breath[actors] += s.gain[move] - s.cost[move] * s.spends[move]
+        target = s.target[move]
+        
+        # Single-target skills: one uniform pick among the opponents standing at the start of the volley
+        pick = target == ENEMY
+        one, m = actors[pick], move[pick]
+        hit = np.zeros(dfn.size, dtype=bool)
+        if one.size:
+            living = np.flatnonzero(dfn.alive)
+            hit_slot = living[rng.integers(living.size, size=one.size)]
+            damage = att.stats[one, s.stat[m]] * rng.integers(s.lo[m], s.hi[m] + 1)
+            crit = (damage > 0) & (rng.random(one.size) < s.crit_chance[m])
+            damage += np.where(crit, (damage * s.crit_bonus[m]).astype(np.int64), 0)
+            dfn.hp -= np.bincount(hit_slot, weights=damage, minlength=dfn.size).astype(np.int64)
+            dfn.stunned[hit_slot[s.stun[m]]] = True
+            hit[hit_slot[s.coordinated[m]]] = True
+            marked = hit_slot[s.analyze[m]]
+        
+        # Area attacks: each one's roll lands on every opponent still standing
+        area = actors[target == ENEMIES]
+        if area.size:
+            m = move[target == ENEMIES]
+            total = int((att.stats[area, s.area_stat[m]] * rng.integers(s.area_lo[m], s.area_hi[m] + 1)).sum())
+            if total:
+                dfn.hp[dfn.alive] -= total
+        
+        # An analyzed target that took a coordinated hit loses a share of what the whole volley left it
+        if one.size:
+            bonus = dfn.analyzed & hit & (dfn.hp > 0)
+            dfn.hp[bonus] -= (COORDINATED_BONUS * dfn.hp[bonus]).astype(np.int64)
+            dfn.analyzed &= ~hit
+            dfn.analyzed[marked] = True
+        
+        heal = s.heal_self[move]
+        if heal.any():
+            att.hp[actors] += heal
+        heal = int(s.heal_team[move[target == ALLIES]].sum())
+        if heal:
+            att.hp[att.alive] = np.minimum(att.hp[att.alive] + heal, HEAL_CAP)
+        dfn.count_fallen()
+    
+    def summary(self):
+        return {"mode": "arena", "team_living": self.team.living, "enemies_living": self.enemies.living}
+
+
+class ScalarArena(Battle):
+    """The arena rules on team_combat's per-instance stats dicts: the reference for --check and the baseline."""
+    def __init__(self, team_ids, enemy_ids, tactics=signature_move, **kwargs):
+        kwargs.setdefault("record", False)
+        super().__init__(**kwargs)
+        self.tactics = tactics
+        self.team = FriendlyTeam([spawn(CombatParticipant, cid) for cid in team_ids])
+        self.enemies = FriendlyTeam([spawn(CombatParticipant, cid) for cid in enemy_ids])
+    
+    def play_turn(self):
+        self.turn += 1
+        self._volley(self.team, self.enemies)
+        if self.enemies.is_defeated():
+            self.outcome = "victory"
+            return
+        self._volley(self.enemies, self.team)
+        if self.team.is_defeated():
+            self.outcome = "defeat"
+    
+    def _volley(self, att, dfn):
+        living = dfn.living_members()
+        analyzed = [m for m in living if m.stats.get('analyzed')]
+        hit, marked = set(), []
+        for actor in att.living_members():
+            if actor.skip_if_stunned(self):
+                continue
+            skill = self.tactics(actor.skills, actor.stats['Breath'])
+            if skill is None:
+                actor.breath_action(self)
+                continue
+            if skill.target == "enemies":
+                target = dfn
+            elif skill.target == "allies":
+                target = att
+            elif skill.target == "self":
+                target = actor
+            else:
+                target = self.rng.choice(living)
+                if skill.coordinated:
+                    hit.add(id(target))
+                if skill.get('analyze'):
+                    marked.append(target)
+            skill.use(actor, target, self)
+        
+        for m in analyzed:
+            if id(m) in hit:
+                if m.stats['hp'] > 0:
+                    m.stats['hp'] -= int(COORDINATED_BONUS * m.stats['hp'])
+                m.stats['analyzed'] = False
+        for m in marked:
+            m.stats['analyzed'] = True
+    
+    def summary(self):
+        return {"mode": "arena", "team_living": len(self.team.living_members()),
+                "enemies_living": len(self.enemies.living_members())}
+
+
+def line_up(rangers, enemies, rivals=0, encounter_id="mint_baby_green"):
+    """Combatant ids from an encounter: `rangers` team members (its line-up, repeated), and on the other
+    side `rivals` rangers of the same line-up plus `enemies` copies of its enemy"""
+    spec = encounter(encounter_id)
+    squad = [spec['team'][i % len(spec['team'])] for i in range(max(rangers, rivals))]
+    return squad[:rangers], squad[:rivals] + [spec['enemy']] * enemies
+
+
+def create_arena(rangers=256, enemies=1, rivals=256, encounter_id="mint_baby_green", scalar=False, **kwargs):
+    """An N-vs-M battle from an encounter's combatants (by default 256 rangers vs 256 rivals and Baby-Green);
+    kwargs go to the Arena (seed, max_turns, tactics)."""
+    team_ids, enemy_ids = line_up(rangers, enemies, rivals, encounter_id)
+    return (ScalarArena if scalar else Arena)(team_ids, enemy_ids, **kwargs)
+
+
+def _turns_per_second(size, turns, seed, scalar):
+    """Play fresh battles until `turns` turns have been played; only the turns themselves are timed"""
+    played, battles, elapsed = 0, 0, 0.0
+    while played < turns:
+        arena = create_arena(size, 1, size, seed=seed + battles, scalar=scalar)
+        battles += 1
+        started = time.perf_counter()
+        while arena.outcome is None and arena.turn < arena.max_turns and played < turns:
+            arena.play_turn()
+            played += 1
+        elapsed += time.perf_counter() - started
+    return played / elapsed, played / battles
+
+
+def benchmark(sizes, turns=500, seed=0, scalar_limit=1024):
+    """Turns per second for each size N (N rangers vs N rival rangers and a Baby-Green), arrays vs stats dicts.
+    
+    Sides that size stay in the fight for several turns, and Baby-Green's Acid Spray hits the whole team.
+    """
+    rows = []
+    for size in sizes:
+        vector, length = _turns_per_second(size, turns, seed, scalar=False)
+        scalar = _turns_per_second(size, turns, seed, scalar=True)[0] if size <= scalar_limit else None
+        rows.append({"size": size, "vector": vector, "scalar": scalar, "battle_turns": length})
+    return rows
+
+
+def _tally(arenas):
+    wins = [a.outcome == "victory" for a in arenas]
+    return sum(wins) / len(wins), [a.turn for a in arenas], [a.summary()["team_living"] for a in arenas]
+
+
+def check(rangers=12, enemies=2, rivals=0, battles=4000, seed=5, limit=4.0, tactics=signature_move):
+    """Statistical check that the array engine plays the ScalarArena rules; True if every |z| < limit."""
+    results = {}
+    for scalar in (False, True):
+        arenas = []
+        for i in range(battles):
+            arena = create_arena(rangers, enemies, rivals, seed=seed + i, scalar=scalar, tactics=tactics)
+            arena.run()
+            arenas.append(arena)
+        results[scalar] = _tally(arenas)
+    
+    (win_v, turns_v, alive_v), (win_s, turns_s, alive_s) = results[False], results[True]
+    print(f"{rangers} rangers vs {rivals} rivals and {enemies} Baby-Green ({tactics.__name__}): arrays {win_v:.2%} wins, {np.mean(turns_v):.2f} turns | "
+          f"scalar {win_s:.2%} wins, {np.mean(turns_s):.2f} turns")
+    pooled = (win_v + win_s) / 2
+    z = {"win rate": (win_v - win_s) / (math.sqrt(2 * pooled * (1 - pooled) / battles) or 1)}
+    for name, a, b in (("mean turns", turns_v, turns_s), ("survivors", alive_v, alive_s)):
+        spread = math.sqrt((np.var(a) + np.var(b)) / battles) or 1
+        z[name] = (np.mean(a) - np.mean(b)) / spread
+    ok = True
+    for name, value in z.items():
+        passed = abs(value) < limit
+        ok &= passed
+        print(f"  {name:<12} z = {value:+.2f}  {'ok' if passed else 'MISMATCH'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="N-vs-M arena battles on struct-of-arrays state")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 16, 64, 256, 1024], help="Rangers per side")
+    parser.add_argument("--turns", type=int, default=500, help="Turns timed per size and engine")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true", help="Compare statistically against ScalarArena")
+    args = parser.parse_args()
+    
+    if args.check:
+        ok = all([check(), check(rangers=48, enemies=1, rivals=48, battles=1500, seed=9),
+                  check(rangers=12, enemies=1, rivals=12, battles=2000, seed=13, tactics=support_move)])
+        print("Array engine matches the scalar rules" if ok else "Array engine DIVERGES from the scalar rules")
+        raise SystemExit(0 if ok else 1)
+    
+    print(f"{'per side':>9}{'turns/s arrays':>16}{'turns/s dicts':>15}{'speed-up':>10}{'turns/battle':>14}")
+    for row in benchmark(args.sizes, args.turns, args.seed):
+        scalar = f"{row['scalar']:>15,.0f}{row['vector'] / row['scalar']:>9.1f}x" if row['scalar'] else f"{'-':>15}{'-':>10}"
+        print(f"{row['size']:>9}{row['vector']:>16,.0f}{scalar}{row['battle_turns']:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
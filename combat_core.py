@@ -0,0 +1,76 @@
+# combat_core.py
+
+# Headless combat plumbing shared by combat.py (1v1) and team_combat.py (rangers vs Baby-Green).
+# Rules never print, prompt or sleep: every step is emitted as an event on the Battle and every
+# decision comes from a policy object, so a fight can be simulated in microseconds or shown by
+# any front-end (see combat_render.py).
+
+import random
+
+
+class Battle:
+    """One fight: its RNG, turn counter, outcome and event stream.
+    
+    Subclasses implement play_turn() (setting self.outcome when the fight ends), status() and summary().
+    Events are plain dicts ({"type": ..., "turn": ..., ...}) so they can be rendered or sent as JSON.
+    
+    The rules roll dice with `rng`; policies draw with `policy_rng`, a separate stream seeded from it.
+    A fight is therefore fixed by its seed plus the decisions made, whoever made them (see combat_replay.py).
+    """
+    def __init__(self, seed=None, rng=None, on_event=None, record=True, max_turns=1000, policy_rng=None):
+        self.seed = seed
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.policy_rng = policy_rng if policy_rng is not None else random.Random(self.rng.getrandbits(64))
+        self.on_event = on_event
+        self.record = record
+        self.events = []
+        self.turn = 0
+        self.outcome = None
+        self.max_turns = max_turns
+    
+    @property
+    def listening(self):
+        """Whether anyone consumes events; lets rules skip building expensive ones (status snapshots)."""
+        return self.record or self.on_event is not None
+    
+    def emit(self, kind, **data):
+        if not (self.record or self.on_event):
+            return
+        data["type"] = kind
+        data["turn"] = self.turn
+        if self.record:
+            self.events.append(data)
+        if self.on_event:
+            self.on_event(data)
+    
+    def run(self):
+        """Play turns until the fight is decided; returns the outcome."""
+        self.emit("battle_start", **self.summary())
+        while self.outcome is None:
+            if self.max_turns and self.turn >= self.max_turns:
+                self.outcome = "timeout"
+                break
+            self.play_turn()
+        self.emit("battle_end", outcome=self.outcome, **self.summary())
+        return self.outcome
+    
+    def play_turn(self):
+        raise NotImplementedError
+    
+    def status(self):
+        return {}
+    
+    def summary(self):
+        return {}
+
+
+class RandomSkillPolicy:
+    """Picks uniformly among the skills the actor can afford (the scripted enemy behaviour).
+    
+    Policies expose choose(actor, battle); `interactive` policies are asked again after an invalid move.
+    """
+    interactive = False
+    
+    def choose(self, actor, battle):
+        available = [s for s in actor.skills if actor.stats['Breath'] >= s['breath_cost']]
+        return battle.policy_rng.choice(available)['name'] if available else None
@@ -0,0 +1,237 @@
+# combat_planner.py
+
+# Search-based enemy AI for team battles: Monte Carlo tree search over the headless rules.
+# PlannerPolicy is a drop-in enemy policy (create_battle(enemy_policy=PlannerPolicy())). Each
+# decision clones the battle, plays it forward many times with the scripted rangers as the model
+# of the team, and picks the move that worked best, stopping when its time budget runs out.
+#
+# The tree is open-loop: a node is a sequence of enemy decisions and the dice and rangers in
+# between are re-sampled on every pass, so after the enemy moves, that move's subtree is still
+# valid for its next decision and is kept as the new root.
+#
+#   python combat_planner.py --battles 200 --budgets 1 2 5 10    # enemy win rate vs compute
+
+import argparse
+import copy
+import math
+import random
+import statistics
+import time
+
+from team_combat import ScriptedRangerPolicy, TeamBattle, create_battle
+
+# Enemy targets other than a ranger's team slot
+TEAM, SELF = "team", "self"
+
+
+def enemy_actions(enemy, team):
+    """Every sensible (skill id, target) for the enemy: area skills at the team, self skills at itself,
+    the rest at each living ranger (by team slot)."""
+    actions = []
+    for skill in enemy.skills:
+        if enemy.stats['Breath'] < skill.breath_cost:
+            continue
+        if skill.target == "enemies":
+            actions.append((skill.id, TEAM))
+        elif skill.target == "self":
+            actions.append((skill.id, SELF))
+        else:
+            actions.extend((skill.id, i) for i, m in enumerate(team.members) if m.stats['hp'] > 0)
+    return actions
+
+
+def resolve(action, enemy, team):
+    """(skill id, target) in the form Enemy.take_turn expects"""
+    skill, target = action
+    if target == TEAM:
+        return skill, team
+    if target == SELF:
+        return skill, enemy
+    return skill, team.members[target]
+
+
+class Node:
+    __slots__ = ("visits", "value", "children")
+    
+    def __init__(self):
+        self.visits = 0
+        self.value = 0.0  # Sum of enemy-perspective results in [0, 1]
+        self.children = {}
+
+
+class _TreeWalk:
+    """The enemy policy inside a simulation: follow the tree by UCB1, expand one node, then play randomly."""
+    interactive = False
+    
+    def __init__(self, root, rng, exploration):
+        self.node = root
+        self.path = [root]
+        self.rng = rng
+        self.exploration = exploration
+    
+    def choose(self, enemy, battle):
+        actions = enemy_actions(enemy, battle.team)
+        if not actions:
+            return None
+        node = self.node
+        if node is None:
+            return resolve(self.rng.choice(actions), enemy, battle.team)  # Rollout
+        
+        untried = [a for a in actions if a not in node.children]
+        if untried:
+            action = self.rng.choice(untried)
+            child = node.children[action] = Node()
+            self.node = None  # Expanded: roll out from here
+        else:
+            log_n = math.log(node.visits or 1)
+            c = self.exploration
+            action = max(actions, key=lambda a: node.children[a].value / (node.children[a].visits or 1)
+                         + c * math.sqrt(log_n / (node.children[a].visits or 1)))
+            child = self.node = node.children[action]
+        self.path.append(child)
+        return resolve(action, enemy, battle.team)
+
+
+class PlannerPolicy:
+    """Enemy policy that searches for its move within `budget` seconds per decision.
+    
+    horizon:    turns each simulation looks ahead before the position is scored
+    iterations: fixed simulations per decision instead of a time budget (reproducible benchmarks)
+    seed:       seeds the planner's own RNG; the battle's RNG is never touched by the search
+    
+    decisions holds (seconds, simulations) for every move chosen, for benchmarking.
+    """
+    interactive = False
+    
+    def __init__(self, budget=0.005, horizon=8, iterations=None, exploration=0.7, seed=None):
+        self.budget = budget
+        self.horizon = horizon
+        self.iterations = iterations
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.decisions = []
+        self._battle = None
+        self._root = None
+        self._scripted = ScriptedRangerPolicy()
+    
+    def choose(self, enemy, battle):
+        started = time.perf_counter()
+        actions = enemy_actions(enemy, battle.team)
+        if not actions:
+            return None
+        
+        if battle is not self._battle:
+            # A new fight: fresh tree, and the scale for scoring positions
+            self._battle = battle
+            self._root = Node()
+            self._enemy_hp = max(enemy.stats['hp'], 1)
+            self._team_hp = max(sum(m.stats['hp'] for m in battle.team.members), 1)
+        root = self._root
+        
+        deadline = started + self.budget
+        runs = 0
+        while (runs < self.iterations) if self.iterations else (runs == 0 or time.perf_counter() < deadline):
+            self._simulate(battle, root)
+            runs += 1
+        
+        legal = [a for a in actions if a in root.children]
+        action = max(legal, key=lambda a: root.children[a].visits) if legal else self.rng.choice(actions)
+        # Reuse: the chosen move's subtree covers the enemy's next decision
+        self._root = root.children.get(action) or Node()
+        self.decisions.append((time.perf_counter() - started, runs))
+        return resolve(action, enemy, battle.team)
+    
+    def _clone(self, battle, walk):
+        """The battle at the enemy's decision point, silent, with model policies and the planner's dice"""
+        members = []
+        for m in battle.team.members:
+            twin = copy.copy(m)
+            twin.stats = dict(m.stats)
+            twin.policy = self._scripted  # The player is modelled by the AI teammates' tactics
+            members.append(twin)
+        team = copy.copy(battle.team)
+        team.members = members
+        team.fallen_rangers = list(battle.team.fallen_rangers)
+        
+        enemy = copy.copy(battle.enemy)
+        enemy.stats = dict(battle.enemy.stats)
+        enemy.policy = walk
+        
+        sim = TeamBattle(team, enemy, rng=self.rng, policy_rng=self.rng, record=False)
+        sim.turn = battle.turn
+        return sim
+    
+    def _simulate(self, battle, root):
+        walk = _TreeWalk(root, self.rng, self.exploration)
+        sim = self._clone(battle, walk)
+        stop = battle.turn + self.horizon
+        sim.enemy_phase()
+        while sim.outcome is None and sim.turn < stop:
+            sim.play_turn()
+        
+        result = self._score(sim)
+        for node in walk.path:
+            node.visits += 1
+            node.value += result
+    
+    def _score(self, sim):
+        """How good the position is for the enemy, 0 (lost) to 1 (won)"""
+        if sim.outcome == "defeat":
+            return 1.0
+        if sim.outcome == "victory":
+            return 0.0
+        enemy = min(max(sim.enemy.stats['hp'], 0) / self._enemy_hp, 1.0)
+        team = min(sum(max(m.stats['hp'], 0) for m in sim.team.members) / self._team_hp, 1.0)
+        return 0.5 + 0.5 * (enemy - team)
+
+
+def benchmark(budgets, battles=200, seed=0, horizon=8, enemy_hp=300):
+    """Enemy win rate against the scripted rangers for the default policy and each budget (seconds).
+    
+    Battle i uses seed + i for every row, so rows differ only in the enemy's decisions. At full
+    health (999) Baby-Green always wins, so the enemy starts weakened to leave room to improve.
+    """
+    rows = []
+    for budget in [None] + list(budgets):
+        wins = 0
+        decisions = []
+        started = time.perf_counter()
+        for i in range(battles):
+            planner = PlannerPolicy(budget, horizon, seed=seed + i) if budget else None
+            battle = create_battle(enemy_policy=planner, seed=seed + i, record=False)
+            battle.enemy.stats['hp'] = enemy_hp
+            wins += battle.run() == "defeat"
+            if planner:
+                decisions.extend(planner.decisions)
+        rate = wins / battles
+        rows.append({
+            "budget": budget,
+            "win_rate": rate,
+            "stderr": math.sqrt(rate * (1 - rate) / battles),
+            "decision_ms": statistics.mean(d[0] for d in decisions) * 1000 if decisions else 0.0,
+            "p99_ms": sorted(d[0] for d in decisions)[int(len(decisions) * 0.99)] * 1000 if decisions else 0.0,
+            "simulations": statistics.mean(d[1] for d in decisions) if decisions else 0,
+            "elapsed": time.perf_counter() - started,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Baby-Green planner: decision quality vs compute")
+    parser.add_argument("--battles", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--enemy-hp", type=int, default=300, help="Baby-Green's starting HP")
+    parser.add_argument("--horizon", type=int, default=8, help="Turns each simulation looks ahead")
+    parser.add_argument("--budgets", type=float, nargs="+", default=[1, 2, 5, 10], help="Milliseconds per decision")
+    args = parser.parse_args()
+    
+    rows = benchmark([b / 1000 for b in args.budgets], args.battles, args.seed, args.horizon, args.enemy_hp)
+    print(f"{'enemy policy':<16}{'enemy wins':>16}{'ms/decision':>13}{'p99 ms':>9}{'sims':>7}{'wall s':>9}")
+    for row in rows:
+        name = f"planner {row['budget'] * 1000:g}ms" if row['budget'] else "scripted"
+        print(f"{name:<16}{row['win_rate']:>9.1%} ±{row['stderr']:.1%}{row['decision_ms']:>13.2f}"
+              f"{row['p99_ms']:>9.2f}{row['simulations']:>7.0f}{row['elapsed']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
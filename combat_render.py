@@ -0,0 +1,332 @@
+# combat_render.py
+
+# Thin front-ends for the headless combat rules in combat.py and team_combat.py.
+# describe() turns one battle event into the story text; ConsoleRenderer prints it,
+# JsonRenderer streams events as JSON lines for a network client, and ConsolePolicy
+# is the human player's prompt.
+#
+# The rules never wait. Dramatic timing is a Pacing (instant, fast or cinematic) that each
+# front-end applies its own way: the console sleeps between prints, JsonRenderer sends the
+# delays as animation hints for the client, and play() awaits them without blocking a server.
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Flavor lines for ranger skills (team combat)
+SKILL_LINES = {
+    'punch': ["{actor} delivers a powerful punch!"],
+    'kick': ["{actor} executes a devastating kick!"],
+    'power slam': ["{actor} leaps into the air and slams down with tremendous force!"],
+    'brain blast': ["{actor} focuses mental energy into a concentrated blast!"],
+    'eye beam': ["{actor} shoots precision energy beams from their visor!"],
+    'spine strike': ["{actor} channels courage into a powerful strike!"],
+    'heat wave': ["{actor} unleashes waves of intense heat from their suit!",
+                  "The attack leaves burn marks across {target}'s body!"],
+    'acrobatic strike': ["{actor} performs an incredible series of flips before striking!",
+                         "{actor} is positioned to dodge the next attack!"],
+    'earth shatter': ["{actor} channels the power of earth, creating a shockwave!",
+                      "The ground cracks beneath {target}, stunning it momentarily!"],
+    'tech blast': ["{actor} activates advanced weaponry systems for a tech-enhanced blast!"],
+    'shove': ["{actor} shoves {target} off balance!"],
+    'field repair': ["{actor} activates emergency suit repairs for the entire team!"],
+    'group heal': ["{actor} activates emergency suit repairs for the entire team!"],
+}
+
+DAMAGE_LINES = {
+    'critical': "CRITICAL HIT! {target} takes an additional {amount} damage!",
+    'coordinated': "COORDINATED ATTACK! The exploited weakness costs {target} an additional {amount} damage!",
+    'Acid Spray': "{target} is hit for {amount} damage by the acid spray!",
+    'Toxic Punch': "{target} takes {amount} damage from the toxic punch!\n"
+                   "The toxin seeps into {target}'s suit, causing additional damage over time!",
+    'Stomp': "{target} takes {amount} damage and is STUNNED by the powerful stomp!",
+}
+
+DEATH_MESSAGES = {
+    "Red Ranger": "Red Ranger falls to one knee, his suit sparking with damage. 'Keep... fighting...' he gasps before collapsing. His transformation fails, leaving him unconscious.",
+    "Pink Ranger": "Pink Ranger attempts a backflip to dodge, but Baby-Green's attack catches her mid-air. She crashes to the ground, her suit flickering before powering down. She's out of the fight.",
+    "Yellow Ranger": "Yellow Ranger's tech systems overload from the damage. 'My calculations were... off...' he mutters before falling. His visor goes dark as he hits the ground.",
+    "Green Ranger (You)": "You feel your power fading as the damage overwhelms your suit's systems. The world spins around you as you fall to the ground, your transformation failing."
+}
+
+TEAM_INTRO = [
+    "\n╔══════════════════════════════════════╗\n"
+    "║           MINT BATTLEFIELD          ║\n"
+    "║ Rangers vs The Menacing Baby-Green  ║\n"
+    "╚══════════════════════════════════════╝\n",
+    "The Seoul skyline glimmers in the distance as your team approaches the Mint facility.",
+    "After rescuing Blue from the cult at the school, your team received an emergency alert...",
+    "A toxic monstrosity has emerged from the chemical waste near the Mint.",
+    "As you arrive at the scene, the ground trembles with each massive step of the creature.",
+    "Baby-Green - a hulking, acid-dripping abomination - turns toward your team...",
+    "Red Ranger steps forward: 'Remember your training. We can take this thing down together!'",
+    "You all activate your morphers in unison. It's time to fight!",
+]
+
+
+def _banner(title):
+    return ["\n╔═════════════════════════════╗", f"║{title:^29}║", "╚═════════════════════════════╝"]
+
+
+def _team_status(status):
+    enemy = status["enemy"]
+    lines = ["\n╔═════════════════════ STATUS ═════════════════════╗",
+             f"ENEMY: {enemy['name']} - HP: {enemy['hp']} - Breath: {enemy['breath']}"]
+    if enemy['hp'] < 300:
+        lines.append("ENEMY STATUS: SEVERELY DAMAGED (HP < 300)")
+    elif enemy['hp'] < 500:
+        lines.append("ENEMY STATUS: DAMAGED (HP < 500)")
+    elif enemy['hp'] < 800:
+        lines.append("ENEMY STATUS: SLIGHTLY DAMAGED (HP < 800)")
+    else:
+        lines.append("ENEMY STATUS: HEALTHY")
+    
+    lines.append("\nRANGER TEAM:")
+    for member in status["members"]:
+        status_text = "▶ ACTIVE" if member["active"] else "WAITING"
+        if member["hp"] <= 0:
+            status_text = "DEFEATED"
+            hp_display = "0"
+        else:
+            hp_percent = (member["hp"] / 150) * 100  # 150 is max possible HP
+            if hp_percent > 75:
+                hp_display = f"{member['hp']} (GOOD)"
+            elif hp_percent > 40:
+                hp_display = f"{member['hp']} (DAMAGED)"
+            else:
+                hp_display = f"{member['hp']} (CRITICAL)"
+        lines.append(f"  {member['name']:<15} - HP: {hp_display:<15} - Breath: {member['breath']} - {status_text}")
+    lines.append("╚═════════════════════════════════════════════════╝")
+    return lines
+
+
+def _battle_end(event):
+    if event["mode"] == "duel":
+        if event["outcome"] == "victory":
+            return ["\n=== VICTORY! ===", "You have defeated the enemy!"]
+        return ["\n=== DEFEAT! ===", "You have been defeated..."]
+    
+    enemy, survivors, fallen = event["enemy"], event["survivors"], event["fallen"]
+    if event["outcome"] == "victory":
+        lines = _banner("VICTORY!")
+        if "Green Ranger (You)" in survivors:
+            lines.append(f"Despite {enemy}'s immense power, you managed to defeat it!")
+            if len(survivors) == 1:
+                lines += ["You stand alone in victory, your teammates having sacrificed themselves in battle.",
+                          "Their powers weren't enough, but yours proved to be the monster's undoing."]
+            else:
+                others = ", ".join(name for name in survivors if name != "Green Ranger (You)")
+                lines.append(f"You and {others} stand victorious over the fallen monster.")
+        else:
+            lines += ["Your team has defeated the monster, but at a great cost...",
+                      "You lie defeated, your consciousness fading, but your teammates completed the mission.",
+                      "The last thing you see is the monster falling as your remaining teammates stand victorious."]
+        return lines
+    
+    lines = _banner("DEFEAT!") + [f"{enemy} has proven too powerful for your team..."]
+    if fallen and fallen[-1] == "Green Ranger (You)":
+        lines += ["You fought valiantly to the very end, but even your powers weren't enough.",
+                  f"As your vision fades, you see {enemy} lumbering toward the city...",
+                  "The mission has failed, but perhaps reinforcements will arrive in time."]
+    else:
+        lines += ["You watch helplessly as your last teammate falls to the monster's attacks.",
+                  "Unable to continue the fight, darkness closes in around you."]
+    return lines
+
+
+def describe(event):
+    """The console text for one event, as a list of lines."""
+    kind = event["type"]
+    actor, target = event.get("actor"), event.get("target")
+    if kind == "battle_start":
+        return list(TEAM_INTRO) if event["mode"] == "team" else ["Combat begins!", "=============="]
+    if kind == "battle_end":
+        return _battle_end(event)
+    if kind == "turn_start":
+        status = event["status"]
+        lines = [f"\n--- Turn {event['turn']} ---"]
+        if "members" in status:
+            lines += _team_status(status)
+        else:
+            lines += [f"Player HP: {status['player']['hp']} | Enemy HP: {status['enemy']['hp']}",
+                      f"Player Breath: {status['player']['breath']} | Enemy Breath: {status['enemy']['breath']}"]
+        return lines + ["\n[CHECKPOINT] Beginning of turn"]
+    if kind == "actor_turn":
+        return [f"\n{actor}'s turn!"]
+    if kind == "enemy_turn":
+        return ["\n[CHECKPOINT] After player turn", f"\n{actor}'s turn!"]
+    if kind == "turn_end":
+        lines = ["\n[CHECKPOINT] End of turn"]
+        living = event.get("living", [])
+        # Dramatic beat for last ranger standing
+        if len(living) == 1 and "Green" in living[0] and event["turn"] % 3 == 0:
+            lines += _banner("LAST RANGER STANDING") + [
+                "You stand alone against Baby-Green, your teammates fallen around you.",
+                "With grim determination, you prepare for what might be your final attack."]
+        return lines
+    if kind == "options":
+        who = "\nYour turn!" if actor == "You" else f"\n{actor}'s turn!"
+        lines = [f"{who} Available skills:"]
+        lines += [f"- {s['name']} ({s['description']}, Cost: {s['breath_cost']} breath)" for s in event["skills"]]
+        return lines + [f"Current Breath: {event['breath']}"]
+    if kind == "stunned":
+        return ["You are stunned and skip your turn!" if actor == "You" else f"{actor} is stunned and skips their turn!"]
+    if kind == "breathe":
+        verb = "take" if actor == "You" else "takes"
+        return [f"{actor} {verb} a deep breath. Breath increased to {event['breath']}"]
+    if kind == "decision":
+        return [f"{actor} chooses to use {event['skill'].upper()}!"] if event["auto"] else []
+    if kind == "invalid":
+        if event["reason"] == "unknown":
+            return [f"Skill '{event['skill']}' not found!"]
+        return [f"Not enough breath to use {event['skill']}!"]
+    if kind == "retry":
+        return ["Try again with a valid move."]
+    if kind == "hit":
+        return [f"{actor} used {event['skill']} for {event['amount']} damage!"]
+    if kind == "skill":
+        return [line.format(actor=actor, target=target) for line in SKILL_LINES.get(event["skill"].lower(), [])]
+    if kind == "damage":
+        template = DAMAGE_LINES.get(event["cause"], "{target} takes {amount} damage!")
+        return template.format(target=target, amount=event["amount"]).split("\n")
+    if kind == "effect":
+        if "actor" in event:
+            return [f"{actor} applied {event['effect']} effect!"]
+        return [f"{target} is now affected by {event['effect']}!"]
+    if kind == "heal":
+        return [f"{target} healed for {event['amount']} HP. Now at {event['hp']} HP!"]
+    if kind == "analyze":
+        return [f"{actor} analyzes {target}'s weaknesses!",
+                f"Weakness identified: {target} is vulnerable to coordinated attacks!",
+                "The next attack from any ranger will do +20% damage!"]
+    if kind == "power_surge":
+        return _banner("POWER SURGE!") + [
+            "Your anger at seeing your teammates fall triggers something deep within...",
+            "A surge of power flows through your suit, temporarily boosting your stats!",
+            f"Hands +2 (Now {event['hands']})", f"Spine +2 (Now {event['spine']})", f"Breath +1 (Now {event['breath']})"]
+    if kind == "area_attack":
+        return [f"\n{actor}'s eyes glow with toxic rage as it prepares a massive attack!",
+                f"{actor} unleashes a spray of corrosive acid across the battlefield!"]
+    if kind == "regenerate":
+        return [f"\n{actor}'s wounds begin to bubble and mend themselves!",
+                f"{actor} regenerates {event['amount']} HP! Current HP: {event['hp']}"]
+    if kind == "enemy_attack":
+        if target is None:
+            return [f"{actor} uses {event['skill']}!"]
+        lines = [f"\n{actor} focuses its attention on you specifically!"] if target == "Green Ranger (You)" else []
+        return lines + [f"{actor} uses {event['skill']} on {target}!"]
+    if kind == "defeated":
+        return [f"\n{DEATH_MESSAGES.get(target, f'{target} is defeated!')}"]
+    return []
+
+
+class Pacing:
+    """How long a front-end lingers on each beat of a fight, scaled from the original console timings."""
+    BEATS = {"decision": 0.5, "area_attack": 0.5, "turn_end": 0.5}
+    INTRO_LINE = 1.0  # Between the lines of the battle intro
+    LAST_RANGER = 1.0  # Extra beat when only one ranger is left standing
+    
+    def __init__(self, name, scale):
+        self.name = name
+        self.scale = scale
+    
+    def line_gap(self, event):
+        """Seconds between the lines of one event"""
+        return self.INTRO_LINE * self.scale if event["type"] == "battle_start" else 0.0
+    
+    def after(self, event, lines):
+        """Seconds to hold once an event is shown"""
+        if not lines or not self.scale:
+            return 0.0
+        pause = self.BEATS.get(event["type"], 0)
+        if event["type"] == "turn_end" and len(lines) > 1:
+            pause += self.LAST_RANGER
+        return pause * self.scale
+
+
+PACING = {
+    "instant": Pacing("instant", 0.0),     # Tests, simulations, servers replying at once
+    "fast": Pacing("fast", 0.25),
+    "cinematic": Pacing("cinematic", 1.0),  # The original console game
+}
+
+
+def pacing_for(pacing):
+    """A Pacing from its name (or a Pacing itself)"""
+    if not isinstance(pacing, str):
+        return pacing
+    if pacing not in PACING:
+        raise ValueError(f"Unknown pacing {pacing!r}; choose one of {', '.join(PACING)}")
+    return PACING[pacing]
+
+
+def env_pacing(default="cinematic"):
+    """The pacing named by COMBAT_PACING, falling back to `default` (with a warning) if it's not one we know"""
+    name = os.getenv("COMBAT_PACING", default).strip().lower()
+    if name not in PACING:
+        print(f"Unknown COMBAT_PACING={name!r} (choose {', '.join(PACING)}); using {default}", file=sys.stderr)
+        return default
+    return name
+
+
+class ConsoleRenderer:
+    """Prints events as they happen, pausing on dramatic beats as the pacing asks."""
+    def __init__(self, out=None, pacing="cinematic"):
+        self.out = out or sys.stdout
+        self.pacing = pacing_for(pacing)
+    
+    def __call__(self, event):
+        lines = describe(event)
+        gap = self.pacing.line_gap(event)
+        for i, line in enumerate(lines):
+            if gap and i:
+                time.sleep(gap)
+            print(line, file=self.out)
+        pause = self.pacing.after(event, lines)
+        if pause:
+            time.sleep(pause)
+
+
+class JsonRenderer:
+    """Streams each event plus its text as one JSON line (a socket file, HTTP response body, ...).
+    
+    Never waits: "delay" (seconds to hold after the event) and "line_gap" are hints for the client's animation.
+    """
+    def __init__(self, stream, pacing="cinematic"):
+        self.stream = stream
+        self.pacing = pacing_for(pacing)
+    
+    def __call__(self, event):
+        lines = describe(event)
+        self.stream.write(json.dumps(dict(event, text=lines, delay=self.pacing.after(event, lines),
+                                          line_gap=self.pacing.line_gap(event))) + "\n")
+        self.stream.flush()
+
+
+async def play(events, show, pacing="cinematic"):
+    """Show recorded events (Battle.events) at the pacing's rhythm without blocking the event loop.
+    
+    show(event, lines) is called for each event and may be a coroutine function (e.g. a websocket send).
+    """
+    pacing = pacing_for(pacing)
+    for event in events:
+        lines = describe(event)
+        shown = show(event, lines)
+        if asyncio.iscoroutine(shown):
+            await shown
+        pause = pacing.after(event, lines) + pacing.line_gap(event) * max(len(lines) - 1, 0)
+        if pause:
+            await asyncio.sleep(pause)
+
+
+class ConsolePolicy:
+    """The human player typing moves; asked again after an invalid one."""
+    interactive = True
+    
+    def __init__(self, prompt="\nEnter your move: "):
+        self.prompt = prompt
+    
+    def choose(self, actor, battle):
+        return input(self.prompt).strip().lower()
@@ -0,0 +1,306 @@
+# combat_replay.py
+
+# Compact replay logs for combat.py duels and team_combat.py battles.
+# The rules' dice never depend on how a decision was made (policies draw from their own stream,
+# see combat_core.Battle), so a fight is fixed by its seed and the decisions taken. A log is one
+# JSON line per fight:
+#   {"v":1,"mode":"team","encounter":"mint_baby_green","seed":42,"max_turns":1000,"humans":[0],
+#    "start":[[120,2],...],"actions":[[0,"punch"],[-1,["Stomp",2]],...],"outcome":"defeat","turns":23,"final":[...]}
+# Actors are team slots (the duel's player is 0) and -1 for the enemy. Replaying hands the actions
+# back as every combatant's policy and runs the rules headless at full speed.
+#
+#   python combat_replay.py record fights.jsonl --fights 1000     # scripted fights, seeds 0..999
+#   python combat_replay.py verify fights.jsonl                   # do they still play out the same?
+#   python combat_replay.py show fights.jsonl --index 3 --turn 12 # state and story of one turn
+#   python combat_replay.py diff old.jsonl new.jsonl --index 3    # where two runs part ways
+
+import argparse
+import json
+import os
+import time
+
+import combat
+import team_combat
+from combat_render import describe
+
+VERSION = 1
+REPLAY_FILE = os.getenv("REPLAY_FILE", os.path.join("logs", "replays.jsonl"))
+
+
+class ReplayDivergence(Exception):
+    """A replayed fight wanted a decision the log doesn't have (the rules changed since recording)"""
+
+
+def _actors(battle):
+    """(actor key, combatant) in log order"""
+    if hasattr(battle, "team"):
+        return list(enumerate(battle.team.members)) + [(-1, battle.enemy)]
+    return [(0, battle.player), (-1, battle.enemy)]
+
+
+def _encode(choice, actor, battle):
+    if not isinstance(choice, tuple):
+        return choice  # A skill name, or None
+    skill, target = choice
+    if target is None or target is actor:
+        return [skill, None if target is None else "self"]
+    if target is battle.team:
+        return [skill, "team"]
+    return [skill, battle.team.members.index(target)]
+
+
+def _decode(value, actor, battle):
+    if not isinstance(value, list):
+        return value
+    skill, target = value
+    if target == "self":
+        return skill, actor
+    if target == "team":
+        return skill, battle.team
+    return skill, None if target is None else battle.team.members[target]
+
+
+class _Recording:
+    """Wraps a policy and logs what it chooses"""
+    def __init__(self, policy, key, actions):
+        self.policy = policy
+        self.key = key
+        self.actions = actions
+        self.interactive = getattr(policy, "interactive", False)
+    
+    def choose(self, actor, battle):
+        choice = self.policy.choose(actor, battle)
+        self.actions.append([self.key, _encode(choice, actor, battle)])
+        return choice
+
+
+class Recorder:
+    """Logs every decision in a seeded battle; attach before it starts, call entry() once it's over.
+    
+    log: a partial entry to keep appending to, for a fight restored mid-way (see combat_session.py)
+    """
+    def __init__(self, battle, log=None):
+        if battle.seed is None:
+            raise ValueError("Only battles created with a seed can be replayed")
+        self.battle = battle
+        actors = _actors(battle)
+        if log is not None:
+            self.actions = log["actions"]
+            self.header = {k: v for k, v in log.items() if k not in ("actions", "outcome", "turns", "final")}
+        else:
+            self.actions = []
+            self.header = {"v": VERSION, "mode": "team" if hasattr(battle, "team") else "duel", "seed": battle.seed,
+                           "max_turns": battle.max_turns}
+            if self.header["mode"] == "team":
+                self.header["encounter"] = battle.encounter_id
+            self.header["humans"] = [key for key, c in actors if getattr(c.policy, "interactive", False)]
+            self.header["start"] = [[c.stats['hp'], c.stats['Breath']] for _, c in actors]
+        for key, c in actors:
+            c.policy = _Recording(c.policy, key, self.actions)
+    
+    def entry(self):
+        battle = self.battle
+        return dict(self.header, actions=self.actions, outcome=battle.outcome, turns=battle.turn,
+                    final=[c.stats['hp'] for _, c in _actors(battle)])
+
+
+class _Cursor:
+    def __init__(self, actions):
+        self.actions = actions
+        self.pos = 0
+
+
+class _Replaying:
+    """Hands one actor its logged decisions, in order"""
+    def __init__(self, key, interactive, cursor):
+        self.key = key
+        self.interactive = interactive
+        self.cursor = cursor
+    
+    def choose(self, actor, battle):
+        cursor = self.cursor
+        if cursor.pos >= len(cursor.actions):
+            raise ReplayDivergence(f"turn {battle.turn}: {actor.name} needs a decision past the end of the log")
+        key, value = cursor.actions[cursor.pos]
+        if key != self.key:
+            raise ReplayDivergence(f"turn {battle.turn}: {actor.name} is deciding but the log has actor {key}")
+        cursor.pos += 1
+        return _decode(value, actor, battle)
+
+
+def build(entry, **kwargs):
+    """A fresh battle that will replay a log entry; kwargs go to the Battle (on_event, record)."""
+    if entry["v"] != VERSION:
+        raise ValueError(f"Unsupported replay version {entry['v']}")
+    if entry["mode"] == "team":
+        battle = team_combat.create_battle(encounter_id=entry["encounter"], seed=entry["seed"],
+                                           max_turns=entry["max_turns"], **kwargs)
+    else:
+        battle = combat.create_duel(seed=entry["seed"], max_turns=entry["max_turns"], **kwargs)
+    
+    battle.replay_cursor = _Cursor(entry["actions"])
+    for (key, c), (hp, breath) in zip(_actors(battle), entry["start"]):
+        c.stats['hp'], c.stats['Breath'] = hp, breath
+        c.policy = _Replaying(key, key in entry["humans"], battle.replay_cursor)
+    return battle
+
+
+def replay(entry, **kwargs):
+    """Replay a whole fight; returns the finished battle"""
+    battle = build(entry, **kwargs)
+    battle.run()
+    return battle
+
+
+def check(entry):
+    """None if the entry still plays out exactly as logged, otherwise what differs"""
+    try:
+        battle = replay(entry, record=False)
+    except ReplayDivergence as e:
+        return str(e)
+    unused = len(entry["actions"]) - battle.replay_cursor.pos
+    if unused:
+        return f"ended on turn {battle.turn} with {unused} logged decisions unused"
+    got = (battle.outcome, battle.turn, [c.stats['hp'] for _, c in _actors(battle)])
+    want = (entry["outcome"], entry["turns"], entry["final"])
+    if got != want:
+        return f"logged {want[0]} on turn {want[1]} with HP {want[2]}, replayed {got[0]} on turn {got[1]} with HP {got[2]}"
+    return None
+
+
+def _events(entry):
+    """A fight's events as replayed under the current rules, up to any divergence"""
+    battle = build(entry)
+    try:
+        battle.run()
+    except ReplayDivergence as e:
+        battle.events.append({"type": "divergence", "turn": battle.turn, "reason": str(e)})
+    return battle.events
+
+
+def diff(entry_a, entry_b):
+    """Where two logged fights part ways: the first differing decision and the first differing event.
+    
+    Returns {"decision": (index, a, b) or None, "event": (index, a, b) or None}; both None if identical.
+    """
+    found = {"decision": None, "event": None}
+    actions_a, actions_b = entry_a["actions"], entry_b["actions"]
+    for i in range(max(len(actions_a), len(actions_b))):
+        a = actions_a[i] if i < len(actions_a) else None
+        b = actions_b[i] if i < len(actions_b) else None
+        if a != b:
+            found["decision"] = (i, a, b)
+            break
+    
+    events_a, events_b = _events(entry_a), _events(entry_b)
+    for i in range(max(len(events_a), len(events_b))):
+        a = events_a[i] if i < len(events_a) else None
+        b = events_b[i] if i < len(events_b) else None
+        if a != b:
+            found["event"] = (i, a, b)
+            break
+    return found
+
+
+def save(entry, path=REPLAY_FILE):
+    """Append a fight to a replay log"""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+
+def load(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def record_fights(path, fights, seed=0, mode="team"):
+    """Play scripted fights with seeds seed..seed+fights-1 and log them to a new file"""
+    if os.path.exists(path):
+        os.remove(path)
+    for i in range(fights):
+        if mode == "team":
+            battle = team_combat.create_battle(seed=seed + i, record=False)
+        else:
+            battle = combat.create_duel(seed=seed + i, record=False)
+        recorder = Recorder(battle)
+        battle.run()
+        save(recorder.entry(), path)
+
+
+def show(entry, turn=None):
+    """Print one turn of a fight (the last by default): the state before it and what happened"""
+    battle = build(entry, record=False)
+    turn = turn or entry["turns"]
+    while battle.outcome is None and battle.turn < turn - 1:
+        battle.play_turn()
+    if battle.outcome is not None:
+        print(f"The fight ended ({battle.outcome}) on turn {battle.turn}")
+        return
+    battle.record = True
+    battle.play_turn()
+    for event in battle.events:
+        for line in describe(event):
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record, verify and inspect combat replays")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rec = commands.add_parser("record", help="Log scripted fights")
+    rec.add_argument("file")
+    rec.add_argument("--fights", type=int, default=1000)
+    rec.add_argument("--seed", type=int, default=0)
+    rec.add_argument("--mode", choices=["team", "duel"], default="team")
+    ver = commands.add_parser("verify", help="Replay every fight and check it plays out as logged")
+    ver.add_argument("file", nargs="?", default=REPLAY_FILE)
+    sho = commands.add_parser("show", help="Jump to one turn of a fight")
+    sho.add_argument("file", nargs="?", default=REPLAY_FILE)
+    sho.add_argument("--index", type=int, default=-1, help="Which fight in the file (default: the last)")
+    sho.add_argument("--turn", type=int, default=None, help="Turn to show (default: the last)")
+    dif = commands.add_parser("diff", help="Where the same fight differs between two logs")
+    dif.add_argument("file_a")
+    dif.add_argument("file_b")
+    dif.add_argument("--index", type=int, default=0)
+    args = parser.parse_args()
+    
+    if args.command == "record":
+        started = time.perf_counter()
+        record_fights(args.file, args.fights, args.seed, args.mode)
+        print(f"Recorded {args.fights} fights to {args.file} ({os.path.getsize(args.file):,} bytes) "
+              f"in {time.perf_counter() - started:.2f}s")
+    elif args.command == "verify":
+        entries = load(args.file)
+        started = time.perf_counter()
+        failures = [(i, problem) for i, entry in enumerate(entries) if (problem := check(entry))]
+        elapsed = time.perf_counter() - started
+        for i, problem in failures[:20]:
+            print(f"  fight {i} (seed {entries[i]['seed']}): {problem}")
+        print(f"{len(entries) - len(failures)}/{len(entries)} fights reproduced exactly "
+              f"({len(entries) / elapsed:,.0f} fights/s)")
+        raise SystemExit(1 if failures else 0)
+    elif args.command == "show":
+        show(load(args.file)[args.index], args.turn)
+    else:
+        a, b = load(args.file_a)[args.index], load(args.file_b)[args.index]
+        found = diff(a, b)
+        for key in ("seed", "outcome", "turns", "final"):
+            if a[key] != b[key]:
+                print(f"  {key}: {a[key]} vs {b[key]}")
+        if found["decision"]:
+            i, x, y = found["decision"]
+            print(f"First different decision (#{i}): {x} vs {y}")
+        if found["event"]:
+            i, x, y = found["event"]
+            print(f"First different event when replayed (#{i}, turn {(x or y)['turn']}):")
+            print(f"  a: {json.dumps(x)}")
+            print(f"  b: {json.dumps(y)}")
+        if not (found["decision"] or found["event"]) and a["final"] == b["final"]:
+            print("The two fights are identical")
+        else:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# combat_runner.py
+
+# Fans Baby-Green battle simulations out over a process pool.
+# The battles are cut into fixed-size blocks and block i always gets child i of the master
+# SeedSequence, so every block draws the same random stream whichever worker runs it. The
+# partial SimResults are integer counts merged as blocks finish; the totals for a master seed
+# are therefore bit-for-bit identical for any worker count (see --verify).
+#
+#   python combat_runner.py --battles 1000000 --workers 8 --seed 42
+#   python combat_runner.py --engine scalar --battles 20000 --seed 42 --verify
+
+import argparse
+import hashlib
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from combat_sim import ENEMY_HP, SimResult, simulate_chunk, simulate_scalar
+
+# Battles per block: small enough to spread over the pool and report progress, large enough
+# to amortize process hand-off. Part of the seed layout, so changing it changes the results.
+BLOCK_SIZE = {"vector": 20_000, "scalar": 500}
+
+
+def run_block(engine, battles, seed_seq, enemy_hp=ENEMY_HP, max_turns=1000):
+    """Simulate one block from its own SeedSequence (runs inside a worker)."""
+    started = time.perf_counter()
+    if engine == "vector":
+        result = simulate_chunk(battles, np.random.default_rng(seed_seq), enemy_hp, max_turns)
+    else:
+        rng = random.Random(int.from_bytes(seed_seq.generate_state(4, np.uint32).tobytes(), "little"))
+        result = simulate_scalar(battles, enemy_hp=enemy_hp, max_turns=max_turns, rng=rng)
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def blocks(battles, seed, engine):
+    """(battles, SeedSequence) per block; depends only on the master seed, battle count and engine."""
+    size = BLOCK_SIZE[engine]
+    count = (battles + size - 1) // size
+    children = np.random.SeedSequence(seed).spawn(count)
+    return [(min(size, battles - i * size), child) for i, child in enumerate(children)]
+
+
+def run(battles, seed, workers=None, engine="vector", enemy_hp=ENEMY_HP, max_turns=1000, on_progress=None):
+    """Run `battles` simulations across `workers` processes; returns the merged SimResult.
+    
+    on_progress(partial_result, blocks_done, blocks_total) is called as each block is merged.
+    """
+    work = blocks(battles, seed, engine)
+    workers = workers or os.cpu_count() or 1
+    total = SimResult(max_turns)
+    started = time.perf_counter()
+    
+    if workers == 1:
+        for done, (size, seed_seq) in enumerate(work, 1):
+            total.merge(run_block(engine, size, seed_seq, enemy_hp, max_turns))
+            if on_progress:
+                on_progress(total, done, len(work))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_block, engine, size, seed_seq, enemy_hp, max_turns) for size, seed_seq in work]
+            for done, future in enumerate(as_completed(futures), 1):
+                total.merge(future.result())
+                if on_progress:
+                    on_progress(total, done, len(work))
+    
+    total.elapsed = time.perf_counter() - started
+    return total
+
+
+def digest(result):
+    """Fingerprint of a result's statistics (timings excluded)."""
+    h = hashlib.sha256()
+    for counts in (result.outcomes, result.turns, result.survivors, result.ranger_alive):
+        h.update(np.ascontiguousarray(counts, dtype=np.int64).tobytes())
+    return h.hexdigest()[:16]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel, reproducible Baby-Green battle simulation")
+    parser.add_argument("--battles", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0, help="Master seed; same seed, same results")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: CPU count)")
+    parser.add_argument("--engine", choices=sorted(BLOCK_SIZE), default="vector")
+    parser.add_argument("--enemy-hp", type=int, default=ENEMY_HP)
+    parser.add_argument("--progress", action="store_true", help="Print running statistics as blocks finish")
+    parser.add_argument("--verify", action="store_true",
+                        help="Also run with 1 and 3 workers and check the results are identical")
+    args = parser.parse_args()
+    
+    def progress(partial, done, total):
+        print(f"  [{done}/{total}] {partial.battles:,} battles  win rate {partial.win_rate:.3%}  "
+              f"mean turns {partial.mean_turns():.2f}")
+    
+    result = run(args.battles, args.seed, args.workers, args.engine, args.enemy_hp,
+                 on_progress=progress if args.progress else None)
+    print(result.report())
+    print(f"  {result.cpu_seconds:.2f}s of worker time, digest {digest(result)}")
+    
+    if args.verify:
+        ok = True
+        for workers in (1, 3):
+            other = run(args.battles, args.seed, workers, args.engine, args.enemy_hp)
+            same = digest(other) == digest(result)
+            ok &= same
+            print(f"  {workers} worker(s): digest {digest(other)} {'identical' if same else 'DIFFERENT'}")
+        raise SystemExit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
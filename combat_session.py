@@ -0,0 +1,355 @@
+# combat_session.py
+
+# Server-side fights as resumable state machines.
+# ConsolePolicy blocks on input() in the middle of a turn, so a process can only run one fight.
+# A FightSession never waits: advance(action) plays the fight on until the human has to decide,
+# returns the new events and leaves a prompt; nothing of the fight lives on the call stack between
+# moves. Its whole state is a small JSON-friendly dict, saved through storage.py after every move,
+# so one process can interleave any number of fights and a player can disconnect and resume.
+#
+# The state is the fight's replay log so far (combat_replay.py), a snapshot of the battle at the
+# start of the current turn (stats, turn, both RNG states) and how many of that turn's events the
+# client has seen, plus a count of the moves so far that lets submit() turn away a move made against
+# a stale prompt. advance() restores the snapshot, replays the turn's logged decisions, applies the
+# new one and plays on: only the current turn is ever re-run. A finished session's log is an ordinary
+# replay entry. Fight ids become file names (storage.check_fight_id) and saves are atomic.
+#
+#   python combat_session.py play --id ranger1        # console fight; quit any time and resume later
+#   python combat_session.py bench --fights 2000      # interleave fights, check each replays exactly
+
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+import combat
+import storage
+import team_combat
+from combat_replay import Recorder, check
+
+
+class AwaitingInput(Exception):
+    """Raised inside the rules when the human has to decide; carries the prompt for the client"""
+    def __init__(self, prompt):
+        super().__init__(prompt["actor"])
+        self.prompt = prompt
+
+
+def _prompt(actor, battle):
+    return {"turn": battle.turn, "actor": actor.name, "breath": actor.stats['Breath'],
+            "skills": [s.brief() if hasattr(s, "brief") else dict(s) for s in actor.skills],
+            "status": battle.status()}
+
+
+class _Human:
+    """The human's decisions for the current turn, then a prompt"""
+    interactive = True
+    
+    def __init__(self, moves):
+        self.moves = moves
+    
+    def choose(self, actor, battle):
+        if self.moves:
+            return self.moves.pop(0)
+        raise AwaitingInput(_prompt(actor, battle))
+
+
+def _pack_rng(rng_state):
+    version, internal, gauss = rng_state
+    return [version, base64.b64encode(array("I", internal).tobytes()).decode(), gauss]
+
+
+def _unpack_rng(rng, packed):
+    version, internal, gauss = packed
+    rng.setstate((version, tuple(array("I", base64.b64decode(internal))), gauss))
+
+
+def _create(log, human):
+    if log["mode"] == "team":
+        return team_combat.create_battle(player_policy=human, encounter_id=log["encounter"], seed=log["seed"],
+                                         max_turns=log["max_turns"])
+    return combat.create_duel(player_policy=human, seed=log["seed"], max_turns=log["max_turns"])
+
+
+def _snapshot(battle):
+    """Everything the rules carry from one turn to the next (RNG states still raw: see _packed)"""
+    snap = {"turn": battle.turn, "rng": battle.rng.getstate(), "policy_rng": battle.policy_rng.getstate(),
+            "enemy": dict(battle.enemy.stats)}
+    if hasattr(battle, "team"):
+        snap["members"] = [dict(m.stats) for m in battle.team.members]
+        snap["active"] = battle.team.active_member_index
+        snap["fallen"] = list(battle.team.fallen_rangers)
+    else:
+        snap["player"] = dict(battle.player.stats)
+    return snap
+
+
+def _packed(snap):
+    """A snapshot ready for JSON; only the last one of an advance() is packed"""
+    return dict(snap, rng=_pack_rng(snap["rng"]), policy_rng=_pack_rng(snap["policy_rng"]))
+
+
+def _restore(battle, snap):
+    battle.turn = snap["turn"]
+    _unpack_rng(battle.rng, snap["rng"])
+    _unpack_rng(battle.policy_rng, snap["policy_rng"])
+    battle.enemy.stats = dict(snap["enemy"])
+    if hasattr(battle, "team"):
+        for member, stats in zip(battle.team.members, snap["members"]):
+            member.stats = dict(stats)
+        battle.team.active_member_index = snap["active"]
+        battle.team.fallen_rangers = list(snap["fallen"])
+    else:
+        battle.player.stats = dict(snap["player"])
+
+
+class FightSession:
+    """One human's fight (team battle or duel) as a resumable state machine.
+    
+    prompt is what the human must decide next (actor, breath, skills, status), None once it's over;
+    outcome is set when the fight ends. to_dict() / from_dict() round-trip through JSON.
+    """
+    def __init__(self, state):
+        self.state = state
+    
+    @classmethod
+    def start(cls, fight_id, mode="team", encounter_id="mint_baby_green", seed=None, max_turns=1000):
+        """A new fight; call advance() to get its opening events and first prompt"""
+        storage.check_fight_id(fight_id)
+        seed = random.randrange(2**32) if seed is None else seed
+        log = {"mode": mode, "encounter": encounter_id, "seed": seed, "max_turns": max_turns}
+        battle = _create(log, _Human([]))
+        log = dict(Recorder(battle).header, actions=[])
+        return cls({"id": fight_id, "log": log, "snapshot": _packed(_snapshot(battle)), "mark": 0, "seen": 0,
+                    "moves": 0, "started": False, "prompt": None, "outcome": None})
+    
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state)
+    
+    def to_dict(self):
+        return self.state
+    
+    @property
+    def id(self):
+        return self.state["id"]
+    
+    @property
+    def prompt(self):
+        return self.state["prompt"]
+    
+    @property
+    def outcome(self):
+        return self.state["outcome"]
+    
+    @property
+    def moves(self):
+        """Moves submitted so far; a client sends it back with its next move (see submit)"""
+        return self.state["moves"]
+    
+    def entry(self):
+        """The replay log: decisions so far, and the result once the fight is over (combat_replay.check)"""
+        return self.state["log"]
+    
+    def advance(self, action=None):
+        """Submit the human's move (None to open the fight) and play on; returns the new events"""
+        state, log = self.state, self.state["log"]
+        if state["outcome"] is not None:
+            raise ValueError(f"Fight {state['id']} is already over ({state['outcome']}); start a new one")
+        if (action is None) == state["started"]:
+            raise ValueError("A move is needed to continue" if action is None else "The fight hasn't started")
+        
+        # Back to the start of the turn: the human's moves so far this turn, then the new one
+        moves = [value for key, value in log["actions"][state["mark"]:] if key in log["humans"]]
+        del log["actions"][state["mark"]:]
+        if action is not None:
+            moves.append(action)
+            state["moves"] += 1
+        battle = _create(log, _Human(moves))
+        _restore(battle, state["snapshot"])
+        recorder = Recorder(battle, log)
+        
+        seen = state["seen"]  # Events of this turn the client already has
+        snapshot, turn_start = None, 0
+        if not state["started"]:
+            battle.emit("battle_start", **battle.summary())
+            state["started"] = True
+            turn_start = len(battle.events)
+        try:
+            while battle.outcome is None:
+                if battle.max_turns and battle.turn >= battle.max_turns:
+                    battle.outcome = "timeout"
+                    break
+                battle.play_turn()
+                snapshot = _snapshot(battle)
+                state["mark"] = len(log["actions"])
+                turn_start = len(battle.events)
+        except AwaitingInput as wait:
+            if snapshot is not None:
+                state["snapshot"] = _packed(snapshot)
+            state["prompt"] = wait.prompt
+            state["seen"] = len(battle.events) - turn_start
+        else:
+            battle.emit("battle_end", outcome=battle.outcome, **battle.summary())
+            state["prompt"] = None
+            state["outcome"] = battle.outcome
+            state["log"] = recorder.entry()
+        return battle.events[seen:]
+
+
+def load(fight_id):
+    """A saved fight, or None"""
+    state = storage.get_fight(fight_id)
+    return FightSession.from_dict(state) if state else None
+
+
+def save(session):
+    storage.save_fight(session.id, session.to_dict())
+
+
+_locks = {}  # fight id -> [lock, requests holding or waiting for it]
+_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _fight_lock(fight_id):
+    """Hold the fight's lock; it is dropped once no request holds or waits for it, so idle fights keep none"""
+    with _locks_guard:
+        entry = _locks.setdefault(fight_id, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _locks_guard:
+            entry[1] -= 1
+            if not entry[1]:
+                del _locks[fight_id]
+
+
+def submit(fight_id, action, moves=None):
+    """One request from a client: load the fight, apply the move, save it; returns (session, new events).
+    
+    Requests for the same fight are serialized in this process. Pass moves (the session's count when the
+    client got its prompt) and a move made against a stale prompt raises ValueError instead of being applied;
+    so does a move for a fight that is already over.
+    """
+    with _fight_lock(fight_id):
+        session = load(fight_id)
+        if session is None:
+            raise KeyError(f"No fight {fight_id}")
+        if moves is not None and moves != session.moves:
+            raise ValueError(f"Fight {fight_id} has moved on (move {session.moves}, not {moves}); reload it")
+        events = session.advance(action)
+        save(session)
+    return session, events
+
+
+def _client_move(prompt, rng):
+    """A stand-in player: any skill it can afford"""
+    return rng.choice([s['name'] for s in prompt['skills'] if s['breath_cost'] <= prompt['breath']] or ['breathe'])
+
+
+def bench(fights, mode="team", seed=0, store=False):
+    """Interleave `fights` fights one move at a time, round-robin, with each state saved and reloaded
+    between moves (in memory as JSON, or through storage.py); then check every log replays exactly."""
+    rng = random.Random(seed)
+    saved, done = {}, []
+    started = time.perf_counter()
+    for i in range(fights):
+        session = FightSession.start(f"bench-{i}", mode, seed=seed + i)
+        session.advance()
+        saved[session.id] = session.to_dict() if store else json.dumps(session.to_dict())
+        if store:
+            save(session)
+    
+    moves = 0
+    while saved:
+        for fight_id in list(saved):
+            if store:
+                session, _ = submit(fight_id, _client_move(saved[fight_id]["prompt"], rng), saved[fight_id]["moves"])
+                saved[fight_id] = session.to_dict()
+            else:
+                session = FightSession.from_dict(json.loads(saved[fight_id]))
+                session.advance(_client_move(session.prompt, rng))
+                saved[fight_id] = json.dumps(session.to_dict())
+            moves += 1
+            if session.outcome is not None:
+                done.append(session)
+                del saved[fight_id]
+                if store:
+                    storage.delete_fight(fight_id)
+    elapsed = time.perf_counter() - started
+    
+    failures = [(s.id, problem) for s in done if (problem := check(s.entry()))]
+    return {"fights": fights, "moves": moves, "elapsed": elapsed, "failures": failures}
+
+
+def play(fight_id, mode="team", pacing="fast"):
+    """Console front-end over a session: type 'quit' to leave, run again with the same id to resume"""
+    from combat_render import ConsoleRenderer
+    render = ConsoleRenderer(pacing=pacing)
+    session = load(fight_id)
+    if session is not None and session.outcome is not None:
+        print(f"Fight {fight_id} is already over")
+        storage.delete_fight(fight_id)
+        return session.outcome
+    if session is None or session.prompt is None:
+        session = session or FightSession.start(fight_id, mode)
+        events = session.advance()
+    else:
+        print(f"Resuming fight {fight_id} on turn {session.prompt['turn']}")
+        prompt = session.prompt
+        events = [{"type": "turn_start", "turn": prompt["turn"], "status": prompt["status"]},
+                  {"type": "options", "turn": prompt["turn"], "actor": prompt["actor"], "breath": prompt["breath"],
+                   "skills": prompt["skills"]}]
+    save(session)
+    
+    while True:
+        for event in events:
+            render(event)
+        if session.outcome is not None:
+            storage.delete_fight(fight_id)
+            return session.outcome
+        move = input("\nEnter your move (or quit): ").strip().lower()
+        if move == "quit":
+            print(f"Fight saved. Resume with: python combat_session.py play --id {fight_id}")
+            return None
+        session, events = submit(fight_id, move, session.moves)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumable server-side fights")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ply = commands.add_parser("play", help="Fight in the console; quit and resume any time")
+    ply.add_argument("--id", default="console")
+    ply.add_argument("--mode", choices=["team", "duel"], default="team")
+    ply.add_argument("--pacing", choices=["instant", "fast", "cinematic"], default="fast")
+    ben = commands.add_parser("bench", help="Interleave many fights and check they replay exactly")
+    ben.add_argument("--fights", type=int, default=2000)
+    ben.add_argument("--mode", choices=["team", "duel"], default="team")
+    ben.add_argument("--seed", type=int, default=0)
+    ben.add_argument("--store", action="store_true", help="Save every move through storage.py (data/fights/)")
+    args = parser.parse_args()
+    
+    if args.command == "play":
+        outcome = play(args.id, args.mode, args.pacing)
+        if outcome:
+            print(f"Combat result: {outcome}")
+        return
+    
+    result = bench(args.fights, args.mode, args.seed, args.store)
+    for fight_id, problem in result["failures"][:20]:
+        print(f"  {fight_id}: {problem}")
+    print(f"{result['fights']} fights, {result['moves']:,} moves interleaved in {result['elapsed']:.2f}s "
+          f"({result['moves'] / result['elapsed']:,.0f} moves/s); "
+          f"{result['fights'] - len(result['failures'])}/{result['fights']} replay exactly")
+    raise SystemExit(1 if result["failures"] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,390 @@
+# combat_sim.py
+
+# Vectorized Monte Carlo simulator for the Baby-Green fight in team_combat.py.
+# Many independent battles run in lockstep as NumPy arrays (HP, Breath and stun per combatant per
+# battle); every roll, crit, stun, heal and AoE is a batched operation over the battles still running.
+# It models the scripted policies (ScriptedRangerPolicy / BabyGreenPolicy) rule for rule, quirks
+# included, so its statistics match team_combat.TeamBattle; `--check` compares the two.
+# Its tables are built at import time from the mint_baby_green encounter in data/ (encounters.json,
+# combatants.json, skills.json), so rebalancing a stat or skill there needs no change here; the
+# policies' logic (who uses which move when) is code, as it is in team_combat.
+#
+#   python combat_sim.py --battles 1000000
+#   python combat_sim.py --check          # statistical comparison with team_combat
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from skills import combatant, encounter, registry
+
+ENCOUNTER = "mint_baby_green"
+STATS = ["Brain", "Spine", "Eyes", "Hands", "Legs"]
+HANDS, SPINE = STATS.index("Hands"), STATS.index("Spine")
+
+
+def _template_stats(template):
+    return [template['stats'][name] for name in STATS]
+
+
+# The encounter's line-up, and each ranger's slot by the name the scripted policy keys on
+_spec = encounter(ENCOUNTER)
+_rangers = [combatant(cid) for cid in _spec['team']]
+RANGERS = [t['name'] for t in _rangers]
+GREEN, RED, PINK, YELLOW = (next(i for i, name in enumerate(RANGERS) if color in name)
+                            for color in ("Green", "Red", "Pink", "Yellow"))
+RANGER_HP = [t['stats']['hp'] for t in _rangers]
+RANGER_BREATH = [t['stats']['Breath'] for t in _rangers]
+GREEN_HANDS, GREEN_SPINE = _rangers[GREEN]['stats']['Hands'], _rangers[GREEN]['stats']['Spine']
+
+# Ranger moves the scripted policy can pick (NONE = stunned); numbers come from data/skills.json
+BREATHE, HEAT_WAVE, FIELD_REPAIR, ACROBATIC, EARTH_SHATTER, PUNCH, KICK, NONE = range(8)
+MOVES = ["breathe", "heat_wave", "field_repair", "acrobatic_strike", "earth_shatter", "punch", "kick"]
+_skills = registry()
+_moves = [_skills[sid] for sid in MOVES]
+COST = np.array([m.breath_cost for m in _moves] + [0])
+ROLL_LO = np.array([m['damage']['min'] if 'damage' in m else 0 for m in _moves] + [0])
+ROLL_HI = np.array([m['damage']['max'] if 'damage' in m else 0 for m in _moves] + [0])
+MOVE_STAT = np.array([STATS.index(m['damage']['stat']) if 'damage' in m else -1 for m in _moves] + [-1])
+CRIT_CHANCE = np.array([m['crit']['chance'] if 'crit' in m else 0.0 for m in _moves] + [0.0])
+CRIT_BONUS = np.array([m['crit']['bonus'] if 'crit' in m else 0.0 for m in _moves] + [0.0])
+STUNS = np.array([m.get('effect') == 'stun' for m in _moves] + [False])
+REPAIR = _skills["field_repair"]['heal_team']
+HEAL_CAP = 100  # FriendlyTeam.heal_all
+# Stat multiplier per ranger and move; 0 = no damage. Green's Hands/Spine can grow (power surge).
+STAT = np.array([[t['stats'][m['damage']['stat']] if 'damage' in m else 0 for m in _moves] + [0]
+                 for t in _rangers])
+# Whether the ranger knows the move; unknown moves fall back to breathing
+KNOWS = np.array([[sid in t['skills'] for sid in MOVES] + [True] for t in _rangers], dtype=bool)
+
+# Baby-Green, with its skills in list order (the order BabyGreenPolicy picks from)
+_enemy = combatant(_spec['enemy'])
+ENEMY_HP = _enemy['stats']['hp']
+ENEMY_BREATH = _enemy['stats']['Breath']
+ENEMY_STATS = _template_stats(_enemy)
+_enemy_skills = [_skills[sid] for sid in _enemy['skills']]
+TOXIC_PUNCH, STOMP, ACID_SPRAY, REGENERATE, ENEMY_BREATHE = (_enemy['skills'].index(sid) for sid in
+                                                            ("toxic_punch", "stomp", "acid_spray", "regenerate", "breathe"))
+ENEMY_COST = np.array([s.breath_cost for s in _enemy_skills])
+ENEMY_SPENDS = np.array([s.spends_breath for s in _enemy_skills])
+# Single-target damage per skill: the stat's value and the roll range; crits if the data gives them
+ENEMY_HIT = np.array([ENEMY_STATS[STATS.index(s['damage']['stat'])] if 'damage' in s else 0 for s in _enemy_skills])
+ENEMY_LO = np.array([s['damage']['min'] if 'damage' in s else 0 for s in _enemy_skills])
+ENEMY_HI = np.array([s['damage']['max'] if 'damage' in s else 0 for s in _enemy_skills])
+ENEMY_CRIT_CHANCE = np.array([s['crit']['chance'] if 'crit' in s else 0.0 for s in _enemy_skills])
+ENEMY_CRIT_BONUS = np.array([s['crit']['bonus'] if 'crit' in s else 0.0 for s in _enemy_skills])
+ENEMY_STUNS = np.array([s.get('effect') == 'stun' for s in _enemy_skills])
+_acid = _enemy_skills[ACID_SPRAY]['area_damage']
+ACID_STAT, ACID_LO, ACID_HI = ENEMY_STATS[STATS.index(_acid['stat'])], _acid['min'], _acid['max']
+REGENERATION = _enemy_skills[REGENERATE]['heal_self']
+# Affordable skills in list order, by Breath (capped at the dearest); -1 pads
+ENEMY_LEVELS = int(ENEMY_COST.max()) + 1
+AFFORDABLE = np.array([[i for i, c in enumerate(ENEMY_COST) if c <= b] + [-1] * sum(ENEMY_COST > b)
+                       for b in range(ENEMY_LEVELS)])
+AFFORDABLE_COUNT = np.array([int((ENEMY_COST <= b).sum()) for b in range(ENEMY_LEVELS)])
+# An extra uniform per battle-turn only when an enemy hit can crit, so the stream is unchanged otherwise
+UNIFORMS = 10 if ENEMY_CRIT_CHANCE.any() else 9
+
+# The move each ranger's script reaches for first (Pink always, the others on a condition)
+SIGNATURE = np.zeros(4, dtype=np.int64)
+SIGNATURE[[GREEN, RED, PINK, YELLOW]] = [EARTH_SHATTER, HEAT_WAVE, ACROBATIC, FIELD_REPAIR]
+ALIVE_BITS = np.array([1, 2, 4, 8])
+
+
+def _next_active_table():
+    """Next active slot by (active slot, alive bitmask), following FriendlyTeam.next_member."""
+    table = np.zeros(4 * 16, dtype=np.int64)
+    for active in range(4):
+        for mask in range(16):
+            index = (active + 1) % 4
+            while not mask >> index & 1:
+                index = (index + 1) % 4
+                # The scalar loop gives up at slot 0, even when that ranger is down
+                if index == 0:
+                    break
+            table[active * 16 + mask] = index
+    return table
+
+
+NEXT_ACTIVE = _next_active_table()
+
+OUTCOMES = ["victory", "defeat", "timeout"]
+
+
+class SimResult:
+    """Aggregated outcome counts, turn-count histogram and survivor histogram; mergeable."""
+    def __init__(self, max_turns=1000):
+        self.battles = 0
+        self.outcomes = np.zeros(len(OUTCOMES), dtype=np.int64)
+        self.turns = np.zeros(max_turns + 1, dtype=np.int64)
+        self.survivors = np.zeros(len(RANGERS) + 1, dtype=np.int64)
+        self.ranger_alive = np.zeros(len(RANGERS), dtype=np.int64)
+        self.elapsed = 0.0
+        self.cpu_seconds = 0.0  # Summed wall time of merged parts (each ran in one process)
+    
+    def add(self, outcome, turn, hp):
+        """Record battles that ended with `outcome` on `turn` (hp: final ranger HP, one row per battle)."""
+        alive = hp > 0
+        self.battles += len(hp)
+        self.outcomes[OUTCOMES.index(outcome)] += len(hp)
+        self.turns[turn] += len(hp)
+        self.survivors += np.bincount(alive.sum(axis=1), minlength=len(RANGERS) + 1)
+        self.ranger_alive += alive.sum(axis=0)
+    
+    def merge(self, other):
+        self.battles += other.battles
+        self.outcomes += other.outcomes
+        self.turns += other.turns
+        self.survivors += other.survivors
+        self.ranger_alive += other.ranger_alive
+        self.cpu_seconds += other.elapsed
+        return self
+    
+    @property
+    def win_rate(self):
+        return self.outcomes[0] / self.battles if self.battles else 0.0
+    
+    def mean_turns(self):
+        return float(np.arange(len(self.turns)) @ self.turns / self.battles) if self.battles else 0.0
+    
+    def turn_percentile(self, q):
+        cumulative = np.cumsum(self.turns)
+        return int(np.searchsorted(cumulative, q / 100 * self.battles))
+    
+    def report(self):
+        lines = [f"{self.battles:,} battles in {self.elapsed:.2f}s",
+                 "  " + "  ".join(f"{name} {count / self.battles:.2%}" for name, count in zip(OUTCOMES, self.outcomes)),
+                 f"  turns: mean {self.mean_turns():.1f}  p50 {self.turn_percentile(50)}  "
+                 f"p90 {self.turn_percentile(90)}  p99 {self.turn_percentile(99)}  max {np.flatnonzero(self.turns).max()}",
+                 "  survivors: " + "  ".join(f"{k}: {count / self.battles:.2%}" for k, count in enumerate(self.survivors)),
+                 "  alive at end: " + "  ".join(f"{name} {count / self.battles:.2%}"
+                                                for name, count in zip(RANGERS, self.ranger_alive))]
+        return "\n".join(lines)
+
+
+def _integers(u, lo, hi):
+    """Uniform integers in [lo, hi] from uniforms u (lo/hi may be arrays)."""
+    return lo + (u * (hi - lo + 1)).astype(np.int64)
+
+
+# Chunk state: one int32 row per field, one column per battle, so a turn works on contiguous rows
+# and dropping finished battles is a single column selection
+F_HP, F_BREATH, F_STUN = 0, 4, 8                       # four rows each, one per ranger
+F_HANDS, F_SPINE, F_ACTIVE, F_FALLEN, F_ENEMY_HP, F_ENEMY_BREATH, F_ENEMY_STUN, F_DONE = range(12, 20)
+FIELDS = 20
+
+
+def simulate_chunk(n, rng, enemy_hp=ENEMY_HP, max_turns=1000, result=None):
+    """Run n battles in lockstep and add them to result."""
+    result = result or SimResult(max_turns)
+    S = np.zeros((FIELDS, n), dtype=np.int32)
+    S[F_HP:F_HP + 4] = np.array(RANGER_HP)[:, None]
+    S[F_BREATH:F_BREATH + 4] = np.array(RANGER_BREATH)[:, None]
+    S[F_HANDS], S[F_SPINE] = GREEN_HANDS, GREEN_SPINE
+    S[F_ENEMY_HP] = enemy_hp
+    S[F_ENEMY_BREATH] = ENEMY_BREATH
+    finished = 0
+    
+    turn = 0
+    while n:
+        if turn >= max_turns:
+            result.add("timeout", turn, S[F_HP:F_HP + 4, S[F_DONE] == 0].T)
+            break
+        turn += 1
+        hp, breath, stun = S[F_HP:F_HP + 4], S[F_BREATH:F_BREATH + 4], S[F_STUN:F_STUN + 4]
+        hands, spine, active, fallen, e_hp, e_breath, e_stun, done = S[F_HANDS:]
+        flat_hp, flat_breath, flat_stun = hp.reshape(-1), breath.reshape(-1), stun.reshape(-1)
+        u = rng.random((UNIFORMS, n), dtype=np.float32)
+        
+        # --- Active ranger ---
+        a = active.copy()
+        slot = a * n + np.arange(n)  # (ranger, battle) position in the four-row blocks
+        stunned = flat_stun[slot] != 0
+        flat_stun[slot] = 0
+        
+        # Green's last-stand power surge
+        surge = ~stunned & (a == GREEN) & (fallen >= 2) & (u[0] < 0.3)
+        hands += 2 * surge
+        spine += 2 * surge
+        breath[GREEN] += surge
+        
+        alive = hp > 0
+        br = flat_breath[slot]
+        # ScriptedRangerPolicy: breathe below 2 Breath, else the signature move when its condition holds,
+        # else punch or kick
+        low_teammate = (alive & (hp < 40)).any(axis=0)
+        signature = ((a == GREEN) & (br >= 3)) | ((a == RED) & (e_hp < 100)) | (a == PINK) | \
+                    ((a == YELLOW) & low_teammate)
+        intent = np.where(signature, SIGNATURE[a], PUNCH + (u[1] >= 0.5))
+        intent[br < 2] = BREATHE
+        intent[stunned] = NONE
+        # Unknown or unaffordable moves: the scripted ranger breathes instead
+        move = a * 8 + intent
+        intent = np.where(KNOWS.ravel()[move] & (br >= COST[intent]), intent, BREATHE)
+        move = a * 8 + intent
+        
+        flat_breath[slot] = br + (intent == BREATHE) - COST[intent]
+        stat = STAT.ravel()[move]
+        green = a == GREEN
+        stat = np.where(green & (MOVE_STAT[intent] == HANDS), hands, stat)
+        stat = np.where(green & (MOVE_STAT[intent] == SPINE), spine, stat)
+        damage = stat * _integers(u[2], ROLL_LO[intent], ROLL_HI[intent])
+        crit = (damage > 0) & (u[3] < CRIT_CHANCE[intent])
+        damage += (damage * CRIT_BONUS[intent]).astype(np.int64) * crit
+        e_hp -= damage
+        e_stun |= STUNS[intent]
+        
+        # Field Repair: heals living rangers, capped at 100
+        np.copyto(hp, np.minimum(hp + REPAIR, HEAL_CAP), where=alive & (intent == FIELD_REPAIR))
+        
+        won = e_hp <= 0
+        
+        # --- Baby-Green ---
+        acting = ~won & (e_stun == 0)
+        e_stun[:] = 0  # Stun costs exactly one turn
+        acid = acting & (e_hp < 500) & (e_breath >= 3)
+        regen = acting & ~acid & (e_hp < 300) & (e_breath >= 2) & (u[4] < 0.4)
+        basic = acting & ~acid & ~regen
+        
+        alive = hp > 0
+        if acid.any():
+            hp -= (ACID_STAT * _integers(u[5], ACID_LO, ACID_HI) * acid) * alive
+            e_breath -= ENEMY_COST[ACID_SPRAY] * acid
+        if regen.any():
+            e_breath -= ENEMY_COST[REGENERATE] * regen
+            e_hp += REGENERATION * regen
+        
+        level = np.minimum(e_breath, ENEMY_LEVELS - 1)
+        width = AFFORDABLE.shape[1]
+        skill = AFFORDABLE.ravel()[level * width + (u[6] * AFFORDABLE_COUNT[level]).astype(np.int64)]
+        skill = np.where(basic, skill, -1)
+        # Target: 30% the Green Ranger if alive, otherwise any living ranger
+        living = alive.sum(axis=0)
+        pick = (u[7] * living).astype(np.int64)
+        seen = alive[0].astype(np.int64)
+        target = (seen <= pick).astype(np.int64)
+        for r in (1, 2):
+            seen += alive[r]
+            target = target + (seen <= pick)
+        target = np.where(alive[GREEN] & (u[8] < 0.3), GREEN, target)
+        
+        # u[5] is free again: Acid Spray and a single-target attack never happen in the same battle-turn
+        picked = skill >= 0
+        hit = np.where(picked, ENEMY_HIT[skill] * _integers(u[5], ENEMY_LO[skill], ENEMY_HI[skill]), 0)
+        if UNIFORMS > 9:
+            hit += (hit * ENEMY_CRIT_BONUS[skill]).astype(np.int64) * ((hit > 0) & (u[9] < ENEMY_CRIT_CHANCE[skill]))
+        hit_slot = target * n + np.arange(n)
+        flat_hp[hit_slot] -= hit
+        flat_stun[hit_slot] |= picked & ENEMY_STUNS[skill]
+        # Moves that don't spend breath (Toxic Punch, Stomp) cost nothing; Acid Spray / Regenerate
+        # aimed at one ranger only spend breath
+        e_breath += (skill == ENEMY_BREATHE) - ENEMY_COST[skill] * ENEMY_SPENDS[skill] * picked
+        
+        standing = hp > 0
+        fallen += (alive & ~standing).sum(axis=0)
+        standing_mask = ALIVE_BITS @ standing
+        lost = ~won & (standing_mask == 0)
+        active[:] = NEXT_ACTIVE[a * 16 + standing_mask]
+        
+        # Finished battles are frozen until enough pile up to be worth dropping
+        fresh = done == 0
+        won &= fresh
+        lost &= fresh
+        if won.any():
+            result.add("victory", turn, hp[:, won].T)
+        if lost.any():
+            result.add("defeat", turn, hp[:, lost].T)
+        done |= won | lost
+        finished += int(won.sum() + lost.sum())
+        if finished and (finished * 8 >= n or finished == n):
+            S = S.compress(done == 0, axis=1)  # stays C-contiguous, so reshape(-1) keeps returning views
+            n = S.shape[1]
+            finished = 0
+    return result
+
+
+def simulate(battles, seed=None, enemy_hp=ENEMY_HP, max_turns=1000, chunk_size=20_000, rng=None):
+    """Simulate `battles` Baby-Green fights; returns a SimResult."""
+    rng = rng if rng is not None else np.random.default_rng(seed)
+    result = SimResult(max_turns)
+    started = time.perf_counter()
+    remaining = battles
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        simulate_chunk(size, rng, enemy_hp, max_turns, result)
+        remaining -= size
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def simulate_scalar(battles, seed=0, enemy_hp=ENEMY_HP, max_turns=1000, rng=None):
+    """The same statistics from team_combat's rules, one headless battle at a time (rng: a random.Random)."""
+    import random
+    import team_combat
+    
+    rng = rng if rng is not None else random.Random(seed)
+    result = SimResult(max_turns)
+    started = time.perf_counter()
+    for _ in range(battles):
+        battle = team_combat.create_battle(rng=rng, record=False, max_turns=max_turns)
+        battle.enemy.stats['hp'] = enemy_hp
+        outcome = battle.run()
+        result.add(outcome, battle.turn, np.array([[m.stats['hp'] for m in battle.team.members]]))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def compare(vector, scalar):
+    """Two-sample z-scores for win rate, mean turns and each survivor-count share."""
+    def z_proportion(a, n_a, b, n_b):
+        p = (a + b) / (n_a + n_b)
+        se = math.sqrt(p * (1 - p) * (1 / n_a + 1 / n_b))
+        return (a / n_a - b / n_b) / se if se else 0.0
+    
+    def turn_moments(result):
+        t = np.arange(len(result.turns))
+        mean = t @ result.turns / result.battles
+        return mean, (t - mean) ** 2 @ result.turns / result.battles
+    
+    scores = {"win_rate": z_proportion(vector.outcomes[0], vector.battles, scalar.outcomes[0], scalar.battles)}
+    (m_v, var_v), (m_s, var_s) = turn_moments(vector), turn_moments(scalar)
+    scores["mean_turns"] = (m_v - m_s) / math.sqrt(var_v / vector.battles + var_s / scalar.battles)
+    for k in range(len(RANGERS) + 1):
+        scores[f"survivors={k}"] = z_proportion(vector.survivors[k], vector.battles, scalar.survivors[k], scalar.battles)
+    return scores
+
+
+def check(scalar_battles=20_000, vector_battles=200_000, seed=7, enemy_hp=ENEMY_HP, limit=4.0):
+    """Statistical check that the vectorized engine matches team_combat; True if every |z| < limit."""
+    vector = simulate(vector_battles, seed=seed, enemy_hp=enemy_hp)
+    scalar = simulate_scalar(scalar_battles, seed=seed, enemy_hp=enemy_hp)
+    ok = True
+    print(f"Baby-Green HP {enemy_hp}: vectorized {vector.win_rate:.2%} wins, {vector.mean_turns():.1f} turns | "
+          f"scalar {scalar.win_rate:.2%} wins, {scalar.mean_turns():.1f} turns")
+    for name, z in compare(vector, scalar).items():
+        passed = abs(z) < limit
+        ok &= passed
+        print(f"  {name:<14} z = {z:+.2f}  {'ok' if passed else 'MISMATCH'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo balance simulation for the Baby-Green fight")
+    parser.add_argument("--battles", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--enemy-hp", type=int, default=ENEMY_HP)
+    parser.add_argument("--check", action="store_true", help="Compare statistically against team_combat's scalar rules")
+    args = parser.parse_args()
+    
+    if args.check:
+        ok = all([check(enemy_hp=args.enemy_hp), check(enemy_hp=400, seed=11)])
+        print("Vectorized engine matches the scalar rules" if ok else "Vectorized engine DIVERGES from the scalar rules")
+        raise SystemExit(0 if ok else 1)
+    
+    print(simulate(args.battles, seed=args.seed, enemy_hp=args.enemy_hp).report())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+# combat_solver.py
+
+# Exact victory probability and expected length of a 1v1 duel (combat.py), by dynamic programming.
+# Damage is stat * uniform roll and HP only goes down, so a duel is a finite Markov chain over
+# (player HP, enemy HP, player breath, enemy breath, player stunned) at the start of each turn.
+# HP levels are solved bottom-up, one anti-diagonal (player HP + enemy HP) at a time. The only
+# way to stay on a level is a turn with no damage (breathe, shove, a 0 roll); those loops are
+# summed exactly by one matrix inverse that every level shares. Each half of a turn moves only
+# one combatant's breath, so the rest is small matrix products over that axis.
+#
+# Breath is unbounded in the rules; the solver caps it at breath_cap (breathing at the cap keeps it
+# there). Piling up that much breath in one fight is vanishingly rare; --check compares the
+# solution with the engine itself.
+#
+# Results are cached per matchup (stats other than HP, skills, policies) and cover every HP up to
+# the starting values, so after the solve at fight start any later state of that fight is a table
+# lookup: solution.at(duel), or solve(...).victory(hp, enemy_hp, breath, enemy_breath).
+#
+#   python combat_solver.py                              # the standard sparring match
+#   python combat_solver.py --player-policy greedy --check
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+# combat.py's skill effects by name (see CombatParticipant.use_skill); other skills only cost breath
+DAMAGE = {'punch': ('Hands', 0, 6), 'kick': ('Legs', 0, 10)}
+STUN = {'shove'}
+BREATHE = 'breathe'
+
+BREATH_CAP = 16
+CACHE_SIZE = 64  # Matchups kept solved
+
+
+def random_model(breath, skills, stats):
+    """RandomSkillPolicy: uniform over the affordable skills"""
+    available = [s['name'] for s in skills if breath >= s['breath_cost']]
+    return [(1 / len(available), name) for name in available] if available else [(1.0, None)]
+
+
+def greedy_model(breath, skills, stats):
+    """The affordable skill with the most expected damage; breathe when none is affordable"""
+    best, best_damage = 'Breathe', 0
+    for s in skills:
+        rule = DAMAGE.get(s['name'].lower())
+        if rule and breath >= s['breath_cost']:
+            stat, lo, hi = rule
+            damage = stats[stat] * (lo + hi) / 2
+            if damage > best_damage:
+                best, best_damage = s['name'], damage
+    return [(1.0, best)]
+
+
+# Policy models by name: model(breath, skills, stats) -> [(probability, skill name or None)]
+MODELS = {"random": random_model, "greedy": greedy_model}
+
+
+class ModelPolicy:
+    """Plays a policy model in the engine, so --check can compare the solver against real duels"""
+    interactive = False
+    
+    def __init__(self, name):
+        self.model = MODELS[name]
+    
+    def choose(self, actor, battle):
+        options = self.model(actor.stats['Breath'], actor.skills, actor.stats)
+        r = battle.policy_rng.random()
+        for p, name in options:
+            r -= p
+            if r < 0:
+                return name
+        return options[-1][1]
+
+
+def _half_turn(stats, skills, model, cap, is_player):
+    """One combatant's action as {damage dealt: matrix}.
+    
+    Rows are (stunned, breath) before the action, columns (opponent now stunned, breath) after,
+    both indexed stun * cap + breath.
+    """
+    by_name = {s['name'].lower(): s for s in skills}
+    mats = {}
+    
+    def add(damage, row, col, p):
+        if damage not in mats:
+            mats[damage] = np.zeros((2 * cap, 2 * cap))
+        mats[damage][row, col] += p
+    
+    for b in range(cap):
+        add(0, cap + b, b, 1.0)  # Stunned: the action is skipped and the stun wears off
+        for p, name in model(b, skills, stats):
+            skill = by_name.get(name.lower()) if name else None
+            if skill is None or b < skill['breath_cost']:
+                if is_player or name is None:
+                    # Player.take_turn breathes after a failed move, Enemy.take_turn when it has none
+                    add(0, b, min(b + 1, cap - 1), p)
+                else:
+                    add(0, b, b, p)  # The enemy's move just fails
+                continue
+            left = b - skill['breath_cost']
+            key = skill['name'].lower()
+            if key in DAMAGE:
+                stat, lo, hi = DAMAGE[key]
+                for roll in range(lo, hi + 1):
+                    add(stats[stat] * roll, b, left, p / (hi - lo + 1))
+            elif key in STUN:
+                add(0, b, cap + left, p)
+            elif key == BREATHE:
+                add(0, b, min(left + 1, cap - 1), p)
+            else:
+                add(0, b, left, p)
+    return mats
+
+
+class DuelSolution:
+    """Victory probability and expected turns for every start-of-turn state of one matchup"""
+    def __init__(self, table, cap):
+        # table[player hp, enemy hp, 0 = victory / 1 = turns, player stunned, player breath, enemy breath]
+        self.table = table
+        self.cap = cap
+        self.max_hp = (table.shape[0] - 1, table.shape[1] - 1)
+    
+    def _lookup(self, kind, player_hp, enemy_hp, player_breath, enemy_breath, player_stunned):
+        if enemy_hp <= 0:
+            return (1.0, 0.0)[kind]
+        if player_hp <= 0:
+            return 0.0
+        if player_hp > self.max_hp[0] or enemy_hp > self.max_hp[1]:
+            raise ValueError(f"HP above the solved range {self.max_hp}")
+        cap = self.cap - 1
+        return float(self.table[player_hp, enemy_hp, kind, int(bool(player_stunned)),
+                                min(player_breath, cap), min(enemy_breath, cap)])
+    
+    def victory(self, player_hp, enemy_hp, player_breath=1, enemy_breath=1, player_stunned=False):
+        """Probability the player wins from the start of a turn in this state"""
+        return self._lookup(0, player_hp, enemy_hp, player_breath, enemy_breath, player_stunned)
+    
+    def expected_turns(self, player_hp, enemy_hp, player_breath=1, enemy_breath=1, player_stunned=False):
+        """Expected turns left, counting the one that ends the fight"""
+        return self._lookup(1, player_hp, enemy_hp, player_breath, enemy_breath, player_stunned)
+    
+    def at(self, duel):
+        """(victory probability, expected turns left) for a Duel between turns"""
+        state = (duel.player.stats['hp'], duel.enemy.stats['hp'], duel.player.stats['Breath'],
+                 duel.enemy.stats['Breath'], duel.player.stats['effect'] == 'stun')
+        return self.victory(*state), self.expected_turns(*state)
+
+
+def _solve(player_stats, player_skills, enemy_stats, enemy_skills, player_policy, enemy_policy, cap):
+    hp_p, hp_e = player_stats['hp'], enemy_stats['hp']
+    player = _half_turn(player_stats, player_skills, MODELS[player_policy], cap, True)
+    enemy = _half_turn(enemy_stats, enemy_skills, MODELS[enemy_policy], cap, False)
+    zero = np.zeros((2 * cap, 2 * cap))
+    a0, b0 = player.pop(0, zero), enemy.pop(0, zero)
+    
+    # V[p, e, k, s, bp, be]: start of a turn (k: 0 victory, 1 turns; s: player stunned).
+    # W[p, e, k, t, bp, be]: after the player's action (t: enemy stunned).
+    # Row p = 0 is a defeat (all zeros); column e = 0 of W is a victory.
+    V = np.zeros((hp_p + 1, hp_e + 1, 2, 2, cap, cap))
+    W = np.zeros_like(V)
+    W[:, 0, 0] = 1.0
+    
+    def player_acts(a, w):
+        # (s, bp) x (t, bp') over w[..., t, bp', be]
+        return (a @ w.reshape(-1, 2, 2 * cap, cap)).reshape(w.shape)
+    
+    def enemy_acts(b, v):
+        # (t, be) x (u, be') over v[..., u, bp, be'], with bp carried through
+        v = v.transpose(0, 1, 3, 2, 4).reshape(-1, 2, cap, 2 * cap)
+        return (v @ b.T).reshape(-1, 2, cap, 2, cap).transpose(0, 1, 3, 2, 4)
+    
+    # Staying on one HP level: both actions deal no damage. N = (I - Q)^-1 over the flat
+    # (s, bp, be) state sums every such loop.
+    eye = np.eye(cap)
+    A = np.einsum('sxty,bc->sxbtyc', a0.reshape(2, cap, 2, cap), eye)  # (s, bp, be) -> (t, bp', be)
+    B = np.einsum('tbuc,xy->txbuyc', b0.reshape(2, cap, 2, cap), eye)  # (t, bp, be) -> (u, bp, be')
+    size = 2 * cap * cap
+    Q = A.reshape(size, size) @ B.reshape(size, size)
+    try:
+        N = np.linalg.inv(np.eye(size) - Q)
+    except np.linalg.LinAlgError:
+        raise ValueError("These policies can stall forever without dealing damage")
+    
+    for total in range(2, hp_p + hp_e + 1):
+        P = np.arange(max(1, total - hp_e), min(hp_p, total - 1) + 1)
+        E = total - P
+        # After the player's action: the enemy's damaging moves lead to lower player HP (known)
+        Wx = np.zeros((len(P), 2, 2, cap, cap))
+        for damage, b in enemy.items():
+            Wx += enemy_acts(b, V[np.maximum(P - damage, 0), E])
+        # Start of turn: the player's damaging moves lead to lower enemy HP (known), plus the
+        # no-damage move into this level's W
+        rhs = player_acts(a0, Wx)
+        for damage, a in player.items():
+            rhs += player_acts(a, W[P, np.maximum(E - damage, 0)])
+        rhs[:, 1] += 1.0  # This turn
+        level = (rhs.reshape(len(P), 2, size) @ N.T).reshape(len(P), 2, 2, cap, cap)
+        V[P, E] = level
+        W[P, E] = Wx + enemy_acts(b0, level)
+    return DuelSolution(V, cap)
+
+
+def _freeze(stats, skills):
+    """Hashable matchup side: numeric stats (not HP, Breath or stun, which the table spans) and skills"""
+    numbers = tuple(sorted((k, v) for k, v in stats.items()
+                           if isinstance(v, int) and k not in ('hp', 'Breath', 'effect')))
+    return numbers, tuple((s['name'], s['breath_cost']) for s in skills)
+
+
+_solutions = {}  # Matchup -> DuelSolution over the highest HP asked for so far, oldest first
+
+
+def solve(player_stats, player_skills, enemy_stats, enemy_skills, player_policy="random",
+          enemy_policy="random", breath_cap=BREATH_CAP):
+    """The DuelSolution for a matchup, covering every HP up to each side's stats['hp'].
+    
+    Cached by matchup without HP: a fight that has taken damage reuses the solution from its start.
+    """
+    key = (_freeze(player_stats, player_skills), _freeze(enemy_stats, enemy_skills), player_policy,
+           enemy_policy, breath_cap)
+    hp_p, hp_e = player_stats['hp'], enemy_stats['hp']
+    solution = _solutions.pop(key, None)
+    if solution is None or hp_p > solution.max_hp[0] or hp_e > solution.max_hp[1]:
+        if solution is not None:
+            hp_p, hp_e = max(hp_p, solution.max_hp[0]), max(hp_e, solution.max_hp[1])
+        solution = _solve(dict(player_stats, hp=max(hp_p, 1)), player_skills, dict(enemy_stats, hp=max(hp_e, 1)),
+                          enemy_skills, player_policy, enemy_policy, breath_cap)
+    _solutions[key] = solution
+    while len(_solutions) > CACHE_SIZE:
+        del _solutions[next(iter(_solutions))]
+    return solution
+
+
+def solve_duel(duel, player_policy="random", enemy_policy="random", breath_cap=BREATH_CAP):
+    """The DuelSolution for a Duel's two combatants; solve at fight start, then query .at(duel) as it goes"""
+    return solve(duel.player.stats, duel.player.skills, duel.enemy.stats, duel.enemy.skills,
+                 player_policy, enemy_policy, breath_cap)
+
+
+def check(duels=200_000, player_policy="random", enemy_policy="random", seed=11, limit=4.0):
+    """Simulate duels in the engine and compare with the exact solution; True if every |z| < limit."""
+    import random
+    import combat
+    from combat_core import RandomSkillPolicy
+    
+    def policy(name):
+        return RandomSkillPolicy() if name == "random" else ModelPolicy(name)
+    
+    rng = random.Random(seed)
+    solution = solve_duel(combat.create_duel(), player_policy, enemy_policy)
+    p_win = solution.victory(100, 100, 1, 1)
+    
+    wins, turns = 0, []
+    for _ in range(duels):
+        duel = combat.create_duel(player_policy=policy(player_policy), enemy_policy=policy(enemy_policy),
+                                  rng=rng, record=False)
+        wins += duel.run() == "victory"
+        turns.append(duel.turn)
+    
+    mean_turns = sum(turns) / duels
+    sd_turns = math.sqrt(sum((t - mean_turns) ** 2 for t in turns) / (duels - 1))
+    z_win = (wins / duels - p_win) / math.sqrt(p_win * (1 - p_win) / duels)
+    z_turns = (mean_turns - solution.expected_turns(100, 100, 1, 1)) / (sd_turns / math.sqrt(duels))
+    print(f"  victory   exact {p_win:.5f}  simulated {wins / duels:.5f}  z = {z_win:+.2f}")
+    print(f"  turns     exact {solution.expected_turns(100, 100, 1, 1):.4f}  simulated {mean_turns:.4f}  "
+          f"z = {z_turns:+.2f}")
+    return abs(z_win) < limit and abs(z_turns) < limit
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact odds of the combat.py sparring duel")
+    parser.add_argument("--player-policy", choices=sorted(MODELS), default="random")
+    parser.add_argument("--enemy-policy", choices=sorted(MODELS), default="random")
+    parser.add_argument("--breath-cap", type=int, default=BREATH_CAP)
+    parser.add_argument("--check", action="store_true", help="Compare with 200,000 simulated duels")
+    args = parser.parse_args()
+    
+    import combat
+    duel = combat.create_duel(record=False)
+    started = time.perf_counter()
+    solution = solve_duel(duel, args.player_policy, args.enemy_policy, args.breath_cap)  # At fight start
+    solved = time.perf_counter() - started
+    victory, turns = solution.at(duel)
+    while duel.turn < 2 and duel.outcome is None:
+        duel.play_turn()
+    started = time.perf_counter()
+    solve_duel(duel, args.player_policy, args.enemy_policy, args.breath_cap).at(duel)  # Mid-fight: a cache hit
+    cached = time.perf_counter() - started
+    
+    print(f"Player ({args.player_policy}) vs enemy ({args.enemy_policy}):")
+    print(f"  victory {victory:.9f}  defeat {1 - victory:.9f}  expected turns {turns:.6f}")
+    print(f"  solved {solution.table.shape[0] * solution.table.shape[1]:,} HP levels in {solved:.2f}s; "
+          f"query on turn {duel.turn} {cached * 1e6:.0f}us")
+    if args.check:
+        raise SystemExit(0 if check(player_policy=args.player_policy, enemy_policy=args.enemy_policy) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Bounded conversation memory for NPC conversations.
+Keeps the most recent exchanges verbatim and folds older ones into a
+running summary on a background thread, so prompt size stays flat.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+Exchange = Tuple[str, str]
+
+# One shared worker: summaries are cheap and ordering per memory is kept by the lock below
+_summary_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-summary")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+class ConversationMemory:
+    """
+    Conversation history with a token budget.
+    `summarize(previous_summary, exchanges)` returns the new summary text and
+    is only ever called off the turn's critical path. Older exchanges are folded
+    `fold_batch` at a time so the summary (and the prompt cache behind it) only
+    changes every few turns.
+    """
+    def __init__(self, summarize: Callable[[str, List[Exchange]], str],
+                 keep_last: int = 6, token_budget: int = 1500, fold_batch: int = 4):
+        self.summarize = summarize
+        self.keep_last = keep_last
+        self.fold_batch = fold_batch
+        self.token_budget = token_budget
+        self.summary = ""
+        self.recent: List[Exchange] = []
+        self.pending: List[Exchange] = []
+        self._folding = False
+        self._generation = 0  # bumped by clear(); a fold begun before it is dropped
+        self._lock = threading.Lock()
+
+    def add(self, user_input: str, npc_reply: str):
+        """Record an exchange and schedule a fold if the verbatim window is over budget."""
+        with self._lock:
+            self.recent.append((user_input, npc_reply))
+            if len(self.recent) >= self.keep_last + self.fold_batch:
+                while len(self.recent) > self.keep_last:
+                    self.pending.append(self.recent.pop(0))
+            while len(self.recent) > 1 and self._recent_tokens() > self.token_budget:
+                self.pending.append(self.recent.pop(0))
+            start_fold = bool(self.pending) and not self._folding
+            self._folding = self._folding or start_fold
+        if start_fold:
+            _summary_pool.submit(self._fold)
+
+    def snapshot(self) -> Tuple[str, List[Exchange]]:
+        """
+        Summary plus the exchanges to send verbatim.
+        Exchanges waiting to be folded are included only while they still fit the budget.
+        """
+        with self._lock:
+            verbatim = list(self.recent)
+            used = self._recent_tokens() + estimate_tokens(self.summary)
+            for exchange in reversed(self.pending):
+                used += estimate_tokens(exchange[0] + exchange[1])
+                if used > self.token_budget:
+                    break
+                verbatim.insert(0, exchange)
+            return self.summary, verbatim
+
+    def prompt_tokens(self) -> int:
+        summary, verbatim = self.snapshot()
+        return estimate_tokens(summary) + sum(estimate_tokens(u + r) for u, r in verbatim)
+
+    def clear(self):
+        with self._lock:
+            self.summary = ""
+            self.recent = []
+            self.pending = []
+            self._generation += 1
+
+    def _recent_tokens(self) -> int:
+        return sum(estimate_tokens(u + r) for u, r in self.recent)
+
+    def _fold(self):
+        while True:
+            with self._lock:
+                batch = list(self.pending)
+                previous = self.summary
+                generation = self._generation
+                if not batch:
+                    self._folding = False
+                    return
+            try:
+                summary = self.summarize(previous, batch)
+            except Exception as e:
+                print("Conversation summary failed, truncating instead:", e)
+                summary = self._truncate(previous, batch)
+            with self._lock:
+                if self._generation != generation:
+                    continue  # cleared meanwhile: this summary and batch belong to the old conversation
+                self.summary = summary
+                del self.pending[:len(batch)]
+
+    def _truncate(self, previous: str, batch: List[Exchange]) -> str:
+        lines = [previous] if previous else []
+        lines += [f"Player: {u}" for u, _ in batch]
+        text = "\n".join(lines)
+        limit = self.token_budget * 2
+        return text[-limit:]
@@ -3,11 +3,24 @@ Centralized AI Client
 Handles all Anthropic API interactions with proper error handling and fallbacks
 """
 import logging
-from typing import Dict, Any, Optional, List
+import importlib.util
+import dataclasses
+import hashlib
+import json
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, List, Tuple
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 
 from .config import config
+from .metrics import AIMetrics
+from .circuit_breaker import CircuitBreaker
+from .http_transport import shared_transport
+from .single_flight import SingleFlight
+from .tracing import span
 from .exceptions import AIError, AIUnavailableError, AIRateLimitError
 
 logger = logging.getLogger(__name__)
@@ -19,6 +32,14 @@ class AIResponse:
     success: bool
     error: Optional[str] = None
     tokens_used: Optional[int] = None
+    input_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    retries: int = 0
+    fallback: Optional[str] = None
+    latency: Optional[float] = None
+    shared: bool = False  # result came from an identical in-flight request
+    model: Optional[str] = None  # model the call was routed to
     
 class AIClient:
     """
@@ -26,44 +47,77 @@ class AIClient:
     Falls back gracefully when AI is unavailable
     """
     
+    # Error kinds worth another attempt while the deadline allows
+    RETRYABLE_ERRORS = ("rate_limited", "overloaded", "server_error", "timeout", "connection")
+    
     def __init__(self):
         self.client = None
         self.available = False
         self.last_error = None
         self.rate_limit_reset = 0
+        self.health = {"status": "unchecked", "checked_at": None, "latency": None}
+        self.metrics = AIMetrics()
+        self.breaker = CircuitBreaker(
+            failure_threshold=config.ai.breaker_failure_threshold,
+            reset_timeout=config.ai.breaker_reset_timeout
+        )
+        self.single_flight = SingleFlight()
+        
+        self._client_lock = threading.Lock()
+        self._probe_thread = None
         
-        self._initialize_client()
+        self._check_prerequisites()
     
-    def _initialize_client(self):
-        """Initialize Anthropic client with error handling"""
+    def _check_prerequisites(self):
+        """Check that a client can be built without importing or contacting the SDK"""
         if not config.ai.api_key:
             logger.warning("No API key provided - AI will be unavailable")
             return
         
+        if importlib.util.find_spec("anthropic") is None:
+            logger.error("Anthropic package not available")
+            self.last_error = "Anthropic package not installed: No module named 'anthropic'"
+            return
+        
+        # The SDK client itself is built on first use
+        self.available = True
+    
+    def _get_client(self):
+        """Return the SDK client, building it on first use"""
+        if self.client is None and self.available:
+            with self._client_lock:
+                if self.client is None:
+                    self._initialize_client()
+        return self.client
+    
+    def _initialize_client(self):
+        """Initialize Anthropic client with error handling"""
         try:
             # Try to import and initialize Anthropic
             import anthropic
             
             # Use specific version to avoid type errors
+            # Retries are handled in create_message so they respect per-call deadlines
+            # Connections come from the process-wide pool shared with every other client
             self.client = anthropic.Anthropic(
                 api_key=config.ai.api_key,
+                base_url=config.ai.base_url,
                 timeout=config.ai.timeout,
-                max_retries=config.ai.max_retries
+                max_retries=0,
+                http_client=shared_transport.get_client()
             )
             
-            # Test the client with a simple call
-            self._test_client()
-            
-            self.available = True
             logger.info("AI client initialized successfully")
             
         except ImportError as e:
             logger.error(f"Anthropic package not available: {e}")
             self.last_error = f"Anthropic package not installed: {e}"
+            self.available = False
             
         except Exception as e:
             logger.error(f"Failed to initialize AI client: {e}")
             self.last_error = str(e)
+            self.available = False
             
             # Handle specific SDK errors
             if "cache_creation_input_tokens" in str(e):
@@ -75,7 +129,7 @@ class AIClient:
         try:
             # Method 1: Try with minimal parameters
             import anthropic
-            self.client = anthropic.Anthropic(api_key=config.ai.api_key)
+            self.client = anthropic.Anthropic(api_key=config.ai.api_key, http_client=shared_transport.get_client())
             self.available = True
             logger.info("AI client initialized with fallback method")
             
@@ -102,22 +156,63 @@ class AIClient:
         self.available = True
         logger.warning("Using mock AI client - responses will be simulated")
     
+    def prewarm_connection(self) -> bool:
+        """
+        Open a pooled connection to the API host in the background
+        
+        The first real call of the session then skips TCP and TLS setup.
+        
+        Returns:
+            True if a warm-up was started
+        """
+        if not self.available:
+            return False
+        return shared_transport.prewarm(config.ai.base_url or "https://api.anthropic.com")
+    
+    def start_health_probe(self) -> bool:
+        """
+        Run the client test in a background thread
+        
+        The result is reported through get_status() and never blocks the caller.
+        
+        Returns:
+            True if a probe was started
+        """
+        if not self.available:
+            return False
+        if self._probe_thread and self._probe_thread.is_alive():
+            return False
+        
+        self.health = {"status": "checking", "checked_at": None, "latency": None}
+        self._probe_thread = threading.Thread(
+            target=self._test_client, name="ai-health-probe", daemon=True
+        )
+        self._probe_thread.start()
+        return True
+    
     def _test_client(self):
         """Test the client with a simple call"""
+        start = time.time()
         try:
-            response = self.client.messages.create(
+            client = self._get_client()
+            if client is None:
+                raise AIUnavailableError(self.last_error or "AI client not available")
+            
+            client.messages.create(
                 model=config.ai.model,
                 max_tokens=10,
                 messages=[{"role": "user", "content": "test"}]
             )
+            self.health = {"status": "ok", "checked_at": time.time(), "latency": time.time() - start}
             logger.info("AI client test successful")
         except Exception as e:
+            self.health = {"status": "failed", "checked_at": time.time(), "latency": time.time() - start}
             logger.warning(f"AI client test failed: {e}")
             # Don't fail initialization for test failures
     
     def is_available(self) -> bool:
-        """Check if AI is available"""
-        return self.available and self.client is not None
+        """Check if AI is available (and not cut off by the circuit breaker)"""
+        return self.available and not self.breaker.is_open()
     
     def get_status(self) -> Dict[str, Any]:
         """Get AI client status"""
@@ -125,25 +220,83 @@ class AIClient:
             "available": self.available,
             "last_error": self.last_error,
             "model": config.ai.model,
-            "rate_limited": time.time() < self.rate_limit_reset
+            "routes": {call_type: dataclasses.asdict(config.ai.get_route(call_type)) for call_type in config.ai.routes},
+            "rate_limited": time.time() < self.rate_limit_reset,
+            "circuit": self.breaker.get_status()["state"],
+            "health": self.health["status"],
+            "health_latency": self.health["latency"],
+            "transport": shared_transport.get_status()
         }
     
-    def create_message(self, messages: List[Dict[str, str]], **kwargs) -> AIResponse:
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-call-type latency, token and fallback summaries"""
+        return self.metrics.summary()
+    
+    def create_message(self, messages: List[Dict[str, str]], call_type: str = "general", **kwargs) -> AIResponse:
         """
         Create a message with comprehensive error handling
         
         Args:
             messages: List of message dicts with 'role' and 'content'
-            **kwargs: Additional parameters
+            call_type: Logical call type used to group metrics
+            **kwargs: Additional parameters (dedupe=False opts out of
+                      sharing an identical in-flight request)
             
         Returns:
             AIResponse object with content and metadata
         """
-        if not self.is_available():
+        start = time.perf_counter()
+        
+        with span("ai_call", call_type=call_type) as tags:
+            # Identical concurrent requests share a single upstream call
+            if kwargs.pop('dedupe', True):
+                key = self._request_key(messages, call_type, kwargs)
+                response, shared = self.single_flight.do(
+                    key, lambda: self._create_message(messages, call_type, **kwargs)
+                )
+                if shared:
+                    response = dataclasses.replace(response, shared=True)
+            else:
+                response = self._create_message(messages, call_type, **kwargs)
+            tags["outcome"] = response.fallback or ("shared" if response.shared else "ok")
+        
+        if response.model is None:
+            response.model = kwargs.get('model') or config.ai.get_route(call_type).model
+        response.latency = time.perf_counter() - start
+        
+        # Followers did not pay for tokens; only the leader's usage is counted
+        self.metrics.record(
+            call_type,
+            response.latency,
+            response.success,
+            input_tokens=0 if response.shared else response.input_tokens,
+            output_tokens=0 if response.shared else (response.tokens_used or 0),
+            cache_read_tokens=0 if response.shared else response.cache_read_tokens,
+            cache_write_tokens=0 if response.shared else response.cache_write_tokens,
+            retries=0 if response.shared else response.retries,
+            fallback=response.fallback,
+            shared=response.shared,
+            model=response.model
+        )
+        return response
+    
+    def _request_key(self, messages: List[Dict[str, Any]], call_type: str, kwargs: Dict[str, Any]) -> str:
+        """Stable identity of a request for in-flight deduplication"""
+        payload = json.dumps(
+            {"call_type": call_type, "messages": messages, "params": kwargs},
+            sort_keys=True, default=str
+        )
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    
+    def _create_message(self, messages: List[Dict[str, str]], call_type: str, **kwargs) -> AIResponse:
+        """Make the API call with retries inside the call type's deadline"""
+        client = self._get_client() if self.available else None
+        if client is None:
             return AIResponse(
                 content="AI is currently unavailable. The game will continue with basic responses.",
                 success=False,
-                error=self.last_error or "AI client not available"
+                error=self.last_error or "AI client not available",
+                fallback="unavailable"
             )
         
         # Check rate limiting
@@ -151,65 +304,247 @@ class AIClient:
             return AIResponse(
                 content="AI is temporarily rate limited. Please try again later.",
                 success=False,
-                error="Rate limited"
+                error="Rate limited",
+                fallback="rate_limited"
             )
         
-        try:
-            # Prepare parameters
-            params = {
-                'model': kwargs.get('model', config.ai.model),
-                'max_tokens': min(kwargs.get('max_tokens', config.ai.max_tokens), 4000),
-                'messages': messages
-            }
-            
-            # Add optional parameters safely
-            if 'temperature' in kwargs:
-                params['temperature'] = max(0.0, min(1.0, kwargs['temperature']))
-            elif config.ai.temperature is not None:
-                params['temperature'] = config.ai.temperature
-            
-            if 'system' in kwargs:
-                params['system'] = kwargs['system']
+        # Fail fast while the upstream is known to be unhealthy
+        if not self.breaker.allow_request():
+            return AIResponse(
+                content="AI is recovering from errors. The game will continue with basic responses.",
+                success=False,
+                error="Circuit open",
+                fallback="circuit_open"
+            )
+        
+        params = self._build_params(messages, call_type, kwargs)
+        deadline = time.monotonic() + kwargs.get('deadline', config.ai.get_deadline(call_type))
+        attempt = 0
+        
+        while True:
+            try:
+                # Make the API call, never waiting past the deadline
+                response = client.messages.create(timeout=max(0.1, deadline - time.monotonic()), **params)
+                
+            except Exception as e:
+                kind, retry_after = self._classify_error(e)
+                delay = retry_after if retry_after is not None else self._backoff_delay(attempt)
+                
+                if (kind in self.RETRYABLE_ERRORS and attempt < config.ai.max_retries
+                        and time.monotonic() + delay < deadline):
+                    logger.warning(f"AI call failed ({kind}), retry {attempt + 1} in {delay:.2f}s: {e}")
+                    attempt += 1
+                    time.sleep(delay)
+                    continue
+                
+                logger.error(f"AI API call failed ({kind}): {e}")
+                response = self._error_response(kind, str(e), retry_after)
+                response.retries = attempt
+                return response
             
-            # Make the API call
-            response = self.client.messages.create(**params)
+            self.breaker.record_success()
             
             # Extract content safely
             content = self._extract_content(response)
+            usage = self._extract_usage(response)
             
             return AIResponse(
                 content=content,
                 success=True,
-                tokens_used=getattr(response, 'usage', {}).get('output_tokens', 0)
+                tokens_used=usage['output_tokens'],
+                input_tokens=usage['input_tokens'],
+                cache_read_tokens=usage['cache_read_input_tokens'],
+                cache_write_tokens=usage['cache_creation_input_tokens'],
+                retries=attempt,
+                model=params['model']
             )
+    
+    def _build_params(self, messages: List[Dict[str, Any]], call_type: str,
+                      kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Build SDK request parameters from the call type's route and explicit overrides"""
+        route = config.ai.get_route(call_type)
+        params = {
+            'model': kwargs.get('model', route.model),
+            'max_tokens': min(kwargs.get('max_tokens', route.max_tokens), 4000),
+            'messages': messages
+        }
+        
+        # Add optional parameters safely
+        temperature = kwargs.get('temperature', route.temperature)
+        if temperature is not None:
+            params['temperature'] = max(0.0, min(1.0, temperature))
+        
+        if 'system' in kwargs:
+            params['system'] = kwargs['system']
+        
+        return params
+    
+    def create_message_batch(self, requests: List[Dict[str, Any]], call_type: str = "batch",
+                             max_workers: int = 4, poll_interval: float = 10.0) -> List[AIResponse]:
+        """
+        Run many independent requests in bulk
+        
+        Uses the Message Batches API when the installed SDK provides it and
+        falls back to a small pool of concurrent create_message calls.
+        
+        Args:
+            requests: Dicts with 'messages' plus any create_message keyword arguments
+            call_type: Logical call type used to group metrics
+            max_workers: Concurrency for the fallback path
+            poll_interval: Seconds between batch status checks
             
-        except Exception as e:
-            error_msg = str(e)
-            logger.error(f"AI API call failed: {error_msg}")
-            
-            # Handle specific errors
-            if "rate_limit" in error_msg.lower():
-                self.rate_limit_reset = time.time() + 60  # 1 minute cooldown
-                return AIResponse(
-                    content="AI is temporarily rate limited. The game will continue with basic responses.",
-                    success=False,
-                    error="Rate limited"
-                )
-            
-            elif "invalid_request" in error_msg.lower():
-                return AIResponse(
-                    content="Request was invalid. The game will continue with basic responses.",
-                    success=False,
-                    error="Invalid request"
+        Returns:
+            One AIResponse per request, in order
+        """
+        client = self._get_client() if self.available else None
+        batches = getattr(getattr(client, 'messages', None), 'batches', None)
+        
+        if batches is not None:
+            try:
+                return self._run_message_batch(batches, requests, call_type, poll_interval)
+            except Exception as e:
+                logger.warning(f"Message batch failed, falling back to concurrent calls: {e}")
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(self.create_message, call_type=call_type, dedupe=False, **request)
+                for request in requests
+            ]
+            return [future.result() for future in futures]
+    
+    def _run_message_batch(self, batches, requests: List[Dict[str, Any]], call_type: str,
+                           poll_interval: float) -> List[AIResponse]:
+        """Submit requests through the Message Batches API and wait for the results"""
+        start = time.perf_counter()
+        batch = batches.create(requests=[
+            {"custom_id": str(index), "params": self._build_params(request['messages'], call_type, request)}
+            for index, request in enumerate(requests)
+        ])
+        logger.info(f"Submitted message batch {batch.id} with {len(requests)} requests")
+        
+        while batch.processing_status != "ended":
+            time.sleep(poll_interval)
+            batch = batches.retrieve(batch.id)
+        
+        results = {}
+        for entry in batches.results(batch.id):
+            if entry.result.type == "succeeded":
+                usage = self._extract_usage(entry.result.message)
+                results[entry.custom_id] = AIResponse(
+                    content=self._extract_content(entry.result.message),
+                    success=True,
+                    tokens_used=usage['output_tokens'],
+                    input_tokens=usage['input_tokens']
                 )
-            
             else:
-                # Generic error handling
-                return AIResponse(
-                    content="AI encountered an error. The game will continue with basic responses.",
+                results[entry.custom_id] = AIResponse(
+                    content="",
                     success=False,
-                    error=error_msg
+                    error=f"Batch request {entry.result.type}",
+                    fallback=f"batch_{entry.result.type}"
                 )
+        
+        responses = [
+            results.get(str(index)) or AIResponse(content="", success=False, error="Missing batch result", fallback="batch_missing")
+            for index in range(len(requests))
+        ]
+        
+        self.metrics.record(
+            call_type,
+            time.perf_counter() - start,
+            all(r.success for r in responses),
+            input_tokens=sum(r.input_tokens for r in responses),
+            output_tokens=sum(r.tokens_used or 0 for r in responses)
+        )
+        return responses
+    
+    def _classify_error(self, error: Exception) -> Tuple[str, Optional[float]]:
+        """
+        Classify an SDK error by status code and type
+        
+        Returns:
+            Tuple of (error kind, retry-after seconds or None)
+        """
+        status = getattr(error, 'status_code', None)
+        name = type(error).__name__
+        headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+        retry_after = self._parse_retry_after(headers)
+        
+        if status == 429:
+            return "rate_limited", retry_after
+        if status == 529:
+            return "overloaded", retry_after
+        if status is not None and status >= 500:
+            return "server_error", retry_after
+        if status in (408, 409) or "Timeout" in name:
+            return "timeout", retry_after
+        if status is not None and 400 <= status < 500:
+            return "invalid_request", None
+        if "Connection" in name:
+            return "connection", retry_after
+        return "error", retry_after
+    
+    def _parse_retry_after(self, headers) -> Optional[float]:
+        """Read retry-after-ms / retry-after (seconds or HTTP date) headers"""
+        try:
+            if headers.get('retry-after-ms'):
+                return float(headers['retry-after-ms']) / 1000.0
+            value = headers.get('retry-after')
+            if not value:
+                return None
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except Exception:
+            return None
+    
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        cap = min(config.ai.backoff_max, config.ai.backoff_base * (2 ** attempt))
+        return random.uniform(0, cap)
+    
+    def _error_response(self, kind: str, error_msg: str, retry_after: Optional[float]) -> AIResponse:
+        """Record a final failure and build the fallback response"""
+        if kind == "invalid_request":
+            # The upstream answered; a bad request says nothing about its health
+            self.breaker.record_success()
+            return AIResponse(
+                content="Request was invalid. The game will continue with basic responses.",
+                success=False,
+                error="Invalid request",
+                fallback="invalid_request"
+            )
+        
+        if kind == "rate_limited":
+            # Wait exactly as long as the server asks; the breaker counts it like any other failure
+            if retry_after:
+                self.rate_limit_reset = time.time() + retry_after
+            self.breaker.record_failure()
+            return AIResponse(
+                content="AI is temporarily rate limited. The game will continue with basic responses.",
+                success=False,
+                error="Rate limited",
+                fallback="rate_limited"
+            )
+        
+        # Generic error handling
+        self.breaker.record_failure()
+        return AIResponse(
+            content="AI encountered an error. The game will continue with basic responses.",
+            success=False,
+            error=error_msg,
+            fallback=kind
+        )
+    
+    def _extract_usage(self, response) -> Dict[str, int]:
+        """Safely extract token usage from an SDK usage object or dict"""
+        usage = getattr(response, 'usage', None)
+        fields = ('input_tokens', 'output_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens')
+        
+        if isinstance(usage, dict):
+            return {field: usage.get(field) or 0 for field in fields}
+        return {field: getattr(usage, field, None) or 0 for field in fields}
     
     def _extract_content(self, response) -> str:
         """Safely extract content from API response"""
@@ -249,7 +584,7 @@ Respond with ONLY the category name that best fits.
         
         response = self.create_message([
             {"role": "user", "content": prompt}
-        ], max_tokens=50)
+        ], call_type="classify", max_tokens=50)
         
         if response.success:
             result = response.content.strip().lower()
@@ -277,5 +612,5 @@ Respond with ONLY the category name that best fits.
         
         return options[0] if options else 'unknown'
 
-# Global AI client instance
+# Global AI client instance (no network access until first use)
 ai_client = AIClient()
\ No newline at end of file
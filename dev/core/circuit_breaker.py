@@ -0,0 +1,94 @@
+"""
+Circuit Breaker
+Stops calling a failing upstream and probes it again after a cool-down
+"""
+import threading
+import time
+from typing import Callable, Dict, Any
+
+class CircuitBreaker:
+    """
+    Three-state circuit breaker
+    
+    closed    - calls flow normally; consecutive failures are counted
+    open      - calls are rejected immediately until reset_timeout passes
+    half_open - a single trial call is let through; success closes the
+                breaker, failure opens it again
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.time):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.open_until = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may go upstream
+        
+        Returns:
+            True if the call should be attempted
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                if self.clock() < self.open_until:
+                    self.rejected += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    self.rejected += 1
+                    return False
+                self._trial_in_flight = True
+            
+            return True
+    
+    def is_open(self) -> bool:
+        """Check (without side effects) whether calls are currently being rejected"""
+        return self.state == self.OPEN and self.clock() < self.open_until
+    
+    def record_success(self):
+        """Record a successful upstream call"""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+    
+    def record_failure(self):
+        """Record a failed upstream call"""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self._open(self.reset_timeout)
+            self._trial_in_flight = False
+    
+    def _open(self, duration: float):
+        if self.state != self.OPEN:
+            self.times_opened += 1
+        self.state = self.OPEN
+        self.opened_at = self.clock()
+        self.open_until = self.opened_at + duration
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get breaker state for status displays"""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_in": max(0.0, self.open_until - self.clock()) if self.state == self.OPEN else 0.0
+        }
@@ -6,21 +6,68 @@ import os
 import logging
 from pathlib import Path
 from typing import Dict, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Model fast enough for the latency-critical steps that gate every turn; the root game_ai.py reads
+# the same CLAUDE_FAST_MODEL variable with the same default
+FAST_MODEL = os.getenv("CLAUDE_FAST_MODEL", "claude-3-5-haiku-20241022")
+
+@dataclass
+class ModelRoute:
+    """Model and sampling settings for one AI call type; None falls back to AIConfig"""
+    model: Optional[str] = None
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+    deadline: Optional[float] = None  # total seconds, including retries
+
+def _default_routes() -> Dict[str, ModelRoute]:
+    return {
+        "classify": ModelRoute(model=FAST_MODEL, max_tokens=20, temperature=0.0, deadline=3.0),
+        "extract_node": ModelRoute(model=FAST_MODEL, max_tokens=20, temperature=0.0, deadline=3.0),
+        "describe": ModelRoute(max_tokens=200, temperature=0.5, deadline=8.0),
+        "narrate": ModelRoute(max_tokens=150, temperature=0.7, deadline=8.0),
+        "conversation": ModelRoute(max_tokens=400, temperature=0.7, deadline=12.0),
+    }
+
 @dataclass
 class AIConfig:
     """AI-specific configuration"""
     api_key: Optional[str] = None
+    base_url: Optional[str] = None  # e.g. the local stand-in from scripts/stub_server.py
     model: str = "claude-3-haiku-20240307"
     max_tokens: int = 1000
     temperature: float = 0.1
     timeout: float = 30.0
     max_retries: int = 2
+    health_probe: bool = False  # background connectivity check at startup
+    routes: Dict[str, ModelRoute] = field(default_factory=_default_routes)
+    breaker_failure_threshold: int = 5
+    breaker_reset_timeout: float = 30.0
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    pool_max_connections: int = 10  # shared HTTP transport (core/http_transport.py)
+    pool_max_keepalive: int = 5
+    keepalive_expiry: float = 120.0
+    http2: bool = True  # used when the h2 package is installed
+    prewarm: bool = True  # open a pooled connection at startup
+    
+    def get_route(self, call_type: str) -> ModelRoute:
+        """Get the fully resolved route for a call type"""
+        route = self.routes.get(call_type) or ModelRoute()
+        return ModelRoute(
+            model=route.model or self.model,
+            max_tokens=route.max_tokens if route.max_tokens is not None else self.max_tokens,
+            temperature=route.temperature if route.temperature is not None else self.temperature,
+            deadline=route.deadline if route.deadline is not None else self.timeout
+        )
+    
+    def get_deadline(self, call_type: str) -> float:
+        """Get the deadline for a call type, falling back to the SDK timeout"""
+        return self.get_route(call_type).deadline
 
 @dataclass
 class GameConfig:
@@ -29,6 +76,12 @@ class GameConfig:
     default_location: str = "hotel_room"
     save_interval: int = 30  # seconds
     max_chat_history: int = 100
+    narration_pack: str = "narration_pack.json"
+    intent_rules: str = "intent_rules.json"
+    trace_turns: bool = True  # per-turn spans in logs/ (scripts/analyze_traces.py)
+    trace_file: str = "traces.jsonl"
+    trace_max_bytes: int = 5_000_000
+    trace_backups: int = 3
 
 class Config:
     """Main configuration class"""
@@ -53,20 +106,65 @@ class Config:
         """Load AI configuration from environment and defaults"""
         return AIConfig(
             api_key=self._get_api_key(),
+            base_url=os.getenv("ANTHROPIC_BASE_URL") or None,
             model=os.getenv("CLAUDE_MODEL", "claude-3-haiku-20240307"),
             max_tokens=int(os.getenv("MAX_TOKENS", "1000")),
             temperature=float(os.getenv("TEMPERATURE", "0.1")),
             timeout=float(os.getenv("AI_TIMEOUT", "30.0")),
-            max_retries=int(os.getenv("AI_MAX_RETRIES", "2"))
+            max_retries=int(os.getenv("AI_MAX_RETRIES", "2")),
+            health_probe=os.getenv("AI_HEALTH_PROBE", "false").lower() in ("1", "true", "yes"),
+            routes=self._parse_routes(os.getenv("AI_ROUTES", ""), os.getenv("AI_DEADLINES", "")),
+            breaker_failure_threshold=int(os.getenv("AI_BREAKER_THRESHOLD", "5")),
+            breaker_reset_timeout=float(os.getenv("AI_BREAKER_RESET", "30.0")),
+            backoff_base=float(os.getenv("AI_BACKOFF_BASE", "0.5")),
+            backoff_max=float(os.getenv("AI_BACKOFF_MAX", "8.0")),
+            pool_max_connections=int(os.getenv("AI_POOL_SIZE", "10")),
+            pool_max_keepalive=int(os.getenv("AI_POOL_KEEPALIVE", "5")),
+            keepalive_expiry=float(os.getenv("AI_KEEPALIVE_EXPIRY", "120.0")),
+            http2=os.getenv("AI_HTTP2", "true").lower() in ("1", "true", "yes"),
+            prewarm=os.getenv("AI_PREWARM", "true").lower() in ("1", "true", "yes")
         )
     
+    def _parse_routes(self, spec: str, deadlines: str = "") -> Dict[str, ModelRoute]:
+        """
+        Parse route overrides on top of the default routes
+        
+        Args:
+            spec: 'classify.model=claude-3-haiku-20240307,narrate.max_tokens=300'
+            deadlines: 'classify=3,narrate=8' (shorthand for <type>.deadline)
+            
+        Returns:
+            Routes by call type
+        """
+        routes = _default_routes()
+        items = [item for item in spec.split(",") if "=" in item]
+        items += [f"{item.split('=', 1)[0].strip()}.deadline={item.split('=', 1)[1]}"
+                  for item in deadlines.split(",") if "=" in item]
+        
+        casts = {"model": str, "max_tokens": int, "temperature": float, "deadline": float}
+        for item in items:
+            key, value = item.split("=", 1)
+            call_type, _, name = key.strip().partition(".")
+            try:
+                route = routes.setdefault(call_type, ModelRoute())
+                setattr(route, name, casts[name](value.strip()))
+            except (KeyError, ValueError):
+                logger.warning(f"Ignoring invalid route setting '{item}'")
+        return routes
+    
     def _load_game_config(self) -> GameConfig:
         """Load game configuration"""
         return GameConfig(
             default_player=os.getenv("DEFAULT_PLAYER", "Tourist"),
             default_location=os.getenv("DEFAULT_LOCATION", "hotel_room"),
             save_interval=int(os.getenv("SAVE_INTERVAL", "30")),
-            max_chat_history=int(os.getenv("MAX_CHAT_HISTORY", "100"))
+            max_chat_history=int(os.getenv("MAX_CHAT_HISTORY", "100")),
+            narration_pack=os.getenv("NARRATION_PACK", "narration_pack.json"),
+            intent_rules=os.getenv("INTENT_RULES", "intent_rules.json"),
+            trace_turns=os.getenv("TRACE_TURNS", "true").lower() in ("1", "true", "yes"),
+            trace_file=os.getenv("TRACE_FILE", "traces.jsonl"),
+            trace_max_bytes=int(os.getenv("TRACE_MAX_BYTES", "5000000")),
+            trace_backups=int(os.getenv("TRACE_BACKUPS", "3"))
         )
     
     def _get_api_key(self) -> Optional[str]:
@@ -126,6 +224,7 @@ class Config:
         return {
             "ai_enabled": self.is_ai_enabled(),
             "ai_model": self.ai.model,
+            "ai_base_url": self.ai.base_url,
             "max_tokens": self.ai.max_tokens,
             "default_player": self.game.default_player,
             "default_location": self.game.default_location,
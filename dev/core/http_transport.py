@@ -0,0 +1,156 @@
+"""
+Shared HTTP Transport
+One pooled keep-alive HTTP client reused by every AI client in the process
+"""
+import importlib.util
+import logging
+import threading
+import time
+from typing import Dict, Any
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+class TransportStats:
+    """
+    Request and connection counters
+    
+    Fed by httpcore trace events, so a request that reuses a pooled
+    connection shows up as a request without a matching connect.
+    """
+    
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self.tls_handshakes = 0
+        self.connect_seconds = 0.0
+        self._starts = threading.local()
+        self._lock = threading.Lock()
+    
+    def on_request(self, request):
+        """httpx request hook: count the request and trace its connection"""
+        request.extensions["trace"] = self.trace
+        with self._lock:
+            self.requests += 1
+    
+    def trace(self, event_name: str, info: Dict[str, Any]):
+        """httpcore trace callback"""
+        if event_name == "connection.connect_tcp.started":
+            self._starts.connect = time.perf_counter()
+        elif event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections += 1
+        elif event_name == "connection.start_tls.complete":
+            with self._lock:
+                self.tls_handshakes += 1
+        elif event_name.endswith("send_request_headers.started"):
+            # Connection setup (TCP + TLS) ends when the first request goes out on it
+            started = getattr(self._starts, "connect", None)
+            if started is not None:
+                self._starts.connect = None
+                with self._lock:
+                    self.connect_seconds += time.perf_counter() - started
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the counters plus derived reuse rate and average setup time"""
+        with self._lock:
+            requests, connections = self.requests, self.connections
+            return {
+                "requests": requests,
+                "connections": connections,
+                "tls_handshakes": self.tls_handshakes,
+                "reuse_rate": round(1 - connections / requests, 3) if requests else 0.0,
+                "avg_connect_ms": round(self.connect_seconds / connections * 1000, 1) if connections else 0.0
+            }
+
+class SharedTransport:
+    """
+    Process-wide pooled HTTP client
+    
+    Every SDK client is handed the same httpx.Client, so they share one
+    connection pool and its TLS sessions instead of each opening their own.
+    HTTP/2 is used when the optional h2 package is installed.
+    """
+    
+    def __init__(self):
+        self.stats = TransportStats()
+        self.http2 = False
+        self._client = None
+        self._lock = threading.Lock()
+    
+    def get_client(self):
+        """
+        Return the shared httpx.Client, building it on first use
+        
+        Returns:
+            The shared client, or None if httpx is not installed (the SDK then uses its own)
+        """
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._build_client()
+        return self._client or None
+    
+    def _build_client(self):
+        if importlib.util.find_spec("httpx") is None:
+            logger.warning("httpx not available - AI clients will use their own connections")
+            return False
+        
+        import httpx
+        
+        self.http2 = config.ai.http2 and importlib.util.find_spec("h2") is not None
+        limits = httpx.Limits(
+            max_connections=config.ai.pool_max_connections,
+            max_keepalive_connections=config.ai.pool_max_keepalive,
+            keepalive_expiry=config.ai.keepalive_expiry
+        )
+        client = httpx.Client(
+            limits=limits,
+            http2=self.http2,
+            timeout=config.ai.timeout,
+            event_hooks={"request": [self.stats.on_request]}
+        )
+        logger.info(f"Shared HTTP transport ready (pool {config.ai.pool_max_connections}, "
+                    f"HTTP/2 {'on' if self.http2 else 'off'})")
+        return client
+    
+    def prewarm(self, url: str) -> bool:
+        """
+        Open a pooled connection to the API host in the background
+        
+        Args:
+            url: Any URL on the API host; the response itself is ignored
+        
+        Returns:
+            True if the warm-up was started
+        """
+        def warm():
+            client = self.get_client()
+            if client is None:
+                return
+            try:
+                client.head(url, timeout=5.0)
+                logger.info("Shared HTTP transport pre-warmed")
+            except Exception as e:
+                logger.warning(f"Transport pre-warm failed: {e}")
+        
+        threading.Thread(target=warm, name="http-prewarm", daemon=True).start()
+        return True
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get pool settings and connection statistics"""
+        status = self.stats.snapshot()
+        status["http2"] = self.http2
+        status["pool_max_connections"] = config.ai.pool_max_connections
+        return status
+    
+    def close(self):
+        """Close the pooled connections"""
+        with self._lock:
+            if self._client:
+                self._client.close()
+            self._client = None
+
+# Global transport instance
+shared_transport = SharedTransport()
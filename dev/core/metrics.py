@@ -0,0 +1,147 @@
+"""
+AI Call Metrics
+Records latency, token usage and fallbacks per AI call type
+"""
+import json
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Deque
+
+@dataclass
+class CallRecord:
+    """A single AI call measurement"""
+    call_type: str
+    latency: float
+    success: bool
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    retries: int = 0
+    fallback: Optional[str] = None
+    shared: bool = False
+    model: Optional[str] = None
+    timestamp: float = 0.0
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100.0 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+class AIMetrics:
+    """
+    Rolling per-call-type metrics for the AI client
+    Keeps the last `window` calls of each type for percentile summaries
+    and running totals for the whole session.
+    """
+    
+    def __init__(self, window: int = 200):
+        self.window = window
+        self.started_at = time.time()
+        self._records: Dict[str, Deque[CallRecord]] = {}
+        self._totals: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, call_type: str, latency: float, success: bool, **fields) -> CallRecord:
+        """
+        Record one AI call
+        
+        Args:
+            call_type: Logical call type (classify, narrate, describe, ...)
+            latency: Wall time of the call in seconds
+            success: Whether the call produced usable content
+            **fields: Optional CallRecord fields (tokens, retries, fallback)
+            
+        Returns:
+            The stored CallRecord
+        """
+        entry = CallRecord(call_type=call_type, latency=latency, success=success,
+                           timestamp=time.time(), **fields)
+        
+        with self._lock:
+            records = self._records.setdefault(call_type, deque(maxlen=self.window))
+            records.append(entry)
+            
+            totals = self._totals.setdefault(call_type, {
+                "calls": 0, "errors": 0, "fallbacks": 0, "retries": 0,
+                "input_tokens": 0, "output_tokens": 0,
+                "cache_read_tokens": 0, "cache_write_tokens": 0, "cache_hits": 0,
+                "upstream_saved": 0
+            })
+            totals["calls"] += 1
+            totals["errors"] += 0 if success else 1
+            totals["fallbacks"] += 1 if entry.fallback else 0
+            totals["retries"] += entry.retries
+            totals["input_tokens"] += entry.input_tokens
+            totals["output_tokens"] += entry.output_tokens
+            totals["cache_read_tokens"] += entry.cache_read_tokens
+            totals["cache_write_tokens"] += entry.cache_write_tokens
+            totals["cache_hits"] += 1 if entry.cache_read_tokens else 0
+            totals["upstream_saved"] += 1 if entry.shared else 0
+        
+        return entry
+    
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Get totals plus rolling p50/p95 latency for every call type"""
+        with self._lock:
+            result = {}
+            for call_type, records in self._records.items():
+                latencies = [r.latency for r in records]
+                stats = dict(self._totals[call_type])
+                stats["p50_ms"] = round(percentile(latencies, 50) * 1000, 1)
+                stats["p95_ms"] = round(percentile(latencies, 95) * 1000, 1)
+                stats["last_fallback"] = next((r.fallback for r in reversed(records) if r.fallback), None)
+                stats["model"] = records[-1].model
+                result[call_type] = stats
+            return result
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get a JSON-serializable snapshot including the raw rolling window"""
+        with self._lock:
+            recent = {call_type: [asdict(r) for r in records]
+                      for call_type, records in self._records.items()}
+        return {
+            "started_at": self.started_at,
+            "exported_at": time.time(),
+            "window": self.window,
+            "summary": self.summary(),
+            "recent": recent
+        }
+    
+    def export_json(self, path: Path) -> Path:
+        """
+        Write the metrics snapshot to a JSON file
+        
+        Args:
+            path: Destination file
+            
+        Returns:
+            Path that was written
+        """
+        path = Path(path)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+    
+    def format_table(self) -> str:
+        """Format the summary as a plain-text table"""
+        summary = self.summary()
+        if not summary:
+            return "No AI calls recorded yet."
+        
+        lines = [f"{'call type':<14}{'calls':>6}{'err':>5}{'p50 ms':>9}{'p95 ms':>9}{'in tok':>9}{'out tok':>9}{'cached':>8}{'saved':>7}"]
+        for call_type, stats in sorted(summary.items()):
+            lines.append(
+                f"{call_type:<14}{stats['calls']:>6}{stats['errors']:>5}"
+                f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}"
+                f"{stats['input_tokens']:>9}{stats['output_tokens']:>9}{stats['cache_hits']:>8}"
+                f"{stats['upstream_saved']:>7}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,74 @@
+"""
+Single-Flight Call Deduplication
+Concurrent callers with the same key share one in-flight call and its result
+"""
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+class _Call:
+    """An in-flight call that followers can wait on"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+class SingleFlight:
+    """
+    Collapses duplicate concurrent calls into one
+    
+    The first caller for a key (the leader) runs the function; callers that
+    arrive with the same key while it is running wait and receive the same
+    result (or exception). Nothing is cached once the call completes.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+    
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once for all concurrent callers with this key
+        
+        Args:
+            key: Identity of the request
+            fn: Zero-argument function making the call
+            
+        Returns:
+            Tuple of (result, shared) where shared is True for followers
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self.shared += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        
+        return call.result, False
+    
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running"""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,157 @@
+"""
+Turn Tracing
+Per-turn spans written as JSON lines to a rotating file off the game thread
+"""
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Trace of the turn being processed; copied into background turn tasks
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("current_trace", default=None)
+
+@dataclass
+class Span:
+    """One timed step of a turn"""
+    name: str
+    start_ms: float
+    duration_ms: float
+    tags: Dict[str, Any] = field(default_factory=dict)
+
+class TurnTrace:
+    """
+    Spans recorded while one turn is processed
+    
+    Spans are timed relative to the start of the turn and tagged with an
+    outcome ("ok", "error" or whatever the step sets, e.g. "miss").
+    """
+    
+    def __init__(self, player: Optional[str] = None, user_input: Optional[str] = None):
+        self.turn_id = uuid.uuid4().hex[:12]
+        self.player = player
+        self.user_input = user_input
+        self.timestamp = time.time()
+        self.started = time.perf_counter()
+        self.spans: List[Span] = []
+        self.tags: Dict[str, Any] = {}
+        self.duration_ms: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    def add(self, name: str, started: float, ended: float, **tags) -> Span:
+        """Record a span from perf_counter timestamps"""
+        entry = Span(
+            name=name,
+            start_ms=round((started - self.started) * 1000, 3),
+            duration_ms=round((ended - started) * 1000, 3),
+            tags=tags
+        )
+        with self._lock:
+            self.spans.append(entry)
+        return entry
+    
+    def finish(self, **tags):
+        """Close the turn, recording its total duration"""
+        self.tags.update(tags)
+        self.tags.setdefault("outcome", "ok")
+        self.duration_ms = round((time.perf_counter() - self.started) * 1000, 3)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = [asdict(s) for s in sorted(self.spans, key=lambda s: s.start_ms)]
+        return {
+            "turn_id": self.turn_id,
+            "timestamp": self.timestamp,
+            "player": self.player,
+            "input": self.user_input,
+            "duration_ms": self.duration_ms,
+            "tags": self.tags,
+            "spans": spans
+        }
+
+def current_trace() -> Optional[TurnTrace]:
+    """Get the trace of the turn running in this context, if any"""
+    return _current_trace.get()
+
+@contextmanager
+def start_trace(trace: TurnTrace):
+    """Make a trace current for the duration of a turn"""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+@contextmanager
+def span(name: str, **tags):
+    """
+    Time a block as a span of the current turn
+    
+    Does nothing outside a traced turn. The yielded dict can be updated
+    to tag the outcome; exceptions are tagged "error" and re-raised.
+    
+    Args:
+        name: Span name (classify_rules, storage_read, narrate, ...)
+        **tags: Initial tags
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield tags
+        return
+    
+    tags.setdefault("outcome", "ok")
+    started = time.perf_counter()
+    try:
+        yield tags
+    except Exception:
+        tags["outcome"] = "error"
+        raise
+    finally:
+        trace.add(name, started, time.perf_counter(), **tags)
+
+class TraceWriter:
+    """
+    Non-blocking JSONL trace sink
+    
+    The game thread only serializes and enqueues; a QueueListener thread
+    does the file I/O, one line per turn, into a size-rotated file.
+    """
+    
+    def __init__(self, path: Path, max_bytes: int = 5_000_000, backups: int = 3):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        
+        file_handler = logging.handlers.RotatingFileHandler(
+            self.path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+        )
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+        self._listener = logging.handlers.QueueListener(self._queue, file_handler)
+        self._listener.start()
+        
+        self._logger = logging.getLogger(f"{__name__}.writer.{id(self)}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._logger.addHandler(logging.handlers.QueueHandler(self._queue))
+    
+    def write(self, trace: TurnTrace):
+        """Queue a finished trace for writing"""
+        try:
+            self._logger.info(json.dumps(trace.to_dict(), default=str))
+        except Exception as e:
+            logger.debug(f"Dropped trace {trace.turn_id}: {e}")
+    
+    def close(self):
+        """Flush queued traces and stop the writer thread"""
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
@@ -0,0 +1,144 @@
+"""
+Per-Turn Task Graph
+Runs a turn's independent steps concurrently and reports where the time went
+"""
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Shared across turns; a turn rarely has more than a couple of side tasks in flight
+_turn_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="turn-task")
+
+@dataclass
+class StepTiming:
+    """Start and end of one step, relative to the start of the turn"""
+    name: str
+    start: float
+    end: float
+    background: bool
+    
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+class TurnTasks:
+    """
+    Task graph for a single turn
+    
+    Steps on the critical path run inline with run(); independent work
+    (narration for an already validated move, a save) goes to the shared
+    pool with submit(). Work that must wait for the turn's state change,
+    such as saving, is registered with after_state() and starts as soon
+    as the handler calls state_committed(). join() waits for everything
+    before the turn returns.
+    """
+    
+    def __init__(self, executor: Optional[ThreadPoolExecutor] = None):
+        self.executor = executor or _turn_pool
+        self.started = time.perf_counter()
+        self.steps: List[StepTiming] = []
+        self._futures: Dict[str, Future] = {}
+        self._after_state: List[tuple] = []
+        self._committed = False
+        self._lock = threading.Lock()
+    
+    def _timed(self, name: str, fn: Callable, background: bool, *args, **kwargs) -> Any:
+        start = time.perf_counter() - self.started
+        try:
+            with span(name, background=background):
+                return fn(*args, **kwargs)
+        finally:
+            step = StepTiming(name, start, time.perf_counter() - self.started, background)
+            with self._lock:
+                self.steps.append(step)
+    
+    def run(self, name: str, fn: Callable, *args, **kwargs) -> Any:
+        """Run a step inline on the calling thread"""
+        return self._timed(name, fn, False, *args, **kwargs)
+    
+    def submit(self, name: str, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Start an independent step in the background
+        
+        Args:
+            name: Step name for the timing breakdown
+            fn: Callable to run
+        
+        Returns:
+            Future for the step's result
+        """
+        # Carry the turn's trace into the worker thread
+        context = contextvars.copy_context()
+        future = self.executor.submit(context.run, self._timed, name, fn, True, *args, **kwargs)
+        self._futures[name] = future
+        return future
+    
+    def after_state(self, name: str, fn: Callable, *args, **kwargs):
+        """Register a step that may only start once the turn's state change is done"""
+        if self._committed:
+            self.submit(name, fn, *args, **kwargs)
+        else:
+            self._after_state.append((name, fn, args, kwargs))
+    
+    def state_committed(self):
+        """Mark the turn's state change as done and start the waiting steps"""
+        if self._committed:
+            return
+        self._committed = True
+        pending, self._after_state = self._after_state, []
+        for name, fn, args, kwargs in pending:
+            self.submit(name, fn, *args, **kwargs)
+    
+    def join(self, timeout: Optional[float] = None):
+        """Start anything still waiting on the state and wait for every background step"""
+        self.state_committed()
+        for name, future in list(self._futures.items()):
+            try:
+                future.result(timeout=timeout)
+            except Exception as e:
+                logger.error(f"Turn step '{name}' failed: {e}")
+    
+    def breakdown(self) -> Dict[str, Any]:
+        """
+        Timing breakdown of the turn
+        
+        Returns:
+            Wall time, the summed duration of the innermost steps (what running
+            them one after another would cost) and the individual steps, in ms
+        """
+        with self._lock:
+            steps = sorted(self.steps, key=lambda s: s.start)
+        wall = max([s.end for s in steps] + [time.perf_counter() - self.started])
+        # An inline step that wraps other inline steps (e.g. "process") is mostly
+        # their time plus waiting on background work, so only the innermost count
+        serial = sum(s.duration for s in steps if s.background or not any(
+            other is not s and not other.background and s.start <= other.start and other.end <= s.end
+            for other in steps
+        ))
+        return {
+            "wall_ms": round(wall * 1000, 1),
+            "serial_ms": round(serial * 1000, 1),
+            "saved_ms": round(max(0.0, serial - wall) * 1000, 1),
+            "steps": [
+                {"name": s.name, "start_ms": round(s.start * 1000, 1), "ms": round(s.duration * 1000, 1),
+                 "background": s.background}
+                for s in steps
+            ]
+        }
+    
+    def format_breakdown(self) -> str:
+        """Format the breakdown as a plain-text timeline"""
+        data = self.breakdown()
+        lines = [f"Turn: {data['wall_ms']} ms wall, {data['serial_ms']} ms if serial (saved {data['saved_ms']} ms)"]
+        for step in data["steps"]:
+            lane = "bg" if step["background"] else "  "
+            lines.append(f"  {lane} {step['name']:<14}{step['start_ms']:>9} ms  +{step['ms']} ms")
+        return "\n".join(lines)
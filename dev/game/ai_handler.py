@@ -3,12 +3,16 @@ AI Handler - Interface between game logic and AI client
 Handles all AI-related game functionality with fallbacks
 """
 import logging
-import difflib
 from typing import Dict, Any, List, Optional
 
 from core.ai_client import ai_client
 from core.config import config
 from core.exceptions import AIError
+from core.tracing import span
+from core.turn_tasks import TurnTasks
+from game.intent_rules import IntentMatcher
+from game.narration import NarrationPack
+from game.resolver import DestinationResolver
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +31,15 @@ class AIHandler:
             "save",
             "quit"
         ]
+        
+        # Pre-generated narration (scripts/build_narration.py); empty if not built
+        self.narration = NarrationPack.load(config.get_data_file(config.game.narration_pack))
+        
+        # Keyword rules compiled once; data/intent_rules.json overrides the defaults
+        self.intent_matcher = IntentMatcher.load(config.get_data_file(config.game.intent_rules))
+        
+        # Built on first movement from the loaded world (see _get_resolver)
+        self.resolver: Optional[DestinationResolver] = None
     
     def classify_input(self, user_input: str, game_state) -> Dict[str, Any]:
         """
@@ -41,13 +54,17 @@ class AIHandler:
         """
         try:
             # First try rule-based classification (fast and reliable)
-            rule_result = self._rule_based_classify(user_input)
+            with span("classify_rules") as tags:
+                rule_result = self._rule_based_classify(user_input)
+                tags["outcome"] = rule_result or "miss"
             if rule_result:
                 return self._build_classification(rule_result, user_input)
             
             # If AI is available, use it for more complex cases
             if ai_client.is_available():
-                ai_result = self._ai_classify(user_input)
+                with span("classify_ai") as tags:
+                    ai_result = self._ai_classify(user_input)
+                    tags["outcome"] = ai_result or "miss"
                 if ai_result:
                     return self._build_classification(ai_result, user_input)
             
@@ -68,39 +85,7 @@ class AIHandler:
         Returns:
             Classification or None if no match
         """
-        text = text.lower().strip()
-        
-        # Quit/Save commands
-        if any(word in text for word in ['quit', 'exit', 'bye', 'goodbye']):
-            return "quit"
-        if 'save' in text:
-            return "save"
-        
-        # Movement commands
-        if any(phrase in text for phrase in ['go to', 'move to', 'travel to', 'walk to', 'head to']):
-            return "move_to"
-        if any(word in text for word in ['go', 'move', 'travel', 'walk', 'head']) and any(word in text for word in ['north', 'south', 'east', 'west', 'up', 'down']):
-            return "move_to"
-        
-        # Description commands
-        if any(word in text for word in ['look', 'examine', 'describe', 'where', 'what']):
-            return "describe"
-        
-        # Action commands
-        if any(phrase in text for phrase in ['talk to', 'speak to', 'chat with']):
-            return "perform_event"
-        if any(word in text for word in ['do', 'start', 'continue', 'perform', 'use', 'take', 'get']):
-            return "perform_event"
-        
-        # Inventory commands
-        if any(word in text for word in ['inventory', 'items', 'backpack', 'bag']):
-            return "inventory"
-        
-        # Combat commands
-        if any(word in text for word in ['fight', 'attack', 'combat', 'battle']):
-            return "combat"
-        
-        return None
+        return self.intent_matcher.classify(text)
     
     def _ai_classify(self, text: str) -> Optional[str]:
         """
@@ -132,7 +117,7 @@ Respond with ONLY the category name.
             
             response = ai_client.create_message([
                 {"role": "user", "content": prompt}
-            ], max_tokens=20)
+            ], call_type="classify")
             
             if response.success:
                 result = response.content.strip().lower()
@@ -163,28 +148,31 @@ Respond with ONLY the category name.
             "confidence": "high" if action != "describe" else "medium"
         }
     
-    def process_command(self, classified: Dict[str, Any], game_state) -> str:
+    def process_command(self, classified: Dict[str, Any], game_state, turn: Optional[TurnTasks] = None) -> str:
         """
         Process classified command and return response
         
         Args:
             classified: Classified command from classify_input
             game_state: Current game state
+            turn: The turn's task graph; independent work runs on it in the background
             
         Returns:
             Game response string
         """
         action = classified["action"]
         raw_input = classified["raw"]
+        own_turn = turn is None
+        turn = turn or TurnTasks()
         
         try:
             # Route to appropriate handler
             if action == "describe":
-                return self._handle_describe(raw_input, game_state)
+                return self._handle_describe(raw_input, game_state, turn)
             elif action == "move_to":
-                return self._handle_movement(raw_input, game_state)
+                return self._handle_movement(raw_input, game_state, turn)
             elif action == "perform_event":
-                return self._handle_event(raw_input, game_state)
+                return self._handle_event(raw_input, game_state, turn)
             elif action == "inventory":
                 return self._handle_inventory(game_state)
             elif action == "combat":
@@ -199,18 +187,29 @@ Respond with ONLY the category name.
         except Exception as e:
             logger.error(f"Error processing command {action}: {e}")
             return f"Sorry, I couldn't process that command. Please try again."
+        finally:
+            if own_turn:
+                turn.join()
     
-    def _handle_describe(self, raw_input: str, game_state) -> str:
+    def _handle_describe(self, raw_input: str, game_state, turn: TurnTasks) -> str:
         """Handle description requests"""
+        # Describing changes nothing, so the turn's saves can start alongside the AI call
+        turn.state_committed()
         try:
             # Get basic description
             base_description = game_state.describe()
             
-            # If AI is available and user asked a specific question, enhance it
-            if ai_client.is_available() and any(word in raw_input.lower() for word in ['what', 'who', 'why', 'how']):
-                enhanced = self._enhance_description(raw_input, base_description)
-                if enhanced:
-                    return enhanced
+            # Free-form questions go to the AI; everything else is served locally
+            if any(word in raw_input.lower() for word in ['what', 'who', 'why', 'how']):
+                if ai_client.is_available():
+                    enhanced = turn.run("describe", self._enhance_description, raw_input, base_description)
+                    if enhanced:
+                        return enhanced
+                return base_description
+            
+            narration = self.narration.node(game_state.current_node.name)
+            if narration:
+                return f"{narration}\n\n{base_description}"
             
             return base_description
             
@@ -218,20 +217,36 @@ Respond with ONLY the category name.
             logger.error(f"Error handling describe: {e}")
             return game_state.describe() if hasattr(game_state, 'describe') else "You look around."
     
-    def _handle_movement(self, raw_input: str, game_state) -> str:
+    def _handle_movement(self, raw_input: str, game_state, turn: TurnTasks) -> str:
         """Handle movement commands"""
         try:
             # Extract destination
-            destination = self._extract_destination(raw_input, game_state.current_node.connections)
+            destination = turn.run(
+                "resolve", self._extract_destination,
+                raw_input, game_state.current_node.connections, game_state
+            )
             
             if destination and destination in game_state.current_node.connections:
-                if game_state.move_to(destination):
-                    # Generate movement response
-                    if ai_client.is_available():
-                        return self._generate_movement_response(destination, game_state)
-                    else:
-                        return f"You move to {destination}.\n\n{game_state.describe()}"
+                origin = game_state.current_node.name
+                
+                # Serve pre-generated narration first; no network needed
+                narration = self.narration.movement(origin, destination)
+                
+                # The graph has already validated the move, so narration can start before the state changes
+                pending = None
+                if not narration and ai_client.is_available():
+                    pending = turn.submit("narrate", self._generate_movement_response, destination, game_state)
+                
+                if turn.run("move", game_state.move_to, destination):
+                    turn.state_committed()
+                    if narration:
+                        return f"{narration}\n\n{game_state.describe()}"
+                    if pending:
+                        return pending.result()
+                    return f"You move to {destination}.\n\n{game_state.describe()}"
                 else:
+                    if pending:
+                        pending.cancel()
                     return f"You can't go to {destination} right now."
             else:
                 available = ", ".join(game_state.current_node.connections)
@@ -241,12 +256,13 @@ Respond with ONLY the category name.
             logger.error(f"Error handling movement: {e}")
             return "I couldn't understand where you want to go."
     
-    def _handle_event(self, raw_input: str, game_state) -> str:
+    def _handle_event(self, raw_input: str, game_state, turn: TurnTasks) -> str:
         """Handle event/action commands"""
         try:
             # Check if there's a current event
             if hasattr(game_state, 'current_event') and game_state.current_event:
-                result = game_state.perform_event()
+                result = turn.run("event", game_state.perform_event)
+                turn.state_committed()
                 
                 # Handle different result types
                 if isinstance(result, dict):
@@ -286,33 +302,81 @@ Respond with ONLY the category name.
             logger.error(f"Error handling combat: {e}")
             return "Combat is not available right now."
     
-    def _extract_destination(self, text: str, available_locations: List[str]) -> Optional[str]:
+    def _get_resolver(self, game_state) -> DestinationResolver:
+        """Build the destination index once per world"""
+        if self.resolver is None:
+            nodes = game_state.storage.load_nodes()
+            aliases = {}
+            if config.get_data_file("aliases.json").exists():
+                aliases = game_state.storage.load_json("aliases.json")
+            self.resolver = DestinationResolver(nodes, aliases)
+            logger.info(f"Destination index built for {len(nodes)} nodes")
+        return self.resolver
+    
+    def _extract_destination(self, text: str, available_locations: List[str], game_state=None) -> Optional[str]:
         """
         Extract destination from movement command
         
         Args:
             text: User input text
             available_locations: List of available destinations
+            game_state: Current game state, used to build the resolver
             
         Returns:
             Best matching destination or None
         """
-        text_lower = text.lower()
+        if game_state is not None:
+            resolver = self._get_resolver(game_state)
+        else:
+            resolver = DestinationResolver({name: {} for name in available_locations})
+        
+        with span("resolve_index") as tags:
+            ranked = resolver.resolve(text, available_locations)
+            ambiguous = bool(ranked) and resolver.is_ambiguous(ranked)
+            tags["outcome"] = "ambiguous" if ambiguous else ("match" if ranked else "none")
+        if ranked and not ambiguous:
+            return ranked[0][0]
         
-        # Direct matches first
-        for location in available_locations:
-            if location.lower() in text_lower:
-                return location
+        # Only close calls reach the model
+        if ranked and ai_client.is_available():
+            with span("extract_ai") as tags:
+                choice = self._ai_pick_destination(text, [name for name, _ in ranked])
+                tags["outcome"] = "match" if choice else "none"
+            if choice:
+                return choice
         
-        # Fuzzy matching
-        words = text_lower.split()
-        for word in words:
-            matches = difflib.get_close_matches(word, [loc.lower() for loc in available_locations], n=1, cutoff=0.6)
-            if matches:
-                # Return original case version
-                for location in available_locations:
-                    if location.lower() == matches[0]:
-                        return location
+        if ranked and ranked[0][1] >= resolver.min_score:
+            return ranked[0][0]
+        return None
+    
+    def _ai_pick_destination(self, text: str, options: List[str]) -> Optional[str]:
+        """
+        Ask the model to choose between close destination matches
+        
+        Args:
+            text: User input text
+            options: Ranked candidate node names
+            
+        Returns:
+            Chosen node name or None
+        """
+        try:
+            prompt = (
+                f'The player typed: "{text}"\n'
+                f"Which of these places do they mean? {', '.join(options)}\n"
+                "Respond with ONLY the place name exactly as written, or NONE."
+            )
+            response = ai_client.create_message([
+                {"role": "user", "content": prompt}
+            ], call_type="extract_node")
+            
+            if response.success:
+                result = response.content.strip().lower()
+                for option in options:
+                    if option.lower() == result:
+                        return option
+        except Exception as e:
+            logger.error(f"AI destination pick failed: {e}")
         
         return None
     
@@ -341,7 +405,7 @@ Provide a brief, immersive response based only on the context provided. Stay in
             
             response = ai_client.create_message([
                 {"role": "user", "content": prompt}
-            ], max_tokens=200)
+            ], call_type="describe")
             
             if response.success:
                 return response.content
@@ -355,20 +419,24 @@ Provide a brief, immersive response based only on the context provided. Stay in
         """
         Generate enhanced movement response using AI
         
+        Runs before or during the move, so the destination is described
+        from storage rather than from the (possibly not yet updated) state.
+        
         Args:
-            destination: Where the player moved
+            destination: Where the player is moving
             game_state: Current game state
             
         Returns:
             Movement response
         """
+        description = game_state.describe_destination(destination) or destination
         try:
             prompt = f"""
 The player just moved to {destination}. Write a brief transition describing the movement and what they see.
 
 New location:
 ```
-{game_state.describe()}
+{description}
 ```
 
 Keep it concise and atmospheric.
@@ -376,13 +444,13 @@ Keep it concise and atmospheric.
             
             response = ai_client.create_message([
                 {"role": "user", "content": prompt}
-            ], max_tokens=150)
+            ], call_type="narrate")
             
             if response.success:
                 return response.content
             else:
-                return f"You move to {destination}.\n\n{game_state.describe()}"
+                return f"You move to {destination}.\n\n{description}"
                 
         except Exception as e:
             logger.error(f"Error generating movement response: {e}")
-            return f"You move to {destination}.\n\n{game_state.describe()}"
\ No newline at end of file
+            return f"You move to {destination}.\n\n{description}"
\ No newline at end of file
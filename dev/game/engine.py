@@ -14,6 +14,8 @@ sys.path.append(str(Path(__file__).parent.parent))
 from core.config import config
 from core.ai_client import ai_client
 from core.exceptions import GameError, GameStateError
+from core.tracing import TraceWriter, TurnTrace, current_trace, span, start_trace
+from core.turn_tasks import TurnTasks
 from game.ai_handler import AIHandler
 from game.state import GameState
 from game.storage import GameStorage
@@ -30,6 +32,8 @@ class GameEngine:
         self.state = None
         self.storage = None
         self.running = False
+        self.last_turn: Optional[TurnTasks] = None
+        self.tracer: Optional[TraceWriter] = None
         
         # Initialize systems
         self._initialize_systems()
@@ -45,6 +49,14 @@ class GameEngine:
             self.ai_handler = AIHandler()
             logger.info("AI handler initialized")
             
+            # Turn traces are written off the game thread
+            if config.game.trace_turns:
+                self.tracer = TraceWriter(
+                    config.logs_dir / config.game.trace_file,
+                    max_bytes=config.game.trace_max_bytes,
+                    backups=config.game.trace_backups
+                )
+            
             logger.info("Game engine initialized successfully")
             
         except Exception as e:
@@ -94,6 +106,17 @@ class GameEngine:
         if not self.running or not self.state:
             return "Game is not running. Please start a new game."
         
+        trace = TurnTrace(player=self.state.player.name, user_input=user_input)
+        with start_trace(trace):
+            response = self._process_turn(user_input)
+        
+        trace.finish(location=self.state.current_node.name if self.state else None)
+        if self.tracer:
+            self.tracer.write(trace)
+        return response
+    
+    def _process_turn(self, user_input: str) -> str:
+        """Run one turn inside the current trace"""
         try:
             # Clean and validate input
             user_input = user_input.strip()
@@ -101,20 +124,27 @@ class GameEngine:
                 return "Please enter a command."
             
             # Check for special commands first
-            special_response = self._handle_special_commands(user_input)
+            with span("special_commands") as tags:
+                special_response = self._handle_special_commands(user_input)
+                tags["outcome"] = "handled" if special_response else "pass"
             if special_response:
                 return special_response
             
-            # Process through AI handler
-            classified_input = self.ai_handler.classify_input(user_input, self.state)
-            response = self.ai_handler.process_command(classified_input, self.state)
+            # Process through AI handler; the auto-save runs alongside any narration still in flight
+            turn = TurnTasks()
+            classified_input = turn.run("classify", self.ai_handler.classify_input, user_input, self.state)
+            current_trace().tags["action"] = classified_input["action"]
+            turn.after_state("autosave", self._auto_save)
+            response = turn.run("process", self.ai_handler.process_command, classified_input, self.state, turn)
+            turn.join()
             
-            # Auto-save periodically
-            self._auto_save()
+            self.last_turn = turn
+            logger.debug(turn.format_breakdown())
             
             return response
             
         except Exception as e:
+            current_trace().tags["outcome"] = "error"
             logger.error(f"Error processing input '{user_input}': {e}")
             return f"Sorry, I couldn't process that command. Please try again. ({str(e)[:50]})"
     
@@ -155,6 +185,14 @@ class GameEngine:
         elif cmd == 'ai_status':
             return self._get_ai_status_text()
         
+        # AI metrics export
+        elif cmd == 'ai_metrics':
+            return self._export_ai_metrics()
+        
+        # Timing breakdown of the previous turn
+        elif cmd == 'turn_timing':
+            return self.last_turn.format_breakdown() if self.last_turn else "No turn played yet."
+        
         # Debug command (if enabled)
         elif cmd == 'debug' and config.ai.model == "claude-3-haiku-20240307":  # Dev mode check
             return self._get_debug_text()
@@ -176,6 +214,9 @@ Basic Commands:
 System Commands:
 • save - Save your game
 • status - Show player status
+• ai_status - Show AI status and per-call latency
+• ai_metrics - Export AI call metrics as JSON
+• turn_timing - Show where the last turn's time went
 • help - Show this help text
 • quit - Save and exit the game
 
@@ -210,9 +251,45 @@ Items: {', '.join(self.state.player.inventory) if self.state.player.inventory el
 Available: {ai_status['available']}
 Model: {ai_status['model']}
 Rate Limited: {ai_status['rate_limited']}
+Circuit: {ai_status['circuit']}
+Health Check: {ai_status['health']}
+Transport: {self._format_transport(ai_status['transport'])}
 Last Error: {ai_status['last_error'] or 'None'}
+
+=== AI CALLS ===
+{ai_client.metrics.format_table()}
+
+=== AI ROUTES ===
+{self._format_ai_routes(ai_status['routes'])}
 """
     
+    def _format_transport(self, transport: Dict[str, Any]) -> str:
+        """Format shared connection pool statistics"""
+        return (f"{transport['requests']} requests over {transport['connections']} connections "
+                f"({transport['tls_handshakes']} TLS handshakes, {transport['reuse_rate']:.0%} reused, "
+                f"setup {transport['avg_connect_ms']} ms avg, HTTP/2 {'on' if transport['http2'] else 'off'})")
+    
+    def _format_ai_routes(self, routes: Dict[str, Dict[str, Any]]) -> str:
+        """Format the per-call-type model routing with observed latency"""
+        metrics = ai_client.get_metrics()
+        lines = [f"{'call type':<14}{'model':<28}{'max tok':>8}{'temp':>6}{'deadline':>9}{'p50 ms':>9}{'p95 ms':>9}"]
+        for call_type, route in sorted(routes.items()):
+            stats = metrics.get(call_type, {})
+            lines.append(
+                f"{call_type:<14}{route['model']:<28}{route['max_tokens']:>8}{route['temperature']:>6}"
+                f"{route['deadline']:>8}s{stats.get('p50_ms', '-'):>9}{stats.get('p95_ms', '-'):>9}"
+            )
+        return "\n".join(lines)
+    
+    def _export_ai_metrics(self) -> str:
+        """Export AI call metrics to a JSON file in the logs directory"""
+        try:
+            path = ai_client.metrics.export_json(config.logs_dir / "ai_metrics.json")
+            return f"AI metrics exported to {path}"
+        except Exception as e:
+            logger.error(f"Failed to export AI metrics: {e}")
+            return "Failed to export AI metrics."
+    
     def _get_debug_text(self) -> str:
         """Generate debug text"""
         if not self.state:
@@ -281,6 +358,9 @@ Storage Path: {self.storage.data_dir}
         if self.running:
             self.save_game()
             self.running = False
+        if self.tracer:
+            self.tracer.close()
+            self.tracer = None
         logger.info("Game engine shutdown")
 
 def main():
@@ -0,0 +1,172 @@
+"""
+Intent Rules
+Keyword and phrase rules compiled into a single word-level trie
+"""
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default rules; a data file with the same shape replaces them (see IntentMatcher.load)
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {"intent": "quit", "priority": 100, "phrases": ["quit", "exit", "bye", "goodbye", "log off"],
+     "unless": ["don't", "dont", "not", "never", "won't", "can't"]},
+    {"intent": "save", "priority": 90, "phrases": ["save", "save game"],
+     "unless": ["don't", "dont", "not", "never", "won't", "can't"]},
+    {"intent": "describe", "priority": 85,
+     "phrases": ["where can i go", "where should i go", "how do i get out", "how do i leave", "way out"]},
+    {"intent": "move_to", "priority": 80,
+     "phrases": ["go to", "move to", "travel to", "walk to", "head to", "run to", "go back to",
+                 "head back to", "take me to", "go into", "enter", "leave"]},
+    {"intent": "move_to", "priority": 75,
+     "phrases": ["go", "move", "travel", "walk", "head"],
+     "requires": ["north", "south", "east", "west", "up", "down", "upstairs", "downstairs", "outside", "inside"]},
+    {"intent": "inventory", "priority": 70,
+     "phrases": ["inventory", "items", "backpack", "bag", "what am i carrying", "what do i have"]},
+    {"intent": "combat", "priority": 65, "phrases": ["fight", "attack", "combat", "battle", "morph"]},
+    {"intent": "perform_event", "priority": 60, "phrases": ["talk to", "speak to", "chat with", "ask"]},
+    {"intent": "describe", "priority": 50,
+     "phrases": ["look", "look around", "examine", "describe", "inspect", "what do you see", "what do i see"]},
+    {"intent": "perform_event", "priority": 40,
+     "phrases": ["do", "start", "continue", "perform", "use", "take", "get", "pick up", "open"]},
+    {"intent": "describe", "priority": 30, "phrases": ["where", "what", "what's", "who", "who's"]},
+]
+
+_END = ""  # trie key marking the end of a phrase; tokens are never empty
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; punctuation separates words"""
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+@dataclass
+class IntentRule:
+    """A group of phrases that maps to one intent"""
+    intent: str
+    phrases: List[str]
+    priority: int = 0
+    requires: List[str] = field(default_factory=list)  # one of these must also appear
+    unless: List[str] = field(default_factory=list)  # none of these may appear
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'IntentRule':
+        return cls(
+            intent=data["intent"],
+            phrases=list(data["phrases"]),
+            priority=int(data.get("priority", 0)),
+            requires=list(data.get("requires", [])),
+            unless=list(data.get("unless", []))
+        )
+
+class IntentMatcher:
+    """
+    Classifies text by the highest-priority rule it satisfies
+    
+    Every phrase of every rule (and its requires/unless words) is inserted into one trie keyed by whole
+    words, so "do" never matches "door" and a scan costs one walk per
+    input token no matter how many rules there are. Ties on priority go
+    to the rule whose phrase starts first.
+    """
+    
+    def __init__(self, rules: List[IntentRule]):
+        self.rules = rules
+        self.trie: Dict[str, Any] = {}
+        self.max_depth = 0
+        for rule_id, rule in enumerate(rules):
+            for kind in ("phrases", "requires", "unless"):
+                for phrase in getattr(rule, kind):
+                    self._insert(phrase, rule_id, kind)
+    
+    @classmethod
+    def from_dicts(cls, rules: List[Dict[str, Any]]) -> 'IntentMatcher':
+        return cls([IntentRule.from_dict(rule) for rule in rules])
+    
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> 'IntentMatcher':
+        """
+        Load rules from a JSON file
+        
+        Args:
+            path: File holding a list of rules, or {"rules": [...]}
+        
+        Returns:
+            Matcher for the file's rules, or for DEFAULT_RULES if the file is missing or invalid
+        """
+        if path is not None and Path(path).exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                rules = data["rules"] if isinstance(data, dict) else data
+                matcher = cls.from_dicts(rules)
+                logger.info(f"Loaded {len(matcher.rules)} intent rules from {Path(path).name}")
+                return matcher
+            except Exception as e:
+                logger.error(f"Invalid intent rules in {path}, using defaults: {e}")
+        return cls.from_dicts(DEFAULT_RULES)
+    
+    def _insert(self, phrase: str, rule_id: int, kind: str):
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+        node = self.trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(_END, []).append((rule_id, kind))
+        self.max_depth = max(self.max_depth, len(tokens))
+    
+    def scan(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Find every phrase occurrence in the text
+        
+        Args:
+            text: Input text
+        
+        Returns:
+            (rule_id, start_token, kind) for each hit, in text order; kind is
+            "phrases", "requires" or "unless"
+        """
+        tokens = tokenize(text)
+        hits = []
+        for start in range(len(tokens)):
+            node = self.trie
+            for token in tokens[start:start + self.max_depth]:
+                node = node.get(token)
+                if node is None:
+                    break
+                for rule_id, kind in node.get(_END, ()):
+                    hits.append((rule_id, start, kind))
+        return hits
+    
+    def classify(self, text: str) -> Optional[str]:
+        """
+        Classify text
+        
+        Args:
+            text: Input text
+        
+        Returns:
+            Intent of the best satisfied rule, or None
+        """
+        first_hit: Dict[int, int] = {}
+        requirement_met = set()
+        vetoed = set()
+        for rule_id, start, kind in self.scan(text):
+            if kind == "requires":
+                requirement_met.add(rule_id)
+            elif kind == "unless":
+                vetoed.add(rule_id)
+            elif rule_id not in first_hit:
+                first_hit[rule_id] = start
+        
+        best = None
+        for rule_id, start in first_hit.items():
+            rule = self.rules[rule_id]
+            if (rule.requires and rule_id not in requirement_met) or rule_id in vetoed:
+                continue
+            key = (-rule.priority, start)
+            if best is None or key < best[0]:
+                best = (key, rule.intent)
+        return best[1] if best else None
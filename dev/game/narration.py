@@ -0,0 +1,110 @@
+"""
+Narration Pack
+Pre-generated narration for world edges, nodes and events, served without AI calls
+"""
+import json
+import logging
+import random
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class NarrationPack:
+    """
+    Indexed store of narration variants
+    
+    Texts are kept once in a string table and referenced by index from
+    keys such as "move:hotel_room>hotel_lobby", "node:bar" and
+    "event:pink_conversation".
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, texts: List[str] = None, index: Dict[str, List[int]] = None,
+                 meta: Dict[str, Any] = None):
+        self.texts = texts or []
+        self.index = index or {}
+        self.meta = meta or {}
+        self._text_ids = {text: i for i, text in enumerate(self.texts)}
+    
+    @staticmethod
+    def move_key(from_node: str, to_node: str) -> str:
+        """Index key for a movement edge"""
+        return f"move:{from_node}>{to_node}"
+    
+    @classmethod
+    def load(cls, path: Path) -> 'NarrationPack':
+        """
+        Load a pack from disk
+        
+        Args:
+            path: Pack file
+            
+        Returns:
+            Loaded pack, or an empty pack if the file is missing or invalid
+        """
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != cls.VERSION:
+                logger.warning(f"Ignoring narration pack {path.name} with version {data.get('version')}")
+                return cls()
+            pack = cls(data["texts"], data["index"], data.get("meta", {}))
+            logger.info(f"Loaded narration pack: {len(pack.index)} entries, {len(pack.texts)} texts")
+            return pack
+        except Exception as e:
+            logger.error(f"Failed to load narration pack {path}: {e}")
+            return cls()
+    
+    def save(self, path: Path):
+        """Write the pack as compact JSON"""
+        data = {
+            "version": self.VERSION,
+            "meta": dict(self.meta, built_at=datetime.now().isoformat()),
+            "texts": self.texts,
+            "index": self.index
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    
+    def add(self, key: str, text: str):
+        """Add a narration variant under a key"""
+        text = text.strip()
+        if not text:
+            return
+        text_id = self._text_ids.get(text)
+        if text_id is None:
+            text_id = len(self.texts)
+            self.texts.append(text)
+            self._text_ids[text] = text_id
+        variants = self.index.setdefault(key, [])
+        if text_id not in variants:
+            variants.append(text_id)
+    
+    def get(self, key: str) -> Optional[str]:
+        """Get a random variant for a key, or None"""
+        variants = self.index.get(key)
+        if not variants:
+            return None
+        return self.texts[random.choice(variants)]
+    
+    def movement(self, from_node: str, to_node: str) -> Optional[str]:
+        """Narration for moving along an edge"""
+        return self.get(self.move_key(from_node, to_node))
+    
+    def node(self, node_name: str) -> Optional[str]:
+        """Narration for a location"""
+        return self.get(f"node:{node_name}")
+    
+    def event(self, event_name: str) -> Optional[str]:
+        """Narration for an event"""
+        return self.get(f"event:{event_name}")
+    
+    def __len__(self) -> int:
+        return len(self.index)
@@ -0,0 +1,154 @@
+"""
+Destination Resolver
+Indexed fuzzy matching of free text to node names, built once per world
+"""
+import difflib
+import math
+import re
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+# Words that never identify a place
+STOPWORDS = {
+    "a", "an", "the", "to", "go", "goto", "move", "walk", "travel", "head", "run",
+    "into", "in", "towards", "toward", "back", "please", "i", "want", "let's", "lets",
+    "me", "my", "let", "over", "there", "now", "up", "down", "at", "of", "and"
+}
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words, splitting node ids on underscores"""
+    return [t for t in re.findall(r"[a-z0-9']+", text.lower().replace("_", " ")) if t not in STOPWORDS]
+
+def trigrams(token: str) -> Set[str]:
+    """Character trigrams of a padded token"""
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class DestinationResolver:
+    """
+    Ranks node names against free text
+    
+    Each node is indexed by the words of its id and of any aliases. Input
+    words match index words exactly or, for typos, through a trigram index
+    that shortlists index words for a difflib similarity check.
+    Scores are IDF-weighted so words shared by many nodes ("lobby", "rhq")
+    count for less than distinctive ones ("hotel", "armory").
+    """
+    
+    def __init__(self, nodes: Dict[str, Any], aliases: Dict[str, List[str]] = None,
+                 min_score: float = 0.3, margin: float = 0.15, fuzzy_cutoff: float = 0.7):
+        self.min_score = min_score
+        self.margin = margin
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.phrases: Dict[str, List[List[str]]] = {}
+        self.token_index: Dict[str, Set[str]] = {}
+        self.trigram_index: Dict[str, Set[str]] = {}
+        self._trigram_cache: Dict[str, Set[str]] = {}
+        
+        aliases = aliases or {}
+        for name, data in nodes.items():
+            node_aliases = list(aliases.get(name, []))
+            if isinstance(data, dict):
+                node_aliases += data.get("aliases", [])
+            self._add_node(name, node_aliases)
+        
+        self.idf = {
+            token: math.log(1 + len(self.phrases) / len(names))
+            for token, names in self.token_index.items()
+        }
+    
+    def _add_node(self, name: str, aliases: List[str]):
+        phrases = [tokenize(name)] + [tokenize(alias) for alias in aliases]
+        self.phrases[name] = [p for p in phrases if p]
+        for phrase in self.phrases[name]:
+            for token in phrase:
+                self.token_index.setdefault(token, set()).add(name)
+                for gram in self._trigrams(token):
+                    self.trigram_index.setdefault(gram, set()).add(token)
+    
+    def _trigrams(self, token: str) -> Set[str]:
+        grams = self._trigram_cache.get(token)
+        if grams is None:
+            grams = self._trigram_cache[token] = trigrams(token)
+        return grams
+    
+    def _match_tokens(self, words: List[str]) -> Dict[str, float]:
+        """Map index tokens to the best similarity any input word reaches"""
+        matched: Dict[str, float] = {}
+        for word in words:
+            if word in self.token_index:
+                matched[word] = 1.0
+                continue
+            
+            # Typo tolerance: only index words sharing two trigrams are compared
+            word_grams = self._trigrams(word)
+            shared: Dict[str, int] = {}
+            for gram in word_grams:
+                for token in self.trigram_index.get(gram, ()):
+                    shared[token] = shared.get(token, 0) + 1
+            for token, count in shared.items():
+                if count < 2:
+                    continue
+                similarity = difflib.SequenceMatcher(None, word, token).ratio()
+                if similarity >= self.fuzzy_cutoff and similarity > matched.get(token, 0.0):
+                    matched[token] = similarity
+        return matched
+    
+    def _phrase_score(self, phrase: List[str], matched: Dict[str, float], text: str) -> float:
+        weights = [self.idf.get(token, 1.0) for token in phrase]
+        score = sum(w * matched.get(token, 0.0) for token, w in zip(phrase, weights)) / sum(weights)
+        # Small bonus when the whole phrase appears verbatim
+        if score and re.search(r"\b" + r"\s+".join(map(re.escape, phrase)) + r"\b", text):
+            score = min(1.0, score + 0.1)
+        return score
+    
+    def resolve(self, text: str, candidates: List[str] = None, limit: int = 3) -> List[Tuple[str, float]]:
+        """
+        Rank destinations for a piece of text
+        
+        Args:
+            text: Player input
+            candidates: Restrict results to these node names (e.g. current connections)
+            limit: Maximum number of results
+            
+        Returns:
+            List of (node name, score in 0..1), best first
+        """
+        normalized = " ".join(re.findall(r"[a-z0-9']+", text.lower().replace("_", " ")))
+        matched = self._match_tokens(tokenize(text))
+        if not matched:
+            return []
+        
+        names = set()
+        for token in matched:
+            names |= self.token_index.get(token, set())
+        if candidates is not None:
+            names |= set(candidates)
+        
+        scores = {}
+        coverage = {}
+        for name in names:
+            phrases = [p for p in (self.phrases.get(name) or [tokenize(name)]) if p]
+            scores[name] = max((self._phrase_score(p, matched, normalized) for p in phrases), default=0.0)
+            coverage[name] = max((sum(matched.get(t, 0.0) for t in p) / len(p) for p in phrases), default=0.0)
+        
+        if candidates is not None:
+            # A node outside the candidates that covers more of its name means the
+            # player asked for somewhere else ("hotel_lobby" is not "rhq_lobby")
+            outside = max((c for name, c in coverage.items() if name not in candidates), default=0.0)
+            scores = {name: score for name, score in scores.items()
+                      if name in candidates and coverage[name] >= outside}
+        
+        ranked = [(name, round(score, 3)) for name, score in scores.items() if score > 0]
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+    
+    def is_ambiguous(self, ranked: List[Tuple[str, float]]) -> bool:
+        """True when the best match is weak or not clearly ahead of the runner-up"""
+        if not ranked or ranked[0][1] < self.min_score:
+            return True
+        return len(ranked) > 1 and ranked[0][1] - ranked[1][1] < self.margin
+    
+    def best(self, text: str, candidates: List[str] = None) -> Optional[str]:
+        """Best unambiguous match, or None"""
+        ranked = self.resolve(text, candidates)
+        return None if self.is_ambiguous(ranked) else ranked[0][0]
@@ -3,9 +3,11 @@ Game State Management
 Handles player state, current location, and game progression
 """
 import logging
+from collections import deque
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
 
+from core.config import config
 from core.exceptions import GameStateError
 from game.storage import GameStorage
 
@@ -155,6 +157,7 @@ class GameState:
         self.conversation_turns = 0
         self.locked_event = None
         self.in_combat = False
+        self.chat_history = deque(maxlen=config.game.max_chat_history)
         
         # Load game data
         self._load_from_data(game_data)
@@ -217,6 +220,31 @@ class GameState:
         
         return description
     
+    def describe_destination(self, destination: str) -> Optional[str]:
+        """
+        Describe a node as it will look on arrival, without moving there
+        
+        Args:
+            destination: Name of destination node
+            
+        Returns:
+            Description matching describe() after the move, or None if the node is unknown
+        """
+        node_data = self.storage.get_node(destination)
+        if not node_data:
+            return None
+        
+        node = GameNode.from_dict(node_data)
+        description = node.describe()
+        if node.current_event:
+            event_data = self.storage.get_event(node.current_event)
+            if event_data:
+                event = GameEvent.from_dict(event_data)
+                description += f"\n\nCurrent Event: {event.name}"
+                description += f"\n{event.description}"
+        
+        return description
+    
     def move_to(self, destination: str) -> bool:
         """
         Move player to new location
@@ -369,6 +397,5 @@ class GameState:
     
     def respond(self, response: str):
         """Add response to chat history (for frontend integration)"""
-        # This method exists for compatibility with the frontend
-        # Could be expanded to maintain chat history
-        pass
\ No newline at end of file
+        # Oldest entries drop off once max_chat_history is reached
+        self.chat_history.append(response)
\ No newline at end of file
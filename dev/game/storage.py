@@ -10,6 +10,7 @@ from datetime import datetime
 
 from core.config import config
 from core.exceptions import StorageError
+from core.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -51,7 +52,7 @@ class GameStorage:
         try:
             file_path = self.data_dir / filename
             if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
+                with span("storage_read", file=filename), open(file_path, 'r', encoding='utf-8') as f:
                     return json.load(f)
             else:
                 logger.warning(f"File {filename} not found, returning empty dict")
@@ -70,7 +71,7 @@ class GameStorage:
         """
         try:
             file_path = self.data_dir / filename
-            with open(file_path, 'w', encoding='utf-8') as f:
+            with span("storage_write", file=filename), open(file_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
             logger.debug(f"Saved {filename}")
         except Exception as e:
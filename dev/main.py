@@ -54,6 +54,9 @@ def print_system_status():
     print(f"👤 Default Player: {config_info['default_player']}")
     print(f"🏠 Default Location: {config_info['default_location']}")
     
+    if ai_status['health'] != 'unchecked':
+        print(f"📡 AI Health:      {ai_status['health']} (background check)")
+    
     if not ai_status['available'] and ai_status['last_error']:
         print(f"⚠️  AI Error:       {ai_status['last_error']}")
         print("   Game will run in basic mode with rule-based responses.")
@@ -64,6 +67,13 @@ def run_interactive_game(player_name: str = None):
     """Run interactive game session"""
     try:
         print_banner()
+        
+        # Connectivity check runs in the background; startup never waits on it
+        if config.ai.health_probe:
+            ai_client.start_health_probe()
+        elif config.ai.prewarm:
+            ai_client.prewarm_connection()
+        
         print_system_status()
         
         print("\nInitializing game engine...")
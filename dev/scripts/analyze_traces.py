@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Turn Trace Analyzer for Power Rangers: Neo Seoul
+Aggregates per-span latency percentiles and lists the slowest turns from logs/traces.jsonl
+"""
+import sys
+import json
+import argparse
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Any, List
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config import config
+from core.metrics import percentile
+
+def trace_files(path: Path) -> List[Path]:
+    """The trace file plus its rotated backups, oldest first"""
+    backups = [p for p in path.parent.glob(f"{path.name}.*") if p.suffix[1:].isdigit()]
+    backups.sort(key=lambda p: -int(p.suffix[1:]))
+    return backups + ([path] if path.exists() else [])
+
+def load_traces(paths: List[Path]) -> List[Dict[str, Any]]:
+    """Read turn traces, skipping lines that are not valid JSON"""
+    traces = []
+    skipped = 0
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    traces.append(json.loads(line))
+                except json.JSONDecodeError:
+                    skipped += 1
+    if skipped:
+        print(f"⚠️  Skipped {skipped} malformed lines")
+    return traces
+
+def span_table(traces: List[Dict[str, Any]]) -> str:
+    """Per-span count, percentiles and outcomes"""
+    durations: Dict[str, List[float]] = defaultdict(list)
+    outcomes: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for trace in traces:
+        if trace.get("duration_ms") is not None:
+            durations["(turn)"].append(trace["duration_ms"])
+            outcomes["(turn)"][trace.get("tags", {}).get("outcome", "ok")] += 1
+        for span in trace.get("spans", []):
+            durations[span["name"]].append(span["duration_ms"])
+            outcomes[span["name"]][span.get("tags", {}).get("outcome", "ok")] += 1
+    
+    lines = [f"{'span':<18}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}  outcomes"]
+    ordered = sorted(durations.items(), key=lambda item: -percentile(item[1], 95))
+    for name, values in ordered:
+        top = ", ".join(f"{k}={v}" for k, v in sorted(outcomes[name].items(), key=lambda kv: -kv[1])[:3])
+        lines.append(
+            f"{name:<18}{len(values):>7}{percentile(values, 50):>10.1f}{percentile(values, 95):>10.1f}"
+            f"{percentile(values, 99):>10.1f}{max(values):>10.1f}  {top}"
+        )
+    return "\n".join(lines)
+
+def slowest_turns(traces: List[Dict[str, Any]], count: int) -> str:
+    """The slowest turns with their three longest spans"""
+    timed = [t for t in traces if t.get("duration_ms") is not None]
+    timed.sort(key=lambda t: -t["duration_ms"])
+    lines = []
+    for trace in timed[:count]:
+        spans = sorted(trace.get("spans", []), key=lambda s: -s["duration_ms"])[:3]
+        detail = ", ".join(f"{s['name']} {s['duration_ms']:.0f}" for s in spans)
+        tags = trace.get("tags", {})
+        lines.append(
+            f"{trace['duration_ms']:>9.1f} ms  {trace['turn_id']}  {tags.get('action', '-'):<14}"
+            f"{(trace.get('input') or '')[:30]!r:<34} {detail}"
+        )
+    return "\n".join(lines) or "No turns recorded."
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Summarize turn traces")
+    parser.add_argument("--file", type=Path, default=config.logs_dir / config.game.trace_file,
+                        help="Trace file (rotated backups next to it are included)")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest turns to list")
+    parser.add_argument("--player", help="Only include turns by this player")
+    parser.add_argument("--action", help="Only include turns classified as this action")
+    args = parser.parse_args()
+    
+    paths = trace_files(args.file)
+    if not paths:
+        print(f"❌ No traces found at {args.file}")
+        sys.exit(1)
+    
+    traces = load_traces(paths)
+    if args.player:
+        traces = [t for t in traces if t.get("player") == args.player]
+    if args.action:
+        traces = [t for t in traces if t.get("tags", {}).get("action") == args.action]
+    
+    print(f"📊 {len(traces)} turns from {len(paths)} file(s)\n")
+    print(span_table(traces))
+    print(f"\n🐢 Slowest {args.top} turns")
+    print(slowest_turns(traces, args.top))
+
+if __name__ == "__main__":
+    main()
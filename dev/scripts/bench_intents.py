@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Intent Rule Benchmark for Power Rangers: Neo Seoul
+Checks the compiled intent rules against the regression corpus and times them
+against the old substring chain as the rule list grows
+"""
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from game.intent_rules import IntentMatcher, DEFAULT_RULES
+
+CORPUS_FILE = Path(__file__).parent.parent / "tests" / "intent_corpus.json"
+
+def substring_classify(rules, text: str):
+    """The previous approach: first rule in priority order with any substring hit"""
+    text = text.lower().strip()
+    for rule in sorted(rules, key=lambda r: -r.get("priority", 0)):
+        if any(phrase in text for phrase in rule["phrases"]):
+            if not rule.get("requires") or any(word in text for word in rule["requires"]):
+                return rule["intent"]
+    return None
+
+def check_corpus(matcher: IntentMatcher, corpus) -> int:
+    """
+    Run the regression corpus
+    
+    Args:
+        matcher: Compiled matcher to check
+        corpus: List of {"input", "expected"} cases
+    
+    Returns:
+        Number of failures
+    """
+    failures = 0
+    legacy_failures = 0
+    for case in corpus:
+        result = matcher.classify(case["input"])
+        if result != case["expected"]:
+            failures += 1
+            print(f"❌ {case['input']!r}: expected {case['expected']}, got {result}")
+        if substring_classify(DEFAULT_RULES, case["input"]) != case["expected"]:
+            legacy_failures += 1
+    
+    print(f"✅ {len(corpus) - failures}/{len(corpus)} corpus cases pass "
+          f"(substring matching: {len(corpus) - legacy_failures}/{len(corpus)})")
+    return failures
+
+def padded_rules(extra: int):
+    """Default rules plus `extra` filler rules that never match the corpus"""
+    rules = list(DEFAULT_RULES)
+    for i in range(extra):
+        rules.append({"intent": f"filler_{i}", "priority": 10,
+                      "phrases": [f"zq{i}x", f"zq{i}x yv{i}"]})
+    return rules
+
+def time_per_call(fn, inputs, rounds: int) -> float:
+    """Mean microseconds per call over `rounds` passes of the inputs"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in inputs:
+            fn(text)
+    return (time.perf_counter() - start) / (rounds * len(inputs)) * 1e6
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Check and benchmark the intent rules")
+    parser.add_argument("--rules", type=Path, help="Rules file to check (defaults to the built-in rules)")
+    parser.add_argument("--rounds", type=int, default=200, help="Timing passes over the corpus")
+    parser.add_argument("--check-only", action="store_true", help="Only run the regression corpus")
+    args = parser.parse_args()
+    
+    with open(CORPUS_FILE, 'r', encoding='utf-8') as f:
+        corpus = json.load(f)
+    
+    matcher = IntentMatcher.load(args.rules)
+    failures = check_corpus(matcher, corpus)
+    if args.check_only:
+        sys.exit(1 if failures else 0)
+    
+    inputs = [case["input"] for case in corpus]
+    print(f"\n{'rules':>6} {'compiled µs':>12} {'substring µs':>13}")
+    for extra in (0, 100, 1000):
+        rules = padded_rules(extra)
+        compiled = IntentMatcher.from_dicts(rules)
+        compiled_us = time_per_call(compiled.classify, inputs, args.rounds)
+        substring_us = time_per_call(lambda text: substring_classify(rules, text), inputs, max(1, args.rounds // 10))
+        print(f"{len(rules):>6} {compiled_us:>12.1f} {substring_us:>13.1f}")
+    
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark for Power Rangers: Neo Seoul
+Measures the time from interpreter start to the first game prompt
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+PROMPT_MARKER = "> "
+
+def time_to_prompt(player: str = None, timeout: float = 60.0) -> float:
+    """
+    Launch main.py and wait for the first input prompt
+    
+    Args:
+        player: Player name to pass through to main.py
+        timeout: Seconds to wait before giving up
+        
+    Returns:
+        Seconds from process launch to the first prompt
+    """
+    command = [sys.executable, "-u", "main.py"]
+    if player:
+        command += ["--player", player]
+    
+    env = dict(os.environ, PYTHONIOENCODING="utf-8")
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command,
+        cwd=PROJECT_ROOT,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=env
+    )
+    
+    try:
+        output = b""
+        marker = PROMPT_MARKER.encode("utf-8")
+        while not output.endswith(marker):
+            chunk = process.stdout.read(1)
+            if not chunk:
+                raise RuntimeError("Game exited before showing a prompt")
+            output += chunk
+            if time.perf_counter() - start > timeout:
+                raise TimeoutError(f"No prompt after {timeout:.0f}s")
+        return time.perf_counter() - start
+    finally:
+        process.kill()
+        process.wait()
+
+def main():
+    """Run the startup benchmark"""
+    parser = argparse.ArgumentParser(description="Measure interpreter start to first prompt")
+    parser.add_argument('--runs', '-n', type=int, default=5, help='Number of launches (default: 5)')
+    parser.add_argument('--player', '-p', type=str, help='Player name to load/create')
+    args = parser.parse_args()
+    
+    timings = []
+    for run in range(args.runs):
+        elapsed = time_to_prompt(args.player)
+        timings.append(elapsed)
+        print(f"  run {run + 1}: {elapsed * 1000:.1f} ms")
+    
+    print("=" * 40)
+    print(f"min:    {min(timings) * 1000:.1f} ms")
+    print(f"median: {statistics.median(timings) * 1000:.1f} ms")
+    print(f"max:    {max(timings) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Narration Pack Builder for Power Rangers: Neo Seoul
+Pre-generates narration for every world edge, node and event
+"""
+import sys
+import re
+import argparse
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config import config
+from core.ai_client import ai_client
+from game.storage import GameStorage
+from game.narration import NarrationPack
+
+logger = logging.getLogger(__name__)
+
+def _label(name: str) -> str:
+    """Turn a node id like hotel_lobby into 'hotel lobby'"""
+    return name.replace("_", " ")
+
+def _first_sentence(text: str) -> str:
+    """First sentence of a description"""
+    match = re.match(r"(.+?[.!?])(\s|$)", text.strip())
+    return match.group(1) if match else text.strip()
+
+class OfflineNarrator:
+    """
+    Local stand-in for the AI used when building without network access
+    Produces plain template narration from the data files.
+    """
+    
+    MOVE_TEMPLATES = [
+        "You leave the {src} behind and head for the {dst}. {first}",
+        "A short walk takes you from the {src} to the {dst}. {first}",
+        "You make your way out of the {src}. Before long you reach the {dst}. {first}",
+    ]
+    NODE_TEMPLATES = [
+        "You take in the {name}. {first}",
+        "{first}",
+        "You pause to look around the {name}. {first}",
+    ]
+    EVENT_TEMPLATES = [
+        "{description}.",
+        "Something is happening here: {description}.",
+        "{description}. You have a feeling this matters.",
+    ]
+    
+    def movement(self, src: Dict[str, Any], dst: Dict[str, Any], variant: int) -> str:
+        template = self.MOVE_TEMPLATES[variant % len(self.MOVE_TEMPLATES)]
+        return template.format(src=_label(src["name"]), dst=_label(dst["name"]),
+                               first=_first_sentence(dst.get("description", "")))
+    
+    def node(self, node: Dict[str, Any], variant: int) -> str:
+        template = self.NODE_TEMPLATES[variant % len(self.NODE_TEMPLATES)]
+        return template.format(name=_label(node["name"]), first=_first_sentence(node.get("description", "")))
+    
+    def event(self, event: Dict[str, Any], variant: int) -> str:
+        template = self.EVENT_TEMPLATES[variant % len(self.EVENT_TEMPLATES)]
+        return template.format(description=event.get("description", "").rstrip("."))
+
+class NarrationBuilder:
+    """
+    Walks the world graph and fills a NarrationPack
+    """
+    
+    def __init__(self, variants: int = 3, offline: bool = False):
+        self.variants = variants
+        self.offline = offline or not ai_client.is_available()
+        self.storage = GameStorage()
+        self.narrator = OfflineNarrator()
+    
+    def collect_jobs(self) -> List[Tuple[str, str, Any]]:
+        """
+        Build the list of (pack key, kind, subject) jobs for the whole world
+        
+        Returns:
+            One job per narration entry (variants are expanded later)
+        """
+        nodes = self.storage.load_nodes()
+        events = self.storage.load_events()
+        jobs = []
+        
+        for name, node in nodes.items():
+            jobs.append((f"node:{name}", "node", node))
+            for target in node.get("connections", []):
+                if target in nodes:
+                    jobs.append((NarrationPack.move_key(name, target), "move", (node, nodes[target])))
+                else:
+                    logger.warning(f"Skipping edge {name} -> {target}: unknown node")
+        
+        for name, event in events.items():
+            jobs.append((f"event:{name}", "event", event))
+        
+        return jobs
+    
+    def _offline_text(self, kind: str, subject: Any, variant: int) -> str:
+        if kind == "move":
+            return self.narrator.movement(subject[0], subject[1], variant)
+        if kind == "node":
+            return self.narrator.node(subject, variant)
+        return self.narrator.event(subject, variant)
+    
+    def _prompt(self, kind: str, subject: Any) -> str:
+        if kind == "move":
+            src, dst = subject
+            return f"""
+The player walks from {src['name']} to {dst['name']} in a text adventure set in Neo Seoul.
+
+Where they were:
+```
+{src.get('description', '')}
+```
+
+Where they arrive:
+```
+{dst.get('description', '')}
+```
+
+Write a brief, atmospheric transition (2-3 sentences) describing the movement and what they see on arrival. Do not list exits, items or characters.
+"""
+        if kind == "node":
+            return f"""
+Write a brief, atmospheric 2-sentence impression of this text adventure location:
+```
+{subject.get('description', '')}
+```
+Do not list exits, items or characters.
+"""
+        return f"""
+Write a brief, atmospheric 2-sentence teaser for this text adventure event without revealing how it ends:
+```
+{subject.get('description', '')}
+```
+"""
+    
+    def build(self) -> NarrationPack:
+        """Generate every variant and return the filled pack"""
+        jobs = self.collect_jobs()
+        pack = NarrationPack(meta={
+            "source": "offline" if self.offline else f"anthropic:{config.ai.model}",
+            "variants": self.variants
+        })
+        
+        expanded = [(key, kind, subject, v) for key, kind, subject in jobs for v in range(self.variants)]
+        print(f"📚 {len(jobs)} entries, {len(expanded)} variants to generate")
+        
+        if self.offline:
+            for key, kind, subject, v in expanded:
+                pack.add(key, self._offline_text(kind, subject, v))
+            return pack
+        
+        requests = [
+            {"messages": [{"role": "user", "content": self._prompt(kind, subject)}],
+             "max_tokens": 150, "temperature": 1.0}
+            for key, kind, subject, v in expanded
+        ]
+        responses = ai_client.create_message_batch(requests, call_type="narrate")
+        
+        failures = 0
+        for (key, kind, subject, v), response in zip(expanded, responses):
+            if response.success and response.content.strip():
+                pack.add(key, response.content)
+            else:
+                failures += 1
+                pack.add(key, self._offline_text(kind, subject, v))
+        
+        if failures:
+            print(f"  ⚠️ {failures} variants failed and used offline narration")
+        return pack
+
+def main():
+    """Build the narration pack"""
+    parser = argparse.ArgumentParser(description="Pre-generate narration for every world edge, node and event")
+    parser.add_argument('--variants', '-n', type=int, default=3, help='Variants per entry (default: 3)')
+    parser.add_argument('--offline', action='store_true', help='Use the local template narrator instead of the AI')
+    parser.add_argument('--output', '-o', type=str, help='Pack file (default: data/<NARRATION_PACK>)')
+    args = parser.parse_args()
+    
+    output = Path(args.output) if args.output else config.get_data_file(config.game.narration_pack)
+    
+    builder = NarrationBuilder(variants=args.variants, offline=args.offline)
+    pack = builder.build()
+    pack.save(output)
+    
+    print(f"✅ Wrote {len(pack)} entries ({len(pack.texts)} texts) to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Local Anthropic-Compatible Stand-In Server for Power Rangers: Neo Seoul
+Speaks the Messages API shape with configurable latency, token rates and
+injected errors, so load tests and fallbacks can be measured offline.
+Requests that force a tool get a tool_use block with input shaped like the
+tool's schema (or canned per tool in tool_inputs).
+
+Point the game at it with:
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 python main.py
+"""
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+DEFAULTS = {
+    "host": "127.0.0.1",
+    "port": 8765,
+    "latency": "lognormal:-1.2,0.5",   # time to first token, seconds
+    "tokens_per_second": 80.0,
+    "rate_limit_rate": 0.0,
+    "overload_rate": 0.0,
+    "retry_after": 1.0,
+    "responses": [],                    # [{"pattern": regex, "text": reply}]
+    "tool_inputs": {}                   # {tool name: input}; otherwise filled from the tool's schema
+}
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+def parse_latency(spec: str) -> Callable[[], float]:
+    """
+    Parse a latency distribution
+    
+    Supported forms: fixed:S, uniform:LO,HI, normal:MEAN,STD, lognormal:MU,SIGMA
+    
+    Returns:
+        Function returning a sample in seconds
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v]
+    
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda: max(0.0, random.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(values[0], values[1])
+    raise ValueError(f"Unknown latency distribution '{spec}'")
+
+def _block_text(content) -> Tuple[str, bool]:
+    """Flatten message content; report whether it carries a cache breakpoint"""
+    if isinstance(content, str):
+        return content, False
+    text = "".join(block.get("text", "") for block in content if isinstance(block, dict))
+    cached = any(isinstance(block, dict) and block.get("cache_control") for block in content)
+    return text, cached
+
+def _choose_tool(body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The tool a request forces (tool_choice type "tool"), else its first tool when one must or may be used"""
+    tools = body.get("tools") or []
+    choice = body.get("tool_choice") or {"type": "auto"}
+    if not tools or choice.get("type") == "none":
+        return None
+    if choice.get("type") == "tool":
+        return next((tool for tool in tools if tool.get("name") == choice.get("name")), None)
+    return tools[0]
+
+def fake_input(schema: Dict[str, Any], seed: str) -> Any:
+    """
+    A value shaped like a JSON schema
+    
+    Enums pick a member by hash of `seed` (the prompt), so one prompt always
+    gets the same answer while different prompts spread over the options.
+    Numbers take their maximum (or minimum, else 1), strings are empty.
+    """
+    if "enum" in schema:
+        options = schema["enum"]
+        return options[int(hashlib.sha1(seed.encode("utf-8")).hexdigest(), 16) % len(options)]
+    kind = schema.get("type", "object")
+    if kind == "object":
+        return {name: fake_input(prop, f"{seed}/{name}") for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return []
+    if kind in ("number", "integer"):
+        value = schema.get("maximum", schema.get("minimum", 1))
+        return int(value) if kind == "integer" else float(value)
+    if kind == "boolean":
+        return True
+    return ""
+
+class StubState:
+    """Settings, canned responses, prompt cache and counters shared by handler threads"""
+    
+    def __init__(self, settings: Dict[str, Any]):
+        self.settings = settings
+        self.latency = parse_latency(settings["latency"])
+        self.responses = [(re.compile(r["pattern"], re.IGNORECASE), r["text"]) for r in settings["responses"]]
+        self.cache = set()
+        self.stats = {"requests": 0, "streamed": 0, "rate_limited": 0, "overloaded": 0,
+                      "input_tokens": 0, "output_tokens": 0, "cache_read_tokens": 0}
+        self.lock = threading.Lock()
+    
+    def count(self, key: str, amount: int = 1):
+        with self.lock:
+            self.stats[key] += amount
+    
+    def reply_for(self, prompt: str) -> str:
+        for pattern, text in self.responses:
+            if pattern.search(prompt):
+                return text
+        return f"[stub] {prompt.strip()[-200:]}"
+    
+    def usage_for(self, body: Dict[str, Any]) -> Dict[str, int]:
+        """Input token split, simulating prompt caching up to the last breakpoint"""
+        parts: List[Tuple[str, bool]] = []
+        system = body.get("system")
+        if system:
+            parts.append(_block_text(system))
+        for message in body.get("messages", []):
+            parts.append(_block_text(message.get("content", "")))
+        
+        last_breakpoint = max((i for i, (_, cached) in enumerate(parts) if cached), default=-1)
+        prefix = "".join(text for text, _ in parts[:last_breakpoint + 1])
+        rest = "".join(text for text, _ in parts[last_breakpoint + 1:])
+        
+        usage = {"input_tokens": estimate_tokens(rest) if rest else 0,
+                 "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+        if prefix:
+            key = hashlib.sha1(prefix.encode("utf-8")).hexdigest()
+            with self.lock:
+                hit = key in self.cache
+                self.cache.add(key)
+            usage["cache_read_input_tokens" if hit else "cache_creation_input_tokens"] = estimate_tokens(prefix)
+        return usage
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Handles /v1/messages and /stats"""
+    
+    state: StubState = None
+    protocol_version = "HTTP/1.1"
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Dict[str, str] = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        self.send_header("request-id", f"req_stub_{uuid.uuid4().hex[:12]}")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _send_error(self, status: int, error_type: str, message: str, headers: Dict[str, str] = None):
+        self._send_json(status, {"type": "error", "error": {"type": error_type, "message": message}}, headers)
+    
+    def do_GET(self):
+        if self.path == "/stats":
+            with self.state.lock:
+                self._send_json(200, dict(self.state.stats))
+        else:
+            self._send_error(404, "not_found_error", f"Unknown path {self.path}")
+    
+    def do_HEAD(self):
+        # Connection pre-warming (core/http_transport.py) only needs headers back
+        self.send_response(200)
+        self.send_header("content-length", "0")
+        self.end_headers()
+    
+    def do_POST(self):
+        if self.path.split("?")[0] != "/v1/messages":
+            self._send_error(404, "not_found_error", f"Unknown path {self.path}")
+            return
+        
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))))
+        except ValueError:
+            self._send_error(400, "invalid_request_error", "Body is not valid JSON")
+            return
+        
+        state = self.state
+        settings = state.settings
+        state.count("requests")
+        
+        # Error injection
+        roll = random.random()
+        if roll < settings["rate_limit_rate"]:
+            state.count("rate_limited")
+            self._send_error(429, "rate_limit_error", "Stub rate limit",
+                             {"retry-after": str(settings["retry_after"])})
+            return
+        if roll < settings["rate_limit_rate"] + settings["overload_rate"]:
+            state.count("overloaded")
+            self._send_error(529, "overloaded_error", "Stub overloaded")
+            return
+        
+        if not body.get("messages"):
+            self._send_error(400, "invalid_request_error", "messages: field required")
+            return
+        
+        prompt, _ = _block_text(body["messages"][-1].get("content", ""))
+        tool = _choose_tool(body)
+        if tool is not None:
+            # A forced (or offered) tool is always called, with input shaped like its schema
+            tool_input = settings["tool_inputs"].get(tool["name"])
+            if tool_input is None:
+                tool_input = fake_input(tool.get("input_schema", {}), prompt)
+            block = {"type": "tool_use", "id": f"toolu_stub_{uuid.uuid4().hex[:16]}",
+                     "name": tool["name"], "input": tool_input}
+            text = json.dumps(tool_input)
+        else:
+            text = state.reply_for(prompt)
+            block = {"type": "text", "text": text}
+        usage = state.usage_for(body)
+        output_tokens = min(estimate_tokens(text), int(body.get("max_tokens", 1024)))
+        usage["output_tokens"] = output_tokens
+        
+        state.count("input_tokens", usage["input_tokens"])
+        state.count("output_tokens", output_tokens)
+        state.count("cache_read_tokens", usage["cache_read_input_tokens"])
+        
+        message = {
+            "id": f"msg_stub_{uuid.uuid4().hex[:16]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "stub"),
+            "content": [block],
+            "stop_reason": "tool_use" if block["type"] == "tool_use" else "end_turn",
+            "stop_sequence": None,
+            "usage": usage
+        }
+        
+        time.sleep(state.latency())
+        if body.get("stream"):
+            state.count("streamed")
+            self._stream(message, text)
+        else:
+            time.sleep(output_tokens / settings["tokens_per_second"])
+            self._send_json(200, message)
+    
+    def _stream(self, message: Dict[str, Any], text: str):
+        """Send the message as server-sent events at the configured token rate"""
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("cache-control", "no-cache")
+        self.send_header("connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        
+        def event(name: str, data: Dict[str, Any]):
+            self.wfile.write(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        
+        usage = message["usage"]
+        start = dict(message, content=[], stop_reason=None, usage=dict(usage, output_tokens=1))
+        event("message_start", {"type": "message_start", "message": start})
+        block = message["content"][0]
+        if block["type"] == "tool_use":
+            # Tool input streams as partial JSON
+            opening, delta_type, delta_key = dict(block, input={}), "input_json_delta", "partial_json"
+        else:
+            opening, delta_type, delta_key = {"type": "text", "text": ""}, "text_delta", "text"
+        event("content_block_start", {"type": "content_block_start", "index": 0, "content_block": opening})
+        event("ping", {"type": "ping"})
+        
+        chunk_delay = 1.0 / self.state.settings["tokens_per_second"]
+        for i in range(0, len(text), 4):
+            time.sleep(chunk_delay)
+            event("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                          "delta": {"type": delta_type, delta_key: text[i:i + 4]}})
+        
+        event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        event("message_delta", {"type": "message_delta",
+                                "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+                                "usage": {"output_tokens": usage["output_tokens"]}})
+        event("message_stop", {"type": "message_stop"})
+
+def load_settings(args) -> Dict[str, Any]:
+    """Merge defaults, an optional JSON config file and command line overrides"""
+    settings = dict(DEFAULTS)
+    if args.config:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f))
+    for key in DEFAULTS:
+        value = getattr(args, key, None)
+        if value is not None:
+            settings[key] = value
+    return settings
+
+def main():
+    """Run the stand-in server"""
+    parser = argparse.ArgumentParser(description="Local Anthropic Messages API stand-in")
+    parser.add_argument('--config', '-c', type=str, help='JSON settings file (keys as in DEFAULTS)')
+    parser.add_argument('--host', type=str)
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--latency', type=str, help='fixed:S | uniform:LO,HI | normal:MEAN,STD | lognormal:MU,SIGMA')
+    parser.add_argument('--tokens-per-second', dest='tokens_per_second', type=float)
+    parser.add_argument('--rate-limit-rate', dest='rate_limit_rate', type=float, help='Fraction of calls answered with 429')
+    parser.add_argument('--overload-rate', dest='overload_rate', type=float, help='Fraction of calls answered with 529')
+    parser.add_argument('--retry-after', dest='retry_after', type=float, help='retry-after seconds sent with 429s')
+    args = parser.parse_args()
+    
+    settings = load_settings(args)
+    StubHandler.state = StubState(settings)
+    server = ThreadingHTTPServer((settings["host"], settings["port"]), StubHandler)
+    server.daemon_threads = True
+    
+    print(f"🧪 Stub Messages API on http://{settings['host']}:{settings['port']} "
+          f"(latency {settings['latency']}, {settings['tokens_per_second']} tok/s, "
+          f"429 {settings['rate_limit_rate']:.0%}, 529 {settings['overload_rate']:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
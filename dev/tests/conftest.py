@@ -0,0 +1,14 @@
+import os
+
+import pytest
+
+# The terminal game's modules live at the repository root and read data/ relative to the working directory.
+# The root goes ahead of dev/, whose packages (combat, ...) would otherwise shadow its modules.
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    monkeypatch.syspath_prepend(ROOT)
+    monkeypatch.chdir(ROOT)
+    return ROOT
@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+from core.circuit_breaker import CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(failure_threshold=3, reset_timeout=30.0, clock=clock)
+
+
+def test_opens_after_failure_threshold(breaker):
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.is_open()
+    assert not breaker.allow_request()
+    assert breaker.get_status()["rejected"] == 1
+
+
+def test_success_resets_the_failure_count(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_after_reset_timeout(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 29.9
+    assert not breaker.allow_request()
+    clock.now += 0.2
+    assert not breaker.is_open()
+    assert breaker.allow_request()  # the one trial call
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()  # everyone else waits for it
+
+
+def test_half_open_probe_success_closes(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 31
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request() and breaker.allow_request()
+
+
+def test_half_open_probe_failure_reopens(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 31
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.get_status()["retry_in"] == pytest.approx(30.0)
+    assert breaker.get_status()["times_opened"] == 2
+
+
+def test_rate_limit_sets_reset_without_extending_open_period(clock):
+    from core.ai_client import AIClient
+    client = AIClient()
+    client.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0, clock=clock)
+    before = time.time()
+    for _ in range(3):
+        response = client._error_response("rate_limited", "429", retry_after=120.0)
+    assert response.fallback == "rate_limited"
+    assert client.rate_limit_reset == pytest.approx(before + 120.0, abs=1.0)
+    # The breaker opened on the threshold like any other failure, for reset_timeout only
+    assert client.breaker.state == CircuitBreaker.OPEN
+    assert client.breaker.open_until == pytest.approx(clock.now + 30.0)
+    clock.now += 31
+    assert client.breaker.allow_request()
+
+
+def test_rate_limit_without_retry_after_counts_as_a_failure(clock):
+    from core.ai_client import AIClient
+    client = AIClient()
+    client.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0, clock=clock)
+    client.rate_limit_reset = 0
+    client._error_response("rate_limited", "429", retry_after=None)
+    assert client.rate_limit_reset == 0
+    assert client.breaker.failures == 1
+    assert client.breaker.state == CircuitBreaker.CLOSED
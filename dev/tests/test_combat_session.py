@@ -0,0 +1,105 @@
+import json
+import os
+import random
+import threading
+
+import pytest
+
+
+def _fight(mode, seed, rng):
+    """Play a whole session through JSON round-trips; returns it and every event the client got"""
+    import combat_session
+    session = combat_session.FightSession.start("test", mode, seed=seed)
+    events = session.advance()
+    while session.outcome is None:
+        session = combat_session.FightSession.from_dict(json.loads(json.dumps(session.to_dict())))
+        events += session.advance(rng.choice(["punch", "kick", "bogus", "earth shatter", "shove", "breathe"]))
+    return session, events
+
+
+@pytest.mark.parametrize("mode", ["team", "duel"])
+def test_events_match_replay(mode):
+    import combat_replay
+    rng = random.Random(1)
+    for seed in range(10):
+        session, events = _fight(mode, seed, rng)
+        assert combat_replay.check(session.entry()) is None
+        replayed = combat_replay.replay(session.entry()).events
+        assert json.loads(json.dumps(replayed)) == json.loads(json.dumps(events)), (mode, seed)
+
+
+@pytest.mark.parametrize("fight_id", ["../evil", "a/b", "", "x.json", None])
+def test_bad_fight_ids_are_rejected(fight_id):
+    import combat_session
+    import storage
+    with pytest.raises(ValueError):
+        combat_session.FightSession.start(fight_id)
+    with pytest.raises(ValueError):
+        storage.save_fight(fight_id, {})
+
+
+@pytest.fixture
+def fight_dir(monkeypatch, tmp_path):
+    import storage
+    monkeypatch.setattr(storage, "DATA_DIR", str(tmp_path))
+    return tmp_path / "fights"
+
+
+def test_submit_saves_atomically_and_rejects_stale_moves(fight_dir):
+    import combat_session
+    session = combat_session.FightSession.start("stale", "duel", seed=3)
+    session.advance()
+    combat_session.save(session)
+    moves = session.moves
+    session, _ = combat_session.submit("stale", "punch", moves)
+    assert session.moves == moves + 1
+    with pytest.raises(ValueError):
+        combat_session.submit("stale", "punch", moves)
+    assert os.listdir(fight_dir) == ["stale.json"]
+    assert combat_session.load("stale").to_dict() == session.to_dict()
+    assert combat_session._locks == {}
+
+
+def test_concurrent_submits_apply_one_move(fight_dir):
+    import combat_session
+    session = combat_session.FightSession.start("race", "duel", seed=4)
+    session.advance()
+    combat_session.save(session)
+    moves, results, start = session.moves, [], threading.Barrier(8)
+    
+    def client():
+        start.wait()
+        try:
+            combat_session.submit("race", "breathe", moves)
+            results.append("applied")
+        except ValueError:
+            results.append("stale")
+    
+    threads = [threading.Thread(target=client) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(results) == ["applied"] + ["stale"] * 7
+    assert combat_session.load("race").moves == moves + 1
+    assert combat_session._locks == {}
+
+
+def test_submit_rejects_a_finished_fight(fight_dir):
+    import combat_session
+    session, _ = _fight("duel", 5, random.Random(2))
+    combat_session.save(session)
+    with pytest.raises(ValueError, match="already over"):
+        combat_session.submit(session.id, "punch", session.moves)
+    with pytest.raises(ValueError, match="already over"):
+        session.advance("punch")
+    assert combat_session._locks == {}
+
+
+def test_play_reports_a_finished_fight(fight_dir, capsys):
+    import combat_session
+    session, _ = _fight("duel", 5, random.Random(2))
+    combat_session.save(session)
+    assert combat_session.play(session.id) == session.outcome
+    assert "already over" in capsys.readouterr().out
+    assert combat_session.load(session.id) is None
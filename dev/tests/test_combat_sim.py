@@ -0,0 +1,16 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+
+def test_vectorized_engine_matches_team_combat():
+    import combat_sim
+    assert combat_sim.check(scalar_battles=2_000, vector_battles=20_000, seed=7)
+
+
+def test_simulate_is_reproducible():
+    import combat_sim
+    first = combat_sim.simulate(2_000, seed=3)
+    second = combat_sim.simulate(2_000, seed=3)
+    assert first.win_rate == second.win_rate
+    assert first.mean_turns() == second.mean_turns()
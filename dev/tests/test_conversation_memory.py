@@ -0,0 +1,99 @@
+import threading
+
+
+def exchange(i):
+    # Ten estimated tokens each (conversation_memory.estimate_tokens)
+    return (f"line {i}".ljust(39, "."), "")
+
+
+class FakeSummarize:
+    """Records each fold and names the lines it folded; blocks until released when started blocked"""
+    def __init__(self, blocked=False, fail=False):
+        self.calls = []
+        self.fail = fail
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        if not blocked:
+            self.release.set()
+    
+    def __call__(self, previous, batch):
+        self.entered.set()
+        self.release.wait(5)
+        self.calls.append((previous, list(batch)))
+        if self.fail:
+            raise RuntimeError("summary service down")
+        return "; ".join(user.rstrip(".") for user, _ in batch)
+
+
+def drain():
+    # The summary pool has one worker, so a no-op queued behind a fold runs after it
+    from conversation_memory import _summary_pool
+    _summary_pool.submit(lambda: None).result(5)
+
+
+def memory(summarize, **kwargs):
+    from conversation_memory import ConversationMemory
+    return ConversationMemory(summarize, **kwargs)
+
+
+def test_folds_fold_batch_exchanges_beyond_keep_last():
+    summarize = FakeSummarize()
+    mem = memory(summarize, keep_last=2, fold_batch=2, token_budget=1000)
+    for i in range(3):
+        mem.add(*exchange(i))
+    drain()
+    assert summarize.calls == []
+    assert mem.snapshot() == ("", [exchange(0), exchange(1), exchange(2)])
+    
+    mem.add(*exchange(3))
+    drain()
+    assert summarize.calls == [("", [exchange(0), exchange(1)])]
+    assert mem.snapshot() == ("line 0; line 1", [exchange(2), exchange(3)])
+    assert mem.pending == []
+
+
+def test_token_budget_evicts_oldest_exchanges():
+    summarize = FakeSummarize()
+    mem = memory(summarize, keep_last=6, fold_batch=4, token_budget=25)
+    for i in range(3):
+        mem.add(*exchange(i))
+    drain()
+    assert mem.recent == [exchange(1), exchange(2)]
+    assert summarize.calls == [("", [exchange(0)])]
+    assert mem.prompt_tokens() <= 25
+
+
+def test_snapshot_keeps_pending_exchanges_only_while_they_fit():
+    summarize = FakeSummarize(blocked=True)
+    mem = memory(summarize, keep_last=2, fold_batch=2, token_budget=35)
+    for i in range(4):
+        mem.add(*exchange(i))
+    assert mem.pending == [exchange(0), exchange(1)]
+    # 10 tokens per exchange plus 1 for the empty summary: exchange 0 would bring it to 41
+    assert mem.snapshot() == ("", [exchange(1), exchange(2), exchange(3)])
+    summarize.release.set()
+    drain()
+    assert mem.snapshot() == ("line 0; line 1", [exchange(2), exchange(3)])
+
+
+def test_truncates_when_summarize_fails():
+    mem = memory(FakeSummarize(fail=True), keep_last=1, fold_batch=1, token_budget=1000)
+    mem.add("hello", "hi")
+    mem.add("who are you", "a servo bot")
+    drain()
+    assert mem.summary == "Player: hello"
+    assert mem.pending == []
+
+
+def test_clear_drops_a_fold_in_progress():
+    summarize = FakeSummarize(blocked=True)
+    mem = memory(summarize, keep_last=1, fold_batch=1, token_budget=1000)
+    mem.add(*exchange(0))
+    mem.add(*exchange(1))  # starts folding exchange 0
+    assert summarize.entered.wait(5)
+    mem.clear()
+    mem.add(*exchange(2))
+    mem.add(*exchange(3))  # exchange 2 waits for the running fold
+    summarize.release.set()
+    drain()
+    assert mem.snapshot() == ("line 2", [exchange(3)])
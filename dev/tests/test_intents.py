@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+
+import pytest
+
+# Each case gives the dev matcher's intent ("expected") and the root game's ("root"); null means no rule
+# fires and the input goes to the model
+CORPUS = json.loads((Path(__file__).parent / "intent_corpus.json").read_text(encoding="utf-8"))
+IDS = [case["input"] for case in CORPUS]
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=IDS)
+def test_dev_matcher(case):
+    from game.intent_rules import IntentMatcher
+    assert IntentMatcher.load().classify(case["input"]) == case["expected"]
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=IDS)
+def test_root_rules(case):
+    from intents import IntentRules
+    assert IntentRules.load().classify(case["input"]) == case["root"]
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=IDS)
+def test_root_game_ai(case):
+    pytest.importorskip("anthropic")
+    from game_ai import GameAI
+    assert GameAI.__new__(GameAI)._apply_rules(case["input"]) == case["root"]
+
+
+def test_unless_vetoes_a_rule():
+    from game.intent_rules import IntentMatcher
+    from intents import IntentRules
+    rules = [{"intent": "quit", "priority": 10, "phrases": ["quit"], "unless": ["not"]}]
+    for matcher in (IntentMatcher.from_dicts(rules), IntentRules(rules)):
+        assert matcher.classify("quit now") == "quit"
+        assert matcher.classify("do not quit") is None
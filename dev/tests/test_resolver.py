@@ -0,0 +1,68 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from game.resolver import DestinationResolver
+
+DATA = Path(__file__).parent.parent / "data"
+
+
+@pytest.fixture(scope="module")
+def resolver():
+    nodes = json.loads((DATA / "nodes.json").read_text(encoding="utf-8"))
+    aliases = json.loads((DATA / "aliases.json").read_text(encoding="utf-8"))
+    return DestinationResolver(nodes, aliases)
+
+
+def test_typo_resolves_to_hotel_lobby(resolver):
+    ranked = resolver.resolve("go to hotl lobby")
+    assert ranked[0][0] == "hotel_lobby"
+    assert not resolver.is_ambiguous(ranked)
+    assert resolver.best("go to hotl lobby") == "hotel_lobby"
+
+
+def test_shared_word_ranks_rhq_lobby_first_but_stays_ambiguous(resolver):
+    ranked = resolver.resolve("the lobby")
+    assert [name for name, _ in ranked[:2]] == ["rhq_lobby", "hotel_lobby"]
+    assert resolver.is_ambiguous(ranked)
+    assert resolver.best("the lobby") is None
+
+
+@pytest.mark.parametrize("text, node", [
+    ("go to the cafeteria", "mess_hall"),
+    ("take me to the statue", "monument"),
+    ("head to the zord bay", "rhq_hangar"),
+])
+def test_alias_hits(resolver, text, node):
+    assert resolver.best(text) == node
+
+
+def test_candidates_exclude_a_better_covered_node(resolver):
+    assert resolver.resolve("go to hotel_lobby", ["rhq_lobby", "rhq_central"]) == []
+
+
+@pytest.mark.parametrize("ranked, ambiguous", [
+    ([], True),
+    ([("a", 0.29)], True),                 # below min_score
+    ([("a", 0.31)], False),
+    ([("a", 0.9), ("b", 0.76)], True),     # within the 0.15 margin
+    ([("a", 0.9), ("b", 0.74)], False),
+])
+def test_ambiguity_threshold(ranked, ambiguous):
+    assert DestinationResolver({}).is_ambiguous(ranked) is ambiguous
+
+
+def test_only_ambiguous_queries_reach_the_model(resolver, monkeypatch):
+    from game.ai_handler import AIHandler, ai_client
+    handler = AIHandler()
+    handler.resolver = resolver
+    asked = []
+    monkeypatch.setattr(ai_client, "is_available", lambda: True)
+    monkeypatch.setattr(handler, "_ai_pick_destination", lambda text, options: asked.append(options) or options[-1])
+    connections = ["hotel_lobby", "rhq_lobby"]
+    
+    assert handler._extract_destination("go to hotl lobby", connections, game_state=object()) == "hotel_lobby"
+    assert asked == []
+    assert handler._extract_destination("the lobby", connections, game_state=object()) == "hotel_lobby"
+    assert asked == [["rhq_lobby", "hotel_lobby"]]
@@ -0,0 +1,95 @@
+import threading
+import time
+
+from core.ai_client import AIClient, AIResponse
+from core.single_flight import SingleFlight
+
+CALLERS = 8
+
+
+class BlockingUpstream:
+    """Counts calls and holds each one until released"""
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.result = result
+        self.error = error
+        self.release = threading.Event()
+    
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def run_concurrently(fn, waiting, count=CALLERS):
+    """Start `count` threads running fn; returns once `waiting()` says they all joined, then lets them finish"""
+    results, errors = [None] * count, [None] * count
+    
+    def worker(i):
+        try:
+            results[i] = fn()
+        except Exception as e:
+            errors[i] = e
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while waiting() < count - 1 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return threads, results, errors
+
+
+def finish(threads, upstream):
+    upstream.release.set()
+    for thread in threads:
+        thread.join(5)
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    upstream = BlockingUpstream(result=object())
+    threads, results, errors = run_concurrently(lambda: flight.do("key", upstream), lambda: flight.shared)
+    finish(threads, upstream)
+    assert upstream.calls == 1
+    assert errors == [None] * CALLERS
+    assert all(result is upstream.result for result, _ in results)
+    assert sorted(shared for _, shared in results) == [False] + [True] * (CALLERS - 1)
+    assert flight.in_flight() == 0
+
+
+def test_exception_reaches_every_waiter():
+    flight = SingleFlight()
+    upstream = BlockingUpstream(error=RuntimeError("upstream down"))
+    threads, results, errors = run_concurrently(lambda: flight.do("key", upstream), lambda: flight.shared)
+    finish(threads, upstream)
+    assert upstream.calls == 1
+    assert all(error is upstream.error for error in errors)
+    assert flight.in_flight() == 0
+
+
+def test_different_keys_and_later_calls_are_not_shared():
+    flight = SingleFlight()
+    upstream = BlockingUpstream(result=1)
+    upstream.release.set()
+    assert flight.do("a", upstream) == (1, False)
+    assert flight.do("a", upstream) == (1, False)
+    assert flight.do("b", upstream) == (1, False)
+    assert upstream.calls == 3 and flight.shared == 0
+
+
+def test_client_counts_upstream_saved(monkeypatch):
+    client = AIClient()
+    upstream = BlockingUpstream(result=AIResponse(content="hi", success=True, input_tokens=10, tokens_used=5))
+    monkeypatch.setattr(client, "_create_message", upstream)
+    messages = [{"role": "user", "content": "Where am I?"}]
+    threads, results, errors = run_concurrently(lambda: client.create_message(messages, "describe"),
+                                                lambda: client.single_flight.shared)
+    finish(threads, upstream)
+    assert upstream.calls == 1 and errors == [None] * CALLERS
+    assert sum(response.shared for response in results) == CALLERS - 1
+    stats = client.metrics.summary()["describe"]
+    assert stats["calls"] == CALLERS
+    assert stats["upstream_saved"] == CALLERS - 1
+    assert stats["input_tokens"] == 10  # followers don't pay for tokens
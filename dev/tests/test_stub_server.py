@@ -0,0 +1,71 @@
+import json
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from scripts.stub_server import DEFAULTS, StubHandler, StubState, fake_input
+
+INTERPRET_TOOL = {
+    "name": "interpret_command",
+    "description": "Record what the player wants to do and what it applies to.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "intent": {"type": "string", "enum": ["where_am_i", "move_location", "sub_action", "fallback"]},
+            "target": {"type": "string"},
+            "confidence": {"type": "number", "minimum": 0, "maximum": 1}
+        },
+        "required": ["intent", "target", "confidence"]
+    }
+}
+
+
+@pytest.fixture
+def stub():
+    StubHandler.state = StubState(dict(DEFAULTS, latency="fixed:0", tokens_per_second=1e9,
+                                       tool_inputs={"pick": {"choice": "rhq_lobby"}}))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    def post(body):
+        request = urllib.request.Request(f"http://127.0.0.1:{server.server_port}/v1/messages",
+                                         data=json.dumps(body).encode("utf-8"),
+                                         headers={"content-type": "application/json"})
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return json.loads(response.read())
+    yield post
+    server.shutdown()
+    server.server_close()
+
+
+def test_forced_tool_gets_a_schema_shaped_tool_use(stub):
+    message = stub({"model": "m", "max_tokens": 200, "tools": [INTERPRET_TOOL],
+                    "tool_choice": {"type": "tool", "name": "interpret_command"},
+                    "messages": [{"role": "user", "content": 'Input: "go to the lobby"'}]})
+    assert message["stop_reason"] == "tool_use"
+    [block] = message["content"]
+    assert block["type"] == "tool_use" and block["name"] == "interpret_command"
+    assert block["input"]["intent"] in INTERPRET_TOOL["input_schema"]["properties"]["intent"]["enum"]
+    assert block["input"]["confidence"] == 1.0
+    assert block["input"]["target"] == ""
+
+
+def test_canned_tool_input(stub):
+    tools = [{"name": "other", "input_schema": {}}, {"name": "pick", "input_schema": {}}]
+    message = stub({"model": "m", "max_tokens": 50, "tools": tools, "tool_choice": {"type": "tool", "name": "pick"},
+                    "messages": [{"role": "user", "content": "which?"}]})
+    assert message["content"][0]["input"] == {"choice": "rhq_lobby"}
+
+
+def test_without_tools_replies_with_text(stub):
+    message = stub({"model": "m", "max_tokens": 50, "messages": [{"role": "user", "content": "hello"}]})
+    assert message["stop_reason"] == "end_turn"
+    assert message["content"][0]["type"] == "text"
+
+
+def test_fake_input_is_stable_per_prompt():
+    schema = INTERPRET_TOOL["input_schema"]
+    assert fake_input(schema, "a") == fake_input(schema, "a")
+    assert len({fake_input(schema, str(i))["intent"] for i in range(50)}) > 1
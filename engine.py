@@ -1,10 +1,13 @@
 from game_ai import GameAI
+import http_transport
+import turn_trace
 from state import GameState
 import storage as st
 import json
 
 # Setup
 ai = GameAI()
+http_transport.prewarm()
 
 
 data = st.get_game("Tourist")
@@ -15,18 +18,29 @@ print(state.describe())
 
 while True:
     user_input = input("\n> ")
+    if user_input.strip().lower() == "ai_status":
+        print(ai.status_report())
+        continue
+    turn_trace.begin(state.player.name, user_input)
     if state.locked_event == "conversation":
         # Don't classify — treat everything as part of the event
-        classified = { "action": "perform_event", "args": { "raw": user_input } }
+        classified = { "action": "perform_event", "raw": user_input }
     else:
         # Normal classification
-        classified = ai.classify_input(user_input, state)
+        with turn_trace.span("classify"):
+            classified = ai.classify_input(user_input, state)
     
     if classified["action"] == "quit":
+        turn_trace.end(action="quit")
         print("Saving the game and quitting")
         break
 
-    response = ai.process_command(classified, state)
-    state.respond(response)    
+    with turn_trace.span("process"):
+        response = ai.process_command(classified, state)
+    with turn_trace.span("response_write"):
+        state.respond(response)    
+    turn_trace.end(action=classified["action"], location=state.current_node.name)
 
     print(response)
+
+turn_trace.close()
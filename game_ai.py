@@ -4,34 +4,54 @@ import anthropic
 from typing import Dict
 import difflib
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import node
+import http_transport
+from turn_trace import span, tag_turn
+from conversation_memory import ConversationMemory
+from intents import IntentRules
+
+# Keyword rules with explicit priorities, from data/intent_rules.json (see intents.py)
+INTENT_RULES = IntentRules.load()
+
+# Independent work within a turn (narration for a move that is already validated)
+_turn_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="turn")
+
+# Same variable and default as dev/core/config.py
+FAST_MODEL = os.getenv("CLAUDE_FAST_MODEL", "claude-3-5-haiku-20241022")
+STORY_MODEL = os.getenv("CLAUDE_MODEL", "claude-3-7-sonnet-20250219")
+
+# Classification and extraction gate every turn, so they go to the fast model
+ROUTES = {
+    "classify": {"model": FAST_MODEL, "max_tokens": 200, "temperature": 0},
+    "extract": {"model": FAST_MODEL, "max_tokens": 20, "temperature": 0},
+    "summarize": {"model": FAST_MODEL, "max_tokens": 300, "temperature": 0},
+    "narrate": {"model": STORY_MODEL, "max_tokens": 1000, "temperature": 0.1},
+    "conversation": {"model": STORY_MODEL, "max_tokens": 1000, "temperature": 0.1},
+}
 
 
 class GameAI:
     def __init__(self):
         api_key = os.getenv("ANTHROPIC_API_KEY")
-        self.client = anthropic.Anthropic(api_key=api_key)
-        self.model = "claude-3-7-sonnet-20250219"
-        self.max_tokens = 1000
-        self.temperature = 0.1
+        # All instances share one connection pool (see http_transport.py)
+        self.client = anthropic.Anthropic(api_key=api_key, http_client=http_transport.shared_client())
+        self.routes = {call_type: dict(route) for call_type, route in ROUTES.items()}
+        self.route_stats = {call_type: {"calls": 0, "errors": 0, "total_latency": 0.0} for call_type in self.routes}
+        self._stats_lock = threading.Lock()  # narration runs on _turn_pool while the main thread also calls
+        self.last_turn_timing: Dict[str, float] = {}
+        self.cache_stats = {"calls": 0, "cache_read_tokens": 0, "cache_write_tokens": 0, "uncached_tokens": 0}
+        self.memories: Dict[str, ConversationMemory] = {}
     
     
     def _apply_rules(self, text: str):
-        text = text.lower()
-
-        if "where" in text:
-            return "where_am_i"
-        if "who" in text:
-            return "who_is_here"
-        if any(kw in text for kw in ["go to", "move to", "travel to"]):
-            return "move_location"
-        if any(kw in text for kw in ["do", "start", "continue", "complete", "perform"]):
-            return "sub_action"
-        if "save" in text:
-            return "save"
-        if "quit" in text or "exit" in text:
-            return "quit"
-        return None
+        # One pass over the input; the highest-priority rule that matches wins
+        return INTENT_RULES.classify(text)
     
+    MOVE_WORDS = {"go", "to", "the", "a", "move", "walk", "head", "travel", "into", "towards"}
+
     def _match_node_name(self, user_node_name: str, available_nodes: list[str]):
         """
         Attempts to match the user's intended node to one of the available connections.
@@ -49,10 +69,24 @@ class GameAI:
         return user_node_name
     
     def classify_input(self, text, state):
-        intent = self._apply_rules(text)
+        with span("classify_rules") as tags:
+            intent = self._apply_rules(text)
+            tags["outcome"] = intent or "miss"
+        target = None
 
-        if not intent:
-            intent = self._gpt_classify(text)
+        if intent == "move_location":
+            with span("resolve_local") as tags:
+                target = self._local_node_match(text, state.current_node.connections)
+                tags["outcome"] = "match" if target else "none"
+
+        # One structured call settles both the intent and its target
+        if not intent or (intent == "move_location" and not target):
+            with span("classify_ai") as tags:
+                interpreted = self._gpt_interpret(text, state)
+                tags["outcome"] = interpreted["intent"]
+            intent = intent or interpreted["intent"]
+            if interpreted["intent"] == intent:
+                target = interpreted["target"]
 
         args = {}
         if intent == "quit" or intent == "save":
@@ -63,7 +97,8 @@ class GameAI:
         if intent == "move_location":
             args = {
                 "action": "move_to",
-                "raw": text
+                "raw": text,
+                "target": target
             }
         elif intent == "sub_action":
             args = {
@@ -77,7 +112,33 @@ class GameAI:
             }
         return args
     
+    def _rank_nodes(self, text_input: str, options):
+        """
+        Scores each option by how many of its underscore-split words appear
+        (or nearly appear) in the input. Returns (score, node) pairs, best first.
+        """
+        words = [w for w in text_input.lower().replace("_", " ").split() if w not in self.MOVE_WORDS]
+        ranked = []
+        for node in options:
+            parts = node.lower().split("_")
+            hits = sum(1 for part in parts if part in words or difflib.get_close_matches(part, words, n=1, cutoff=0.8))
+            if hits:
+                ranked.append((hits / len(parts), node))
+        ranked.sort(reverse=True)
+        return ranked
+
+    def _local_node_match(self, text_input: str, options):
+        ranked = self._rank_nodes(text_input, options)
+        if len(ranked) == 1 or (ranked and ranked[0][0] > ranked[1][0]):
+            return ranked[0][1]
+        return None
+
     def _extract_node(self, text_input: str, options):
+        # Only spend a model call when the words don't settle it
+        local = self._local_node_match(text_input, options)
+        if local:
+            return local
+
         prompt = f"""
 Player said: "{text_input}"
 
@@ -87,12 +148,7 @@ If the player is asking to move, return ONLY the node name. If it's not clear, r
 """
 
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1000,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0
-            )
+            response = self._create("extract", messages=[{"role": "user", "content": prompt}])
             loc = response.content[0].text
             print("Extracted node:", loc)
             return loc
@@ -111,33 +167,82 @@ If the player is asking to move, return ONLY the node name. If it's not clear, r
         elif action == "move_to":
             requested_node = take_action
             available = state.current_node.connections
-            matched_node = self._extract_node(requested_node, available)
-            if matched_node:
-                state.move_to(matched_node)
-                return self._gpt_wrap_movement(matched_node, state.current_node.describe())
+            matched_node = classified.get("target") or self._extract_node(requested_node, available)
+            if matched_node in available:
+                return self._move_and_narrate(matched_node, state)
             else:
                 return f"You can't go to '{requested_node}' from here. Try: {', '.join(available)}."
             
         elif action == "perform_event":
+            event = state.current_event
             result = state.perform_event()
 
             # GPT handles interactive turns
             if isinstance(result, dict) and result.get("status") == "awaiting_player_question":
-                response = result["response"]
-                return response
+                return self._conversation_turn(take_action, event, result["response"], state)
 
             # GPT wraps up movement after conversation ends
             elif isinstance(result, dict) and result.get("status") == "movement_complete":
+                if event:
+                    self.memories.pop(event.name, None)
                 return self._gpt_wrap_movement(result["location"], result["description"])
             else:
                 return result
 
         return f"I don't understand: {take_action}"
 
+    def _timed(self, name: str, fn, *args):
+        start = time.perf_counter()
+        try:
+            with span(name):
+                return fn(*args)
+        finally:
+            self.last_turn_timing[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    def _move_and_narrate(self, destination: str, state) -> str:
+        # The graph already allows the move, so narration (described straight from the
+        # node file) runs while the state changes instead of after it
+        start = time.perf_counter()
+        self.last_turn_timing = {}
+        narration = _turn_pool.submit(
+            self._timed, "narrate",
+            lambda: self._gpt_wrap_movement(destination, node.GameNode.from_name(destination).describe())
+        )
+        self._timed("move", state.move_to, destination)
+        response = narration.result()
+        wall = round((time.perf_counter() - start) * 1000, 1)
+        self.last_turn_timing.update(wall_ms=wall, serial_ms=round(self.last_turn_timing["narrate"] + self.last_turn_timing["move"], 1))
+        # serial_ms is what the turn would have taken with narration after the move
+        tag_turn(wall_ms=self.last_turn_timing["wall_ms"], serial_ms=self.last_turn_timing["serial_ms"])
+        return response
+
     # === GPT helpers ===
-    def _gpt_classify(self, text: str) -> Dict:
+    INTENTS = ["where_am_i", "who_is_here", "where_can_i_go", "what_can_i_do",
+               "move_location", "sub_action", "save", "quit", "fallback"]
+
+    def _gpt_interpret(self, text: str, state) -> Dict:
+        """
+        Classifies the input and picks its target in a single tool-use call.
+        The target is checked against the current node's connections (for moves)
+        or events (for actions); anything else, or a low confidence, comes back as None.
+        """
+        connections = state.current_node.connections
+        events = state.current_node.events
+        tool = {
+            "name": "interpret_command",
+            "description": "Record what the player wants to do and what it applies to.",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "intent": {"type": "string", "enum": self.INTENTS},
+                    "target": {"type": "string", "description": "Destination for move_location, event for sub_action, otherwise empty"},
+                    "confidence": {"type": "number", "minimum": 0, "maximum": 1}
+                },
+                "required": ["intent", "target", "confidence"]
+            }
+        }
         prompt = f"""
-You are a game input classifier. Map the input to one of the following intent keywords:
+You are a game input classifier. Intents:
 - where_am_i : User wants location information
 - who_is_here : User wants other characters/player information
 - where_can_i_go : User wants to know where they can go
@@ -146,22 +251,37 @@ You are a game input classifier. Map the input to one of the following intent ke
 - sub_action: Player wants to do something
 - save: Player wants to save
 - quit: Player wants to quit
+- fallback: unclear
 
-Input: "{text}"
+Places reachable from here: {', '.join(connections) or 'none'}
+Events here: {', '.join(events) or 'none'}
 
-Respond ONLY with one of the above. If unclear, respond with "fallback".
+Input: "{text}"
 """
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=self.max_tokens,
-            temperature=0.2,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        import json
+        fallback = {"intent": "fallback", "target": None, "confidence": 0.0}
         try:
-            return json.loads(response.content[0].text)
-        except Exception:
-            return {"action": "unknown", "args": {"raw": text, "reason": "GPT parse error"}}
+            response = self._create(
+                "classify",
+                tools=[tool],
+                tool_choice={"type": "tool", "name": "interpret_command"},
+                messages=[{"role": "user", "content": prompt}]
+            )
+            result = next(block.input for block in response.content if block.type == "tool_use")
+        except Exception as e:
+            print("GPT error during interpretation:", e)
+            return fallback
+
+        intent = result.get("intent")
+        confidence = float(result.get("confidence") or 0)
+        if intent not in self.INTENTS or confidence < 0.5:
+            return fallback
+
+        valid = {"move_location": connections, "sub_action": events}.get(intent, [])
+        target = result.get("target") or None
+        if target not in valid:
+            target = self._match_node_name(target, valid) if target and valid else None
+            target = target if target in valid else None
+        return {"intent": intent, "target": target, "confidence": confidence}
 
     def _gpt_respond_about_context(self, question: str, context: str) -> str:
         prompt = f"""You are the narrator of a text adventure game.
@@ -188,38 +308,156 @@ Write a short transition message describing the move and what they now see.
 """
         return self._call_gpt(prompt)
 
-    def _gpt_conversation(self, player_input: str, conversation_context: list[str], history: list[tuple[str, str]]) -> str:
+    def _conversation_turn(self, player_input: str, event, beat: str, state) -> str:
+        # The event's opening beat is shown as written; after that the NPC answers the player in
+        # character and carries the scene on to the next scripted beat
+        if not player_input or state.conversation_turns <= 1:
+            return beat
+        scene = [event.describe(), *event.consequence]  # the same for the whole event, so it caches
+        try:
+            return self._gpt_conversation(player_input, scene, self.conversation_memory(event.name), beat)
+        except Exception as e:
+            print("GPT error during conversation:", e)
+            return beat
+
+    def conversation_memory(self, key: str) -> ConversationMemory:
+        if key not in self.memories:
+            self.memories[key] = ConversationMemory(self._gpt_summarize)
+        return self.memories[key]
+
+    def _gpt_conversation(self, player_input: str, conversation_context: list[str], memory: ConversationMemory,
+                          beat: str = None) -> str:
         # messages = [{"role": "system", "content": "You are an NPC or narrator in a text-based adventure game."}]
+        # The system prompt, scene and prior history are identical from turn to turn, so they are
+        # marked as prompt-cache breakpoints and only the newest player line is billed at full price.
         messages = []
         if isinstance(conversation_context, list):
             context_text = "\n".join(conversation_context)
         else:
             context_text = str(conversation_context)
 
-        messages.append({"role": "user", "content": f"Scene:\n{context_text}"})
+        messages.append({"role": "user", "content": [self._cached_block(f"Scene:\n{context_text}")]})
+
+        # Only the last few exchanges go in verbatim; older ones arrive as a running summary
+        summary, history = memory.snapshot()
+        if summary:
+            messages.append({"role": "user", "content": f"Earlier in this conversation:\n{summary}"})
 
         for user_input, npc_reply in history:
             messages.append({"role": "user", "content": user_input})
             messages.append({"role": "assistant", "content": npc_reply})
 
-        messages.append({"role": "user", "content": player_input})
+        if history:
+            # Breakpoint at the end of the older history; the next turn reads everything up to here from cache
+            messages[-1]["content"] = [self._cached_block(messages[-1]["content"])]
 
-        response = self.client.messages.create(
-            model=self.model,
-            system = "You are an NPC or narrator in a text-based adventure game.",
-            temperature=self.temperature,
-            messages=messages,
-            max_tokens=self.max_tokens
+        # Only this last message changes every turn; the next scripted beat steers the reply
+        if beat:
+            messages.append({"role": "user", "content": f"{player_input}\n\n(Continue the scene with: {beat})"})
+        else:
+            messages.append({"role": "user", "content": player_input})
+
+        response = self._create(
+            "conversation",
+            system=[self._cached_block("You are an NPC or narrator in a text-based adventure game.")],
+            messages=messages
         )
+        self._track_cache_usage(response)
+
+        reply = response.content[0].text
+        memory.add(player_input, reply)
+        return reply
 
+    def _gpt_summarize(self, previous_summary: str, exchanges: list[tuple[str, str]]) -> str:
+        transcript = "\n".join(f"Player: {u}\nNPC: {r}" for u, r in exchanges)
+        prompt = f"""Summary so far:
+\"\"\"
+{previous_summary or "(none)"}
+\"\"\"
+
+New exchanges:
+\"\"\"
+{transcript}
+\"\"\"
+
+Update the summary in a few sentences. Keep names, promises, items and facts the NPC revealed.
+"""
+        response = self._create("summarize", messages=[{"role": "user", "content": prompt}])
         return response.content[0].text
 
+    def _cached_block(self, text: str) -> dict:
+        return {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+
+    def _track_cache_usage(self, response):
+        usage = getattr(response, "usage", None)
+        self.cache_stats["calls"] += 1
+        self.cache_stats["cache_read_tokens"] += getattr(usage, "cache_read_input_tokens", None) or 0
+        self.cache_stats["cache_write_tokens"] += getattr(usage, "cache_creation_input_tokens", None) or 0
+        self.cache_stats["uncached_tokens"] += getattr(usage, "input_tokens", None) or 0
+
+    def cache_summary(self) -> Dict:
+        stats = dict(self.cache_stats)
+        total = stats["cache_read_tokens"] + stats["cache_write_tokens"] + stats["uncached_tokens"]
+        stats["cached_ratio"] = stats["cache_read_tokens"] / total if total else 0.0
+        return stats
+
+    def status_report(self) -> str:
+        # Shown by the engine's ai_status command
+        cache = self.cache_summary()
+        lines = ["=== AI STATUS ===",
+                 f"Conversation cache: {cache['calls']} calls, {cache['cache_read_tokens']} tokens read from cache, "
+                 f"{cache['cache_write_tokens']} written, {cache['uncached_tokens']} uncached "
+                 f"({cache['cached_ratio']:.0%} cached)",
+                 self._timing_line(),
+                 self._transport_line(),
+                 "",
+                 f"{'call type':<14}{'model':<28}{'max tok':>8}{'calls':>7}{'errors':>7}{'avg ms':>8}"]
+        for call_type, route in self.route_summary().items():
+            lines.append(f"{call_type:<14}{route['model']:<28}{route['max_tokens']:>8}{route['calls']:>7}"
+                         f"{route['errors']:>7}{route['avg_latency'] * 1000:>8.0f}")
+        return "\n".join(lines)
+
+
+    def _transport_line(self) -> str:
+        transport = http_transport.transport_stats()
+        return (f"Transport: {transport['requests']} requests over {transport['connections']} connections "
+                f"({transport['tls_handshakes']} TLS handshakes, {transport['reuse_rate']:.0%} reused)")
+
+    def _timing_line(self) -> str:
+        timing = self.last_turn_timing
+        if "wall_ms" not in timing:
+            return "Last move: none yet"
+        return (f"Last move: {timing['wall_ms']:.0f} ms with narration alongside the move, "
+                f"{timing['serial_ms']:.0f} ms one after the other "
+                f"(narrate {timing['narrate']:.0f} ms, move {timing['move']:.0f} ms)")
+
+    def _create(self, call_type: str, **kwargs):
+        # The call type's route fills in model, max_tokens and temperature unless given explicitly
+        params = {**self.routes[call_type], **kwargs}
+        stats = self.route_stats[call_type]
+        start = time.perf_counter()
+        try:
+            with span("ai_call", call_type=call_type, model=params["model"]):
+                return self.client.messages.create(**params)
+        except Exception:
+            with self._stats_lock:
+                stats["errors"] += 1
+            raise
+        finally:
+            with self._stats_lock:
+                stats["calls"] += 1
+                stats["total_latency"] += time.perf_counter() - start
+
+    def route_summary(self) -> Dict:
+        summary = {}
+        with self._stats_lock:
+            route_stats = {call_type: dict(stats) for call_type, stats in self.route_stats.items()}
+        for call_type, route in self.routes.items():
+            stats = route_stats[call_type]
+            avg = stats["total_latency"] / stats["calls"] if stats["calls"] else 0.0
+            summary[call_type] = {**route, "calls": stats["calls"], "errors": stats["errors"], "avg_latency": round(avg, 3)}
+        return summary
 
     def _call_gpt(self, prompt: str) -> str:
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=self.max_tokens,
-            temperature=self.temperature,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        response = self._create("narrate", messages=[{"role": "user", "content": prompt}])
         return response.content[0].text
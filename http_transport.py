@@ -0,0 +1,71 @@
+"""
+Process-wide pooled HTTP client for the Anthropic SDK.
+Every GameAI (one per session when served) reuses the same connection pool,
+so only the first call in the process pays for TCP and TLS setup.
+"""
+import importlib.util
+import os
+import threading
+
+POOL_SIZE = int(os.getenv("AI_POOL_SIZE", "10"))
+KEEPALIVE = int(os.getenv("AI_POOL_KEEPALIVE", "5"))
+KEEPALIVE_EXPIRY = float(os.getenv("AI_KEEPALIVE_EXPIRY", "120"))
+HTTP2 = os.getenv("AI_HTTP2", "true").lower() in ("1", "true", "yes")
+
+_client = None
+_lock = threading.Lock()
+_stats_lock = threading.Lock()
+stats = {"requests": 0, "connections": 0, "tls_handshakes": 0}
+
+
+def _trace(event_name: str, info):
+    # httpcore reports a connect only when a request could not reuse a pooled connection
+    key = {"connection.connect_tcp.complete": "connections",
+           "connection.start_tls.complete": "tls_handshakes"}.get(event_name)
+    if key:
+        with _stats_lock:
+            stats[key] += 1
+
+
+def _on_request(request):
+    request.extensions["trace"] = _trace
+    with _stats_lock:
+        stats["requests"] += 1
+
+
+def shared_client():
+    """The shared httpx.Client, or None if httpx is missing (the SDK then builds its own)."""
+    global _client
+    with _lock:
+        if _client is None:
+            try:
+                import httpx
+            except ImportError:
+                return None
+            _client = httpx.Client(
+                limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=KEEPALIVE,
+                                    keepalive_expiry=KEEPALIVE_EXPIRY),
+                http2=HTTP2 and importlib.util.find_spec("h2") is not None,
+                event_hooks={"request": [_on_request]}
+            )
+        return _client
+
+
+def prewarm(url: str = "https://api.anthropic.com"):
+    """Open a pooled connection in the background so the first turn skips connection setup."""
+    def warm():
+        client = shared_client()
+        if client is None:
+            return
+        try:
+            client.head(url, timeout=5.0)
+        except Exception as e:
+            print("Connection pre-warm failed:", e)
+    threading.Thread(target=warm, daemon=True).start()
+
+
+def transport_stats() -> dict:
+    with _stats_lock:
+        summary = dict(stats)
+    summary["reuse_rate"] = 1 - summary["connections"] / summary["requests"] if summary["requests"] else 0.0
+    return summary
@@ -0,0 +1,52 @@
+# intents.py
+
+# Keyword rules for the player's intent, loaded from data/intent_rules.json.
+# Phrases match whole words ("do" never matches "door") and the highest-priority rule that matches wins;
+# ties go to the phrase that starts first. A rule with "requires" also needs one of those words, and a
+# rule with "unless" is skipped when any of its words appear ("I don't want to quit" is no quit).
+# One scan over the input finds every phrase, however many rules there are.
+
+import re
+
+import storage
+
+
+def tokenize(text):
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+class IntentRules:
+    def __init__(self, rules):
+        self.rules = [dict(rule, priority=int(rule.get("priority", 0))) for rule in rules]
+        self.phrases = {}  # word tuple -> [(rule index, "phrases" | "requires" | "unless")]
+        for i, rule in enumerate(self.rules):
+            for kind in ("phrases", "requires", "unless"):
+                for phrase in rule.get(kind, []):
+                    words = tuple(tokenize(phrase))
+                    if words:
+                        self.phrases.setdefault(words, []).append((i, kind))
+        self.depth = max(map(len, self.phrases), default=0)
+    
+    @classmethod
+    def load(cls):
+        return cls(storage.get_intent_rules())
+    
+    def classify(self, text):
+        """The intent of the best rule the text satisfies, or None"""
+        tokens = tokenize(text)
+        first, also = {}, set()
+        for start in range(len(tokens)):
+            for end in range(start + 1, min(start + self.depth, len(tokens)) + 1):
+                for i, kind in self.phrases.get(tuple(tokens[start:end]), ()):
+                    if kind == "phrases":
+                        first.setdefault(i, start)
+                    else:
+                        also.add((i, kind))
+        best = None
+        for i, start in first.items():
+            rule = self.rules[i]
+            if (rule.get("requires") and (i, "requires") not in also) or (i, "unless") in also:
+                continue
+            if best is None or (-rule["priority"], start) < best[0]:
+                best = ((-rule["priority"], start), rule["intent"])
+        return best[1] if best else None
@@ -0,0 +1,192 @@
+# skills.py
+
+# Data-driven combat skills.
+# data/skills.json describes every skill (cost, damage formula, effects), data/combatants.json the
+# stat blocks and skill lists of rangers and enemies, and data/encounters.json who fights whom.
+# Each skill is compiled once into a Skill: its data row plus a list of effect steps, so using a
+# skill is one dict lookup (skill_table[skill_id]) and a call to Skill.use().
+#
+# Skill fields (all optional except name/breath_cost):
+#   target        - "enemy" (default), "enemies" (the opposing team), "self" or "allies"
+#   spends_breath - false for moves that need breath_cost but don't consume it (Baby-Green's basics)
+#   breath        - breath the user gains
+#   analyze       - flag the target so the next ranger move deals a coordinated bonus
+#   damage        - {"stat", "min", "max"}: user's stat * randint(min, max) to the target
+#   crit          - {"chance", "bonus"}: extra int(damage * bonus) on a damaging hit
+#   effect        - status set on the target ("stun")
+#   area_damage   - one damage roll applied to every living member of the target team
+#   heal_self     - HP the user regains
+#   heal_team     - HP every living member of the target team regains (see FriendlyTeam.heal_all)
+#
+# A step whose target doesn't fit (an area attack aimed at one ranger, a heal aimed at someone
+# else) does nothing; the breath is still spent. That is how the original rules behaved.
+
+from functools import lru_cache
+
+import storage
+
+
+def skill_id(name):
+    """'Heat Wave' / 'heat wave' -> 'heat_wave'"""
+    return name.strip().lower().replace(" ", "_")
+
+
+def _is_team(target):
+    return hasattr(target, "members")
+
+
+def _breath_step(amount):
+    def step(actor, target, battle):
+        actor.stats['Breath'] += amount
+        battle.emit("breathe", actor=actor.name, breath=actor.stats['Breath'])
+    return step
+
+
+def _analyze_step():
+    def step(actor, target, battle):
+        if _is_team(target) or target is None:
+            return
+        target.stats['analyzed'] = True
+        battle.emit("analyze", actor=actor.name, target=target.name)
+    return step
+
+
+def _damage_step(name, stat, lo, hi, crit):
+    chance, bonus_rate = (crit['chance'], crit['bonus']) if crit else (0, 0)
+    
+    def step(actor, target, battle):
+        if _is_team(target) or target is None:
+            return
+        rng = battle.rng
+        damage = actor.stats[stat] * rng.randint(lo, hi)
+        if damage > 0:
+            target.stats['hp'] -= damage
+            battle.emit("damage", target=target.name, amount=damage, cause=name)
+            if chance and rng.random() < chance:
+                bonus = int(damage * bonus_rate)
+                target.stats['hp'] -= bonus
+                battle.emit("damage", target=target.name, amount=bonus, cause="critical")
+    return step
+
+
+def _effect_step(effect):
+    def step(actor, target, battle):
+        if _is_team(target) or target is None:
+            return
+        target.stats['effect'] = effect
+        battle.emit("effect", target=target.name, effect=effect)
+    return step
+
+
+def _area_damage_step(name, stat, lo, hi):
+    def step(actor, target, battle):
+        if not _is_team(target):
+            return
+        battle.emit("area_attack", actor=actor.name, skill=name)
+        damage = actor.stats[stat] * battle.rng.randint(lo, hi)
+        for member in target.living_members():
+            member.stats['hp'] -= damage
+            battle.emit("damage", target=member.name, amount=damage, cause=name)
+            target.check_fallen(member, battle)
+    return step
+
+
+def _heal_self_step(amount):
+    def step(actor, target, battle):
+        if target is not actor:
+            return
+        actor.stats['hp'] += amount
+        battle.emit("regenerate", actor=actor.name, amount=amount, hp=actor.stats['hp'])
+    return step
+
+
+def _heal_team_step(amount):
+    def step(actor, target, battle):
+        if _is_team(target):
+            target.heal_all(amount, battle)
+    return step
+
+
+class Skill(dict):
+    """A skill's data row (so skill['name'], skill['breath_cost'] work as before) plus its compiled steps."""
+    def __init__(self, sid, spec):
+        super().__init__(spec)
+        self.id = sid
+        self.name = spec['name']
+        self.breath_cost = spec['breath_cost']
+        self.spends_breath = spec.get('spends_breath', True)
+        self.target = spec.get('target', 'enemy')
+        # Moves other than healing and analyzing cash in an analyzed enemy's coordinated bonus
+        self.coordinated = not ('heal_team' in spec or spec.get('analyze'))
+        # Whether use() emits the "skill" event the front-ends narrate; breathing, analyzing
+        # and the enemy's area attack / regeneration have their own events
+        self.announce = any(k in spec for k in ('damage', 'effect', 'heal_team'))
+        
+        self.steps = []
+        if 'breath' in spec:
+            self.steps.append(_breath_step(spec['breath']))
+        if spec.get('analyze'):
+            self.steps.append(_analyze_step())
+        if 'damage' in spec:
+            d = spec['damage']
+            self.steps.append(_damage_step(self.name, d['stat'], d['min'], d['max'], spec.get('crit')))
+        if 'effect' in spec:
+            self.steps.append(_effect_step(spec['effect']))
+        if 'area_damage' in spec:
+            d = spec['area_damage']
+            self.steps.append(_area_damage_step(self.name, d['stat'], d['min'], d['max']))
+        if 'heal_self' in spec:
+            self.steps.append(_heal_self_step(spec['heal_self']))
+        if 'heal_team' in spec:
+            self.steps.append(_heal_team_step(spec['heal_team']))
+    
+    def brief(self):
+        """What the front-ends list as an option"""
+        return {'name': self.name, 'description': self['description'], 'breath_cost': self.breath_cost}
+    
+    def use(self, actor, target, battle, announce=True):
+        """Pay for the skill and apply it to target; False if the actor lacks the breath"""
+        if actor.stats['Breath'] < self.breath_cost:
+            battle.emit("invalid", actor=actor.name, skill=self.name, reason="breath")
+            return False
+        if self.spends_breath:
+            actor.stats['Breath'] -= self.breath_cost
+        if announce and self.announce:
+            battle.emit("skill", actor=actor.name, skill=self.name, target=getattr(target, 'name', None))
+        for step in self.steps:
+            step(actor, target, battle)
+        return True
+
+
+@lru_cache(maxsize=None)
+def registry():
+    """Every skill in data/skills.json, compiled once: {skill id: Skill}"""
+    return {sid: Skill(sid, spec) for sid, spec in storage.get_skills().items()}
+
+
+@lru_cache(maxsize=None)
+def combatant(combatant_id):
+    """A combatant template from data/combatants.json (shared: copy its stats before use)"""
+    template = storage.get_combatant(combatant_id)
+    if template is None:
+        raise KeyError(f"Unknown combatant: {combatant_id}")
+    return template
+
+
+@lru_cache(maxsize=None)
+def encounter(encounter_id):
+    """An encounter from data/encounters.json (shared: don't modify)"""
+    spec = storage.get_encounter(encounter_id)
+    if spec is None:
+        raise KeyError(f"Unknown encounter: {encounter_id}")
+    return spec
+
+
+def skill_table(skills):
+    """{skill id: Skill} for a combatant's skill list (ids or skill dicts with a name)"""
+    compiled = registry()
+    table = {}
+    for skill in skills:
+        sid = skill if isinstance(skill, str) else skill_id(skill['name'])
+        table[sid] = compiled[sid]
+    return table
@@ -1,5 +1,8 @@
 import os
+import re
 import json
+import tempfile
+from turn_trace import span
 
 DATA_DIR = "data"
 os.makedirs(DATA_DIR, exist_ok=True) 
@@ -11,12 +14,12 @@ def _load_dict(filename):
     path = _get_path(filename)
     if not os.path.exists(path):
         return {}
-    with open(path, "r") as f:
+    with span("storage_read", file=filename), open(path, "r") as f:
         return json.load(f)
 
 def _save_dict(filename, data):
     path = _get_path(filename)
-    with open(path, "w") as f:
+    with span("storage_write", file=filename), open(path, "w") as f:
         json.dump(data, f, indent=2)
 
 def get_player(player_id):
@@ -55,6 +58,58 @@ def save_node(node_id, node_data):
     nodes[node_id] = node_data
     _save_dict("nodes.json", nodes)
 
+def get_skills():
+    return _load_dict("skills.json")
+
+def get_combatant(combatant_id):
+    combatants = _load_dict("combatants.json")
+    return combatants.get(combatant_id)
+
+def get_encounter(encounter_id):
+    encounters = _load_dict("encounters.json")
+    return encounters.get(encounter_id)
+
+def get_intent_rules():
+    return _load_dict("intent_rules.json").get("rules", [])
+
+# Fights in progress get a file each: thousands can be live at once and each move rewrites only its own
+FIGHT_ID = re.compile(r"[A-Za-z0-9_-]+")
+
+def check_fight_id(fight_id):
+    """Fight ids become file names, so only letters, digits, '_' and '-' are allowed"""
+    if not isinstance(fight_id, str) or not FIGHT_ID.fullmatch(fight_id):
+        raise ValueError(f"Invalid fight id {fight_id!r}: use letters, digits, '_' and '-'")
+    return fight_id
+
+def _fight_path(fight_id):
+    return os.path.join(DATA_DIR, "fights", f"{check_fight_id(fight_id)}.json")
+
+def get_fight(fight_id):
+    path = _fight_path(fight_id)
+    if not os.path.exists(path):
+        return None
+    with span("storage_read", file="fights"), open(path, "r") as f:
+        return json.load(f)
+
+def save_fight(fight_id, fight_data):
+    # Write a temp file beside the fight and swap it in, so a crash never leaves a truncated one
+    path = _fight_path(fight_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with span("storage_write", file="fights"):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{fight_id}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(fight_data, f, separators=(",", ":"))
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+def delete_fight(fight_id):
+    path = _fight_path(fight_id)
+    if os.path.exists(path):
+        os.remove(path)
+
 def save_game(player_id, game_data):
     games = _load_dict("saves.json")
     games[player_id] = game_data
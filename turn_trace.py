@@ -0,0 +1,125 @@
+"""
+Per-turn tracing for the console game loop.
+Each turn becomes one JSON line in logs/traces.jsonl (rotated by size), written
+by a background thread. Same format as dev/, so dev/scripts/analyze_traces.py
+can summarize it with --file logs/traces.jsonl.
+"""
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join("logs", "traces.jsonl"))
+TRACE_MAX_BYTES = int(os.getenv("TRACE_MAX_BYTES", "5000000"))
+TRACE_BACKUPS = int(os.getenv("TRACE_BACKUPS", "3"))
+
+# The turn being played; the console game runs one turn at a time
+current = None
+
+_writer = None
+_listener = None
+
+
+class TurnTrace:
+    def __init__(self, player: str, user_input: str):
+        self.turn_id = uuid.uuid4().hex[:12]
+        self.player = player
+        self.user_input = user_input
+        self.timestamp = time.time()
+        self.started = time.perf_counter()
+        self.spans = []
+        self.tags = {}
+        self.duration_ms = None
+        self._lock = threading.Lock()
+
+    def add(self, name: str, started: float, ended: float, tags: dict):
+        with self._lock:
+            self.spans.append({
+                "name": name,
+                "start_ms": round((started - self.started) * 1000, 3),
+                "duration_ms": round((ended - started) * 1000, 3),
+                "tags": tags
+            })
+
+    def finish(self, **tags):
+        self.tags.update(tags)
+        self.tags.setdefault("outcome", "ok")
+        self.duration_ms = round((time.perf_counter() - self.started) * 1000, 3)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["start_ms"])
+        return {"turn_id": self.turn_id, "timestamp": self.timestamp, "player": self.player,
+                "input": self.user_input, "duration_ms": self.duration_ms, "tags": self.tags, "spans": spans}
+
+
+@contextmanager
+def span(name: str, **tags):
+    """Time a block as a span of the current turn (no-op between turns). Update the yielded tags to record an outcome."""
+    trace = current
+    if trace is None:
+        yield tags
+        return
+    tags.setdefault("outcome", "ok")
+    started = time.perf_counter()
+    try:
+        yield tags
+    except Exception:
+        tags["outcome"] = "error"
+        raise
+    finally:
+        trace.add(name, started, time.perf_counter(), tags)
+
+
+def begin(player: str, user_input: str) -> TurnTrace:
+    global current
+    current = TurnTrace(player, user_input)
+    return current
+
+
+def tag_turn(**tags):
+    """Add tags to the current turn (no-op between turns)."""
+    trace = current
+    if trace is not None:
+        trace.tags.update(tags)
+
+
+def end(**tags):
+    """Finish the current turn and hand it to the writer thread."""
+    global current
+    trace, current = current, None
+    if trace is None:
+        return
+    trace.finish(**tags)
+    try:
+        _get_writer().info(json.dumps(trace.to_dict(), default=str))
+    except Exception as e:
+        print("Could not write turn trace:", e)
+
+
+def _get_writer() -> logging.Logger:
+    global _writer, _listener
+    if _writer is None:
+        os.makedirs(os.path.dirname(TRACE_FILE) or ".", exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(TRACE_FILE, maxBytes=TRACE_MAX_BYTES,
+                                                       backupCount=TRACE_BACKUPS, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        log_queue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(log_queue, handler)
+        _listener.start()
+        _writer = logging.getLogger("turn_trace")
+        _writer.propagate = False
+        _writer.setLevel(logging.INFO)
+        _writer.addHandler(logging.handlers.QueueHandler(log_queue))
+    return _writer
+
+
+def close():
+    """Flush pending traces; call before exiting."""
+    if _listener:
+        _listener.stop()